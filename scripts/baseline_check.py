@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# scripts/baseline_check.py
+# Baseline sazonal (infrastructure/seasonal_baseline.py) x IsolationForest na janela.
+#
+#   1. gera --weeks semanas de séries (passo 60s) com um pico SEMANAL normal que começa na
+#      hora cheia atual (mesmo dia da semana/hora em todas as semanas, --peak-hours de duração)
+#      e, em metade das séries, uma anomalia real no último ponto
+#   2. constrói a baseline (BaselineRebuilder: lote vetorizado + troca atômica)
+#   3. roda analyzer_timeseries com TS_SCORER=iforest e TS_SCORER=auto sobre os mesmos dados,
+#      com janela de --window-min minutos: o pico atual são só os últimos pontos da janela
+#      (no máximo 60), então o IsolationForest vê uma mudança de nível que é sazonal
+#   4. compara os incidentes com o gabarito (falsos positivos no pico sazonal, recall) e o tempo
+# Sai com código 1 se a baseline não tiver ESTRITAMENTE menos falsos positivos que o
+# IsolationForest ou se tiver recall menor.
+
+import argparse, json, os, shutil, subprocess, sys, tempfile, time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+SRC = os.path.join(ROOT, "src")
+sys.path.insert(0, SRC)
+
+import numpy as np
+import pandas as pd
+
+from infrastructure.dataset_io import read_dataset
+from infrastructure.seasonal_baseline import BaselineRebuilder, BaselineStore
+from infrastructure.synthetic_data import host_names, item_keys, series_filename
+
+ANALYZER = os.path.join(SRC, "agents", "analyzer_timeseries", "main.py")
+
+
+def generate(out_dir, n_hosts, n_items, weeks, peak_hours, seed):
+    """
+    Séries com pico semanal a partir da hora cheia atual. Retorna ({(host, itemkey):
+    anomalia_no_último_ponto}, pontos de pico por série, pontos do pico atual na janela).
+    """
+    rng = np.random.default_rng(seed)
+    end_ts = int(time.time()) // 60 * 60
+    ts = np.arange(end_ts - weeks * 7 * 86400 + 60, end_ts + 1, 60, dtype=np.int64)
+    hour_start = end_ts // 3600 * 3600
+    # mesma hora da semana em todas as semanas; na semana atual o pico começou há < 60 min
+    weekly_peak = (ts - hour_start) % (7 * 86400) < peak_hours * 3600
+    truth = {}
+    os.makedirs(out_dir, exist_ok=True)
+    for i, host in enumerate(host_names(n_hosts)):
+        for key in item_keys(n_items):
+            level = rng.uniform(10, 40)
+            noise = rng.uniform(0.02, 0.05) * level
+            value = level + rng.normal(0, noise, len(ts))
+            value[weekly_peak] += 1.5 * level  # carga semanal esperada (ex.: job de segunda 9h)
+            anomalous = len(truth) % 2 == 1
+            if anomalous:
+                value[-1] += 2.5 * level
+            truth[(host, key)] = anomalous
+            pd.DataFrame({"ts": ts, "value": np.round(value, 6), "host": host, "itemkey": key}) \
+                .to_csv(os.path.join(out_dir, series_filename(host, key)), index=False)
+    return truth, int(weekly_peak.sum()), (end_ts - hour_start) // 60 + 1
+
+
+def run_analyzer(raw, out, baseline_path, scorer, window_min, log):
+    env = dict(os.environ)
+    env.update({"PYTHONPATH": SRC, "METRICS_PORT": "0", "TS_INPUT_DIR": raw, "TS_OUTPUT_CSV": out,
+                "TS_SCORER": scorer, "TS_BASELINE_PATH": baseline_path, "TS_WINDOW_MIN": str(window_min)})
+    t0 = time.perf_counter()
+    with open(log, "w") as f:
+        rc = subprocess.run([sys.executable, ANALYZER], env=env, stdout=f, stderr=subprocess.STDOUT, cwd=ROOT).returncode
+    return time.perf_counter() - t0, rc
+
+
+def evaluate(path, truth):
+    df = read_dataset(path, schema="timeseries")
+    flags = {(r.host, r.itemkey): bool(r.is_incident) for r in df.itertuples()}
+    tp = sum(1 for k, a in truth.items() if a and flags.get(k))
+    fp = sum(1 for k, a in truth.items() if not a and flags.get(k))
+    n_pos = sum(truth.values())
+    return {"scored": len(flags), "true_positives": tp, "false_positives": fp,
+            "recall": round(tp / n_pos, 3) if n_pos else None,
+            "false_positive_rate": round(fp / (len(truth) - n_pos), 3) if len(truth) > n_pos else None,
+            "scorers": df["scorer"].value_counts().to_dict() if "scorer" in df.columns else {}}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--hosts", type=int, default=10)
+    ap.add_argument("--items", type=int, default=2)
+    ap.add_argument("--weeks", type=int, default=4)
+    ap.add_argument("--peak-hours", type=int, default=2, help="duração do pico semanal")
+    ap.add_argument("--window-min", type=int, default=1440, help="TS_WINDOW_MIN do analyzer nas duas execuções")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--workdir", default=None)
+    ap.add_argument("--keep", action="store_true")
+    args = ap.parse_args()
+
+    ws = args.workdir or tempfile.mkdtemp(prefix="baseline-")
+    raw = os.path.join(ws, "raw", "timeseries")
+    baseline_path = os.path.join(ws, "models", "seasonal_baseline.npz")
+    report = {"hosts": args.hosts, "items": args.items, "weeks": args.weeks,
+              "window_min": args.window_min}
+    failures = []
+    try:
+        truth, peak_points, current_peak = generate(raw, args.hosts, args.items, args.weeks,
+                                                    args.peak_hours, args.seed)
+        report["series"] = len(truth)
+        report["current_peak_points"] = current_peak
+        report["points_per_series"] = args.weeks * 7 * 1440
+        print(f"[baseline] {len(truth)} séries, {args.weeks} semanas, {peak_points} pontos de pico semanal por série")
+
+        store = BaselineStore(baseline_path, check_interval_s=0)
+        report["build"] = BaselineRebuilder(raw, baseline_path, history_days=args.weeks * 7).run_once()
+        first = store.get()
+        BaselineRebuilder(raw, baseline_path, history_days=args.weeks * 7).run_once()  # troca atômica
+        if store.get() is first:
+            failures.append("BaselineStore não trocou para a baseline reconstruída")
+
+        b = store.get()
+        host, key = next(iter(truth))
+        t0 = time.perf_counter()
+        for i in range(100_000):
+            b.score(host, key, 1_700_000_000 + 60 * i, 1.0)
+        report["lookup_us"] = round((time.perf_counter() - t0) * 10, 2)
+
+        for scorer in ("iforest", "auto"):
+            out = os.path.join(ws, scorer, "anomalies_timeseries.csv")
+            secs, rc = run_analyzer(raw, out, baseline_path, scorer, args.window_min,
+                                    os.path.join(ws, f"analyzer-{scorer}.log"))
+            if rc:
+                failures.append(f"analyzer ({scorer}) saiu com código {rc}")
+                continue
+            report[scorer] = dict(evaluate(out, truth), seconds=round(secs, 2))
+    finally:
+        if not args.keep and not args.workdir:
+            shutil.rmtree(ws, ignore_errors=True)
+
+    i, a = report.get("iforest"), report.get("auto")
+    if i and a:
+        if a["false_positives"] >= i["false_positives"]:
+            failures.append(f"baseline sem vantagem no pico sazonal: {a['false_positives']} falsos positivos "
+                            f"(IsolationForest: {i['false_positives']})")
+        if (a["recall"] or 0) < (i["recall"] or 0):
+            failures.append("baseline com recall menor que o IsolationForest")
+    report["ok"] = not failures
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    for f in failures:
+        print(f"[baseline][FALHA] {f}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
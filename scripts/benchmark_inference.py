@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# scripts/benchmark_inference.py
+# Compara latência de scoring: sklearn predict_proba (caminho antigo, via DataFrame)
+# vs. CompiledForest (arrays NumPy). Também confere se as probabilidades batem.
+
+import argparse, json, os, sys, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from infrastructure.compiled_forest import CompiledForest
+from infrastructure.feature_store import FEATURES, RAW_COLUMNS, build_feature_frame
+from infrastructure.dataset_io import read_dataset
+
+
+def load_model(path):
+    obj = joblib.load(path)
+    if isinstance(obj, dict):
+        return obj["model"], obj.get("features", FEATURES)
+    return obj, FEATURES
+
+
+def legacy_prepare(df, features):
+    # caminho antigo do ModelInferenceService: DataFrame montado coluna a coluna
+    X = pd.DataFrame()
+    for col in features:
+        X[col] = df[col] if col in df.columns else 0
+    return X
+
+
+def sklearn_score(clf, df, features):
+    X = legacy_prepare(df, features)
+    if not hasattr(clf, "feature_names_in_"):
+        X = X.to_numpy()
+    return clf.predict_proba(X)
+
+
+def timeit(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000.0)
+    return {"p50_ms": float(np.percentile(times, 50)), "p99_ms": float(np.percentile(times, 99))}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--model", default="data/models/anomaly_model.pkl")
+    ap.add_argument("--data", default="data/processed/dataset_labeled.csv")
+    ap.add_argument("--batch-sizes", default="1,10,100,1000")
+    ap.add_argument("--repeats", type=int, default=50)
+    ap.add_argument("--out", default=None, help="JSON com os resultados (opcional)")
+    args = ap.parse_args()
+
+    clf, features = load_model(args.model)
+    df = build_feature_frame(read_dataset(args.data, columns=RAW_COLUMNS))
+    compiled = CompiledForest.from_sklearn(clf)
+    X_all = df[features].to_numpy(dtype=np.float64)
+
+    # Equivalência numérica no dataset inteiro
+    ref = clf.predict_proba(X_all)
+    got = compiled.predict_proba(X_all)
+    max_diff = float(np.abs(ref - got).max())
+
+    results = {"trees": compiled.n_trees, "depth": compiled.depth, "max_abs_diff": max_diff, "batches": []}
+    for bs in [int(b) for b in args.batch_sizes.split(",")]:
+        part = df.iloc[:bs]
+        Xp = part[features].to_numpy(dtype=np.float64)
+        repeats = max(3, args.repeats if bs <= 100 else args.repeats // 10)
+        sk = timeit(lambda: sklearn_score(clf, part, features), repeats)
+        cf = timeit(lambda: compiled.predict_proba(Xp), repeats)
+        results["batches"].append({
+            "batch": len(part),
+            "sklearn": sk,
+            "compiled": cf,
+            "speedup_p50": sk["p50_ms"] / cf["p50_ms"] if cf["p50_ms"] else None,
+        })
+
+    print(f"árvores={results['trees']} profundidade={results['depth']} max|Δproba|={max_diff:.2e}")
+    print(f"{'batch':>7} | {'sklearn p50':>12} | {'compiled p50':>12} | {'speedup':>7}")
+    for r in results["batches"]:
+        print(f"{r['batch']:>7} | {r['sklearn']['p50_ms']:>10.3f}ms | {r['compiled']['p50_ms']:>10.3f}ms"
+              f" | {r['speedup_p50']:>6.1f}x")
+
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Resultados salvos em: {args.out}")
+
+    if max_diff > 1e-9:
+        print("AVISO: probabilidades divergem do sklearn além da tolerância")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# scripts/benchmark_pipeline.py
+# Benchmark do pipeline completo com carga sintética em escalas crescentes.
+#
+# Para cada escala (hosts x itens) gera séries em raw/timeseries e a tabela de triggers
+# (infrastructure/synthetic_data.py), roda cada agente como subprocesso num diretório
+# isolado e registra tempo, throughput, latência por linha e pico de RSS por estágio.
+#
+#   python scripts/benchmark_pipeline.py --scales 10x2,50x4,200x4 --out data/reports/bench.json
+#   python scripts/benchmark_pipeline.py --scales 10x2,50x4 --compare data/reports/bench.json
+#
+# --compare marca regressões (tempo ou RSS acima de --threshold) contra um resultado anterior.
+
+import argparse, json, os, platform, shutil, subprocess, sys, tempfile, time
+from datetime import datetime, timezone
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+SRC = os.path.join(ROOT, "src")
+sys.path.insert(0, SRC)
+
+from infrastructure.synthetic_data import generate_timeseries, generate_triggers
+from infrastructure.dataset_io import read_dataset, dataset_exists
+
+
+def _count_lines(path):
+    if not os.path.exists(path):
+        return 0
+    with open(path, "rb") as f:
+        return sum(1 for _ in f)
+
+
+def _dataset_rows(path):
+    return len(read_dataset(path, columns=["ts"])) if dataset_exists(path) else 0
+
+
+def stages(ws):
+    """(nome, comando, env extra, função que conta as linhas de entrada do estágio)."""
+    p = lambda *a: os.path.join(ws, *a)
+    return [
+        ("analyzer_timeseries", [os.path.join(SRC, "agents", "analyzer_timeseries", "main.py")], {
+            "TS_INPUT_DIR": p("raw", "timeseries"),
+            "TS_OUTPUT_CSV": p("processed", "anomalies_timeseries.csv"),
+        }, lambda ctx: ctx["ts_rows"]),
+        ("analyzer", [os.path.join(SRC, "agents", "analyzer", "main.py")], {
+            "INPUT_FILE": p("processed", "anomalies_dataset.csv"),
+            "PROCESSED_FILE": p("processed", "dataset_ready.csv"),
+            "LABELED_FILE": p("processed", "dataset_labeled.csv"),
+            "SCALER_FILE": p("models", "preprocessing_scaler.json"),
+            "PREPROC_REFIT": "true",
+        }, lambda ctx: ctx["trigger_rows"]),
+        ("ml_trainer", [os.path.join(SRC, "agents", "ml_trainer", "main.py")], {
+            "TRAIN_INPUT": p("processed", "dataset_labeled.csv"),
+            "MODEL_PATH": p("models", "anomaly_model.pkl"),
+            "MODEL_REGISTRY_DIR": p("models", "registry"),
+            "METRICS_PATH": p("reports", "metrics.json"),
+            "FEATURE_IMP_PATH": p("reports", "feature_importances.csv"),
+            "FEATURE_STORE_DIR": p("features"),
+        }, lambda ctx: ctx["trigger_rows"]),
+        ("orchestrator", [os.path.join(SRC, "agents", "orchestrator", "main.py")], {
+            "ORCH_INPUT": p("processed", "dataset_labeled.csv"),
+            "ORCH_TS_INPUT": p("processed", "anomalies_timeseries.csv"),
+            "ORCH_STATE_PATH": p("actions", ".orchestrator_state.json"),
+            "ORCH_LOOP_ENABLED": "false",
+            "ORCH_DEBUG": "false",
+            "ORCH_INFERENCE_URL": "",
+        }, lambda ctx: ctx["trigger_rows"] + _dataset_rows(p("processed", "anomalies_timeseries.csv"))),
+        ("executor", [os.path.join(SRC, "agents", "executor", "main.py")], {},
+         lambda ctx: _count_lines(p("actions", "pending_actions.jsonl"))),
+        ("incident_report", [os.path.join(ROOT, "scripts", "generate_incident_report.py"),
+                             "--pending", p("actions", "pending_actions.jsonl"),
+                             "--executed", p("actions", "executed_actions.jsonl"),
+                             "--out-csv", p("reports", "incidents_report.csv"),
+                             "--out-md", p("reports", "incidents_report.md"),
+                             "--out-rollups", p("reports", "incidents_rollups.json")], {},
+         lambda ctx: _count_lines(p("actions", "executed_actions.jsonl"))),
+    ]
+
+
+# Lançador mínimo: o ru_maxrss de um filho herda o pico do processo que fez o fork,
+# então o fork+exec do estágio é feito por um interpretador enxuto (não por este script,
+# que já carregou pandas/pyarrow). Grava {"seconds", "maxrss_kb", "status"} em argv[1].
+_RUNNER = """
+import json, os, sys, time
+t0 = time.perf_counter()
+pid = os.fork()
+if pid == 0:
+    os.execv(sys.executable, [sys.executable] + sys.argv[2:])
+_, status, usage = os.wait4(pid, 0)
+with open(sys.argv[1], "w") as f:
+    json.dump({"seconds": time.perf_counter() - t0, "maxrss_kb": usage.ru_maxrss,
+               "status": os.waitstatus_to_exitcode(status)}, f)
+"""
+
+
+def run_stage(cmd, env, log_path):
+    """Roda o estágio e devolve (segundos, pico de RSS em MB, returncode)."""
+    stat_path = log_path + ".rusage.json"
+    with open(log_path, "w") as log:
+        subprocess.run([sys.executable, "-S", "-c", _RUNNER, stat_path] + cmd,
+                       env=env, stdout=log, stderr=subprocess.STDOUT, cwd=ROOT)
+    with open(stat_path) as f:
+        st = json.load(f)
+    return st["seconds"], st["maxrss_kb"] / 1024.0, st["status"]
+
+
+def run_scale(label, n_hosts, n_items, args, work_root):
+    ws = os.path.join(work_root, label)
+    shutil.rmtree(ws, ignore_errors=True)
+    for d in ("raw/timeseries", "processed", "models", "reports", "actions", "features", "logs"):
+        os.makedirs(os.path.join(ws, d), exist_ok=True)
+
+    t0 = time.perf_counter()
+    ts_info = generate_timeseries(os.path.join(ws, "raw", "timeseries"), n_hosts, n_items, args.points,
+                                  anomaly_rate=args.anomaly_rate, seed=args.seed)
+    tr_info = generate_triggers(os.path.join(ws, "processed", "anomalies_dataset.csv"),
+                                n_hosts * args.triggers_per_host, n_hosts,
+                                anomaly_rate=args.anomaly_rate * 10, seed=args.seed)
+    gen_s = time.perf_counter() - t0
+    ctx = {"ts_rows": ts_info["rows"], "trigger_rows": tr_info["rows"]}
+
+    env_base = dict(os.environ)
+    env_base.update({
+        "PYTHONPATH": SRC,
+        "ACTIONS_PENDING": os.path.join(ws, "actions", "pending_actions.jsonl"),
+        "ACTIONS_EXECUTED": os.path.join(ws, "actions", "executed_actions.jsonl"),
+        "METRICS_PORT": "0",
+        "MPLBACKEND": "Agg",
+    })
+
+    results = []
+    for name, cmd, extra, rows_fn in stages(ws):
+        if args.stages and name not in args.stages:
+            continue
+        rows = rows_fn(ctx)
+        runs = [run_stage(cmd, {**env_base, **extra}, os.path.join(ws, "logs", f"{name}.log"))
+                for _ in range(args.repeats)]
+        seconds = sorted(r[0] for r in runs)[len(runs) // 2]  # mediana
+        rss = max(r[1] for r in runs)
+        rc = max(r[2] for r in runs)
+        results.append({
+            "stage": name,
+            "rows": rows,
+            "seconds": round(seconds, 4),
+            "rows_per_s": round(rows / seconds, 1) if seconds > 0 else None,
+            "us_per_row": round(seconds * 1e6 / rows, 2) if rows else None,
+            "peak_rss_mb": round(rss, 1),
+            "returncode": rc,
+        })
+        status = "ok" if rc == 0 else f"FALHOU (rc={rc}, ver {ws}/logs/{name}.log)"
+        print(f"  {label:>10} {name:<20} {seconds:8.3f}s {rows:>9} linhas {rss:8.1f} MB  {status}", flush=True)
+
+    return {
+        "scale": label, "hosts": n_hosts, "items": n_items, "points": args.points,
+        "series": ts_info["series"], "ts_rows": ts_info["rows"], "trigger_rows": tr_info["rows"],
+        "injected": {"ts_spikes": ts_info["anomalies"], "ts_last_point": ts_info["last_point_anomalies"],
+                     "triggers": tr_info["anomalies"]},
+        "generate_seconds": round(gen_s, 3),
+        "total_seconds": round(sum(s["seconds"] for s in results), 4),
+        "stages": results,
+    }
+
+
+def compare(current, baseline, threshold, min_seconds):
+    """Lista de regressões (tempo/RSS) por (escala, estágio) presentes nos dois resultados."""
+    base = {(r["scale"], s["stage"]): s for r in baseline.get("runs", []) for s in r["stages"]}
+    out = []
+    for r in current["runs"]:
+        for s in r["stages"]:
+            b = base.get((r["scale"], s["stage"]))
+            if not b:
+                continue
+            dt = s["seconds"] - b["seconds"]
+            if b["seconds"] > 0 and dt > min_seconds and s["seconds"] > b["seconds"] * (1 + threshold):
+                out.append({"scale": r["scale"], "stage": s["stage"], "metric": "seconds",
+                            "baseline": b["seconds"], "current": s["seconds"], "ratio": round(s["seconds"] / b["seconds"], 2)})
+            if b.get("peak_rss_mb") and s["peak_rss_mb"] > b["peak_rss_mb"] * (1 + threshold):
+                out.append({"scale": r["scale"], "stage": s["stage"], "metric": "peak_rss_mb",
+                            "baseline": b["peak_rss_mb"], "current": s["peak_rss_mb"],
+                            "ratio": round(s["peak_rss_mb"] / b["peak_rss_mb"], 2)})
+            if s["returncode"] != 0 and b.get("returncode", 0) == 0:
+                out.append({"scale": r["scale"], "stage": s["stage"], "metric": "returncode",
+                            "baseline": 0, "current": s["returncode"], "ratio": None})
+    return out
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scales", default="5x2,20x2,50x4", help="lista de HOSTSxITENS separada por vírgula")
+    ap.add_argument("--points", type=int, default=180, help="amostras por série (passo de 60s)")
+    ap.add_argument("--triggers-per-host", type=int, default=20)
+    ap.add_argument("--anomaly-rate", type=float, default=0.01)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--repeats", type=int, default=1, help="execuções por estágio (usa a mediana); orchestrator/executor repetem sobre o estado"
+                         " deixado pela execução anterior")
+    ap.add_argument("--stages", default="", help="subconjunto de estágios (vírgula); vazio = todos")
+    ap.add_argument("--workdir", default=None, help="diretório de trabalho (padrão: temporário)")
+    ap.add_argument("--keep", action="store_true", help="mantém o diretório de trabalho")
+    ap.add_argument("--out", default="data/reports/benchmark_pipeline.json")
+    ap.add_argument("--compare", default=None, help="JSON de um resultado anterior")
+    ap.add_argument("--threshold", type=float, default=0.2, help="piora relativa tolerada (0.2 = 20%%)")
+    ap.add_argument("--min-seconds", type=float, default=0.05, help="ignora diferenças absolutas menores que isso")
+    ap.add_argument("--fail-on-regression", action="store_true")
+    args = ap.parse_args()
+    args.stages = [s for s in args.stages.split(",") if s]
+
+    work_root = args.workdir or tempfile.mkdtemp(prefix="bench-pipeline-")
+    os.makedirs(work_root, exist_ok=True)
+
+    result = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "dataset_format": os.getenv("DATASET_FORMAT", "parquet"),
+            "args": {k: v for k, v in vars(args).items() if k not in ("compare", "out")},
+        },
+        "runs": [],
+    }
+    try:
+        for scale in args.scales.split(","):
+            h, m = (int(x) for x in scale.lower().split("x"))
+            print(f"[bench] escala {scale}: {h} hosts x {m} itens, {args.points} pontos/série", flush=True)
+            result["runs"].append(run_scale(scale, h, m, args, work_root))
+    finally:
+        if not args.keep and not args.workdir:
+            shutil.rmtree(work_root, ignore_errors=True)
+
+    regressions = []
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(result, baseline, args.threshold, args.min_seconds)
+        result["comparison"] = {"baseline": args.compare, "baseline_commit": baseline.get("meta", {}).get("commit"),
+                                "threshold": args.threshold, "regressions": regressions}
+        if regressions:
+            print(f"[bench] {len(regressions)} regressão(ões) vs {args.compare}:")
+            for r in regressions:
+                print(f"  {r['scale']:>10} {r['stage']:<20} {r['metric']}: {r['baseline']} -> {r['current']}"
+                      + (f" (x{r['ratio']})" if r["ratio"] else ""))
+        else:
+            print(f"[bench] sem regressões vs {args.compare} (tolerância {args.threshold:.0%})")
+
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"[bench] resultados em {args.out}")
+
+    if args.fail_on_regression and regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
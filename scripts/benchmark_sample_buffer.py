@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# scripts/benchmark_sample_buffer.py
+# Memória e CPU do collector ao montar as séries de um ciclo:
+#   rows    um dict por ponto + time.strftime por amostra + pd.DataFrame(rows) (caminho antigo)
+#   buffer  infrastructure/sample_buffer.py: colunas tipadas, códigos internados, ts_iso vetorizado
+# As respostas do history.get são sintéticas (mesmo formato: lista de {"itemid","clock","value","ns"}).
+# Também confere que os dois caminhos gravam o mesmo dataset.
+
+import argparse, json, os, platform, random, sys, tempfile, time, tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import pandas as pd
+
+from infrastructure.dataset_io import read_dataset, write_dataset
+from infrastructure.sample_buffer import SampleBuffer
+
+PLACEHOLDERS = {"score": 0.0, "threshold": -0.1, "is_incident": False}
+
+
+def synthetic_history(n_items: int, points: int, seed: int):
+    rng = random.Random(seed)
+    now = int(time.time())
+    out = []
+    for i in range(n_items):
+        host, key = f"host-{i // 4:05d}", f"system.cpu.util[,k{i % 4}]"
+        start = now - points * 60 + rng.randrange(60)
+        hist = [{"itemid": str(10000 + i), "clock": str(start + j * 60), "value": f"{rng.random() * 100:.4f}",
+                 "ns": "0"} for j in range(points)]
+        out.append((host, key, hist))
+    return out
+
+
+def build_rows(batches, fetched_at):
+    rows = []
+    for host, key, hist in batches:
+        for p in hist:
+            ts = int(p["clock"])
+            rows.append({"ts": ts, "ts_iso": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(ts)),
+                         "host": host, "itemkey": key, "value": float(p.get("value", 0.0)),
+                         "collected_at": fetched_at})
+    df = pd.DataFrame(rows)
+    for k, v in PLACEHOLDERS.items():
+        df[k] = v
+    return df
+
+
+def build_buffer(batches, fetched_at):
+    buf = SampleBuffer()
+    for host, key, hist in batches:
+        buf.add_history(host, key, hist, fetched_at)
+    return buf.to_arrow(PLACEHOLDERS)
+
+
+def measure(fn, *args):
+    """Tempo sem tracemalloc (que distorce a CPU); pico de memória numa execução separada."""
+    t0 = time.perf_counter()
+    out = fn(*args)
+    secs = time.perf_counter() - t0
+    tracemalloc.start()
+    fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return out, secs, peak
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--items", default="1000,5000", help="itens (host x itemkey) por ciclo")
+    ap.add_argument("--points", type=int, default=300, help="pontos por item")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--out", default="data/reports/benchmark_sample_buffer.json")
+    args = ap.parse_args()
+
+    results = []
+    for n_items in [int(s) for s in args.items.split(",") if s]:
+        batches = synthetic_history(n_items, args.points, args.seed)
+        fetched_at = round(time.time(), 6)
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = {}
+            for name, fn in (("rows", build_rows), ("buffer", build_buffer)):
+                best_s, peak = float("inf"), 0
+                for _ in range(args.repeat):
+                    out, secs, pk = measure(fn, batches, fetched_at)
+                    best_s, peak = min(best_s, secs), max(peak, pk)
+                t0 = time.perf_counter()
+                paths[name] = write_dataset(out, os.path.join(tmp, name, "ts.csv"), "timeseries")
+                write_s = time.perf_counter() - t0
+                row = {"items": n_items, "samples": n_items * args.points, "path": name,
+                       "build_s": round(best_s, 4), "write_s": round(write_s, 4), "peak_mib": round(peak / 2**20, 1),
+                       "bytes_per_sample": round(peak / (n_items * args.points), 1)}
+                results.append(row)
+                print(f"[buffer] items={n_items:>6} {name:<7} build={row['build_s']:.3f}s write={row['write_s']:.3f}s "
+                      f"pico={row['peak_mib']:.1f} MiB ({row['bytes_per_sample']:.0f} B/amostra)")
+            a, b = (read_dataset(paths[k], schema="timeseries") for k in ("rows", "buffer"))
+            a = a[list(b.columns)]
+            if not a.equals(b):
+                print("[buffer][FALHA] datasets diferentes entre os dois caminhos")
+                sys.exit(1)
+
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump({"python": platform.python_version(), "platform": platform.platform(),
+                   "points": args.points, "results": results}, f, indent=2)
+    print(f"[buffer] resultados em {args.out}")
+
+
+if __name__ == "__main__":
+    main()
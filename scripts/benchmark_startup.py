@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# scripts/benchmark_startup.py
+# Tempo de partida a frio de cada agente (src/agents/<agente>/main.py) com `python -X importtime`.
+#
+# Cada agente é carregado num interpretador novo via runpy com __name__ != "__main__":
+# roda todo o código de módulo (imports, config, construção de objetos globais) mas não o
+# loop/job. Registra o tempo total de import, o tempo de parede e os módulos mais pesados
+# (tempo cumulativo do primeiro import de cada pacote raiz: pandas, sklearn, matplotlib...).
+#
+#   python scripts/benchmark_startup.py --out data/reports/startup.json
+#   python scripts/benchmark_startup.py --compare data/reports/startup.json --fail-on-regression
+#
+# --compare marca agentes cuja partida piorou mais que --threshold (e --min-ms) contra um
+# resultado anterior, e pacotes pesados que passaram a ser carregados na partida.
+
+import argparse, json, os, platform, subprocess, sys, time
+from datetime import datetime, timezone
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+SRC = os.path.join(ROOT, "src")
+AGENTS_DIR = os.path.join(SRC, "agents")
+
+_PROBE = "import runpy, sys; sys.argv = [sys.argv[1]]; runpy.run_path(sys.argv[0], run_name='__startup__')"
+
+
+def list_agents():
+    return sorted(d for d in os.listdir(AGENTS_DIR) if os.path.isfile(os.path.join(AGENTS_DIR, d, "main.py")))
+
+
+def parse_importtime(stderr: str):
+    """Linhas 'import time: self | cumulative | nome' -> lista de (profundidade, nome, self_us, cum_us)."""
+    out = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        out.append((depth, name.strip(), int(parts[0]), int(parts[1])))
+    return out
+
+
+def probe(agent: str, env: dict, baseline_modules: set):
+    path = os.path.join(AGENTS_DIR, agent, "main.py")
+    t0 = time.perf_counter()
+    p = subprocess.run([sys.executable, "-X", "importtime", "-c", _PROBE, path], env=env, cwd=ROOT,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    wall = time.perf_counter() - t0
+    entries = parse_importtime(p.stderr)
+    # módulos do próprio interpretador (site, encodings...) não contam para o agente
+    entries = [e for e in entries if e[1] not in baseline_modules]
+    import_us = sum(cum for depth, _, _, cum in entries if depth == 0)
+    packages = {name: cum for _, name, _, cum in entries if "." not in name}
+    return {
+        "wall_ms": round(wall * 1000, 1),
+        "import_ms": round(import_us / 1000, 1),
+        "modules": len(entries),
+        "packages": packages,
+        "returncode": p.returncode,
+        "error": p.stderr.strip().splitlines()[-1] if p.returncode else None,
+    }
+
+
+def interpreter_modules(env: dict) -> set:
+    """Módulos carregados pelo interpretador + runpy (o próprio probe), descontados de cada agente."""
+    p = subprocess.run([sys.executable, "-X", "importtime", "-c", "import runpy, pkgutil"], env=env,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    return {name for _, name, _, _ in parse_importtime(p.stderr)}
+
+
+def measure(agent: str, env: dict, repeats: int, top: int, baseline_modules: set):
+    runs = [probe(agent, env, baseline_modules) for _ in range(repeats)]
+    runs.sort(key=lambda r: r["import_ms"])
+    med = runs[len(runs) // 2]  # mediana
+    heavy = sorted(med["packages"].items(), key=lambda kv: kv[1], reverse=True)[:top]
+    return {
+        "agent": agent,
+        "import_ms": med["import_ms"],
+        "wall_ms": sorted(r["wall_ms"] for r in runs)[len(runs) // 2],
+        "modules": med["modules"],
+        "top_packages": [{"package": n, "ms": round(us / 1000, 1)} for n, us in heavy],
+        "loaded_packages": sorted(med["packages"]),
+        "returncode": med["returncode"],
+        "error": med["error"],
+    }
+
+
+def compare(current, baseline, threshold, min_ms, watch):
+    base = {r["agent"]: r for r in baseline.get("agents", [])}
+    out = []
+    for r in current["agents"]:
+        b = base.get(r["agent"])
+        if not b:
+            continue
+        if r["import_ms"] - b["import_ms"] > min_ms and r["import_ms"] > b["import_ms"] * (1 + threshold):
+            out.append({"agent": r["agent"], "metric": "import_ms", "baseline": b["import_ms"],
+                        "current": r["import_ms"], "ratio": round(r["import_ms"] / max(b["import_ms"], 0.1), 2)})
+        new_heavy = sorted(set(r["loaded_packages"]) & watch - set(b.get("loaded_packages", [])))
+        if new_heavy:
+            out.append({"agent": r["agent"], "metric": "new_heavy_imports", "baseline": None,
+                        "current": new_heavy, "ratio": None})
+        if r["returncode"] != 0 and b.get("returncode", 0) == 0:
+            out.append({"agent": r["agent"], "metric": "returncode", "baseline": 0,
+                        "current": r["returncode"], "ratio": None})
+    return out
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--agents", default="", help="subconjunto de agentes (vírgula); vazio = todos")
+    ap.add_argument("--repeats", type=int, default=5, help="execuções por agente (usa a mediana)")
+    ap.add_argument("--top", type=int, default=5, help="pacotes mais pesados listados por agente")
+    ap.add_argument("--out", default="data/reports/benchmark_startup.json")
+    ap.add_argument("--compare", default=None, help="JSON de um resultado anterior")
+    # tempo de import oscila bastante entre execuções (disco/CPU); a entrada de um pacote de
+    # --watch na partida é o sinal determinístico de regressão
+    ap.add_argument("--threshold", type=float, default=0.5, help="piora relativa tolerada (0.5 = 50%%)")
+    ap.add_argument("--min-ms", type=float, default=100.0, help="ignora diferenças absolutas menores que isso")
+    ap.add_argument("--watch", default="pandas,sklearn,matplotlib,scipy,pyarrow,joblib",
+                    help="pacotes pesados cuja entrada na partida é marcada como regressão")
+    ap.add_argument("--fail-on-regression", action="store_true")
+    args = ap.parse_args()
+    agents = [a for a in args.agents.split(",") if a] or list_agents()
+
+    env = dict(os.environ)
+    env.update({"PYTHONPATH": SRC, "METRICS_PORT": "0", "MPLBACKEND": "Agg"})
+    env.pop("PYTHONPROFILEIMPORTTIME", None)
+    baseline_modules = interpreter_modules(env)
+
+    result = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeats": args.repeats,
+        },
+        "agents": [],
+    }
+    print(f"{'agente':<22}{'import':>10}{'parede':>10}  mais pesados")
+    for agent in agents:
+        r = measure(agent, env, args.repeats, args.top, baseline_modules)
+        result["agents"].append(r)
+        heavy = ", ".join(f"{p['package']} {p['ms']:.0f}" for p in r["top_packages"])
+        status = "" if r["returncode"] == 0 else f"  FALHOU: {r['error']}"
+        print(f"{agent:<22}{r['import_ms']:>8.0f}ms{r['wall_ms']:>8.0f}ms  {heavy}{status}", flush=True)
+
+    regressions = []
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        watch = {w for w in args.watch.split(",") if w}
+        regressions = compare(result, baseline, args.threshold, args.min_ms, watch)
+        result["comparison"] = {"baseline": args.compare, "baseline_commit": baseline.get("meta", {}).get("commit"),
+                                "threshold": args.threshold, "regressions": regressions}
+        if regressions:
+            print(f"[startup] {len(regressions)} regressão(ões) vs {args.compare}:")
+            for r in regressions:
+                print(f"  {r['agent']:<22} {r['metric']}: {r['baseline']} -> {r['current']}"
+                      + (f" (x{r['ratio']})" if r["ratio"] else ""))
+        else:
+            print(f"[startup] sem regressões vs {args.compare} (tolerância {args.threshold:.0%})")
+
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"[startup] resultados em {args.out}")
+
+    if args.fail_on_regression and regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
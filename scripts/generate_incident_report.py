@@ -1,68 +1,17 @@
 #!/usr/bin/env python3
 # scripts/generate_incident_report.py
 # Gera relatório de INCIDENTES (RAISE_INCIDENT) a partir de pending/executed JSONL.
+#
+# Modo completo (padrão): reprocessa os JSONL inteiros num estado temporário.
+# Modo incremental (--incremental): lê só as linhas novas (offsets persistidos no
+# estado SQLite em --state) e atualiza tabela, Markdown e rollups por host/itemkey.
 
-import argparse, json, os, csv
-from datetime import datetime
+import argparse, json, os, sys, tempfile, time
 
-def read_jsonl(path):
-    rows = []
-    if not os.path.exists(path):
-        return rows
-    with open(path, "r", encoding="utf-8") as f:
-        for line in f:
-            line=line.strip()
-            if not line: 
-                continue
-            try:
-                rows.append(json.loads(line))
-            except json.JSONDecodeError:
-                continue
-    return rows
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
 
-def parse_pending(pending_rows):
-    """Extrai INCIDENTES do pending_actions.jsonl (type=='RAISE_INCIDENT')."""
-    out = []
-    for r in pending_rows:
-        if r.get("type") == "RAISE_INCIDENT":
-            out.append({
-                "id": r.get("id"),
-                "datetime": r.get("published_at") or r.get("ts_iso") or "",
-                "host": r.get("host"),
-                "itemkey": r.get("itemkey"),
-                "value": r.get("value"),
-                "score": r.get("score"),
-                "ts_iso": r.get("ts_iso"),
-                "status": "pending",
-            })
-    return out
+from infrastructure.incident_report import IncidentReportService
 
-def parse_executed(executed_rows):
-    """Extrai INCIDENTES do executed_actions.jsonl (action.type=='RAISE_INCIDENT')."""
-    out = []
-    for r in executed_rows:
-        act = r.get("action", {})
-        if act.get("type") == "RAISE_INCIDENT":
-            out.append({
-                "id": r.get("id"),
-                "datetime": r.get("ts_executed") or act.get("ts_iso") or "",
-                "host": act.get("host"),
-                "itemkey": act.get("itemkey"),
-                "value": act.get("value"),
-                "score": act.get("score"),
-                "ts_iso": act.get("ts_iso"),
-                "status": "executed",
-            })
-    return out
-
-def to_dt(s):
-    # tenta normalizar datas para ordenar
-    for fmt in ("%Y-%m-%dT%H:%M:%S.%fZ","%Y-%m-%dT%H:%M:%SZ","%Y%m%dT%H%M%SZ"):
-        try:
-            return datetime.strptime(s, fmt)
-        except Exception:
-            pass
-    return None
 
 def main():
     ap = argparse.ArgumentParser()
@@ -70,54 +19,45 @@ def main():
     ap.add_argument("--executed", default="data/actions/executed_actions.jsonl")
     ap.add_argument("--out-csv", default="data/reports/incidents_report.csv")
     ap.add_argument("--out-md", default="data/reports/incidents_report.md")
+    ap.add_argument("--out-rollups", default="data/reports/incidents_rollups.json")
+    ap.add_argument("--format", default="csv", choices=["csv", "parquet", "feather"],
+                    help="formato da tabela de incidentes (a extensão de --out-csv é ajustada)")
+    ap.add_argument("--incremental", action="store_true",
+                    help="continua a partir do estado persistido em --state")
+    ap.add_argument("--state", default="data/reports/.incidents_state.sqlite")
+    ap.add_argument("--rebuild", action="store_true", help="apaga o estado e reprocessa tudo")
+    ap.add_argument("--reservoir-size", type=int, default=512,
+                    help="amostras por host/itemkey para os percentis")
     args = ap.parse_args()
 
-    os.makedirs(os.path.dirname(args.out_csv), exist_ok=True)
-
-    pending = read_jsonl(args.pending)
-    executed = read_jsonl(args.executed)
-
-    rows_p = parse_pending(pending)
-    rows_e = parse_executed(executed)
-
-    # Dedup por (host, itemkey, ts_iso) mantendo executed > pending
-    merged_map = {}
-    for r in rows_p + rows_e:
-        key = (r["host"], r["itemkey"], r["ts_iso"])
-        # Se já existe e o novo é executed, sobrescreve
-        if key in merged_map and merged_map[key]["status"] == "pending" and r["status"] == "executed":
-            merged_map[key] = r
-        elif key not in merged_map:
-            merged_map[key] = r
-
-    merged = list(merged_map.values())
-
-    # Ordena por datetime asc
-    def sort_key(r):
-        dt = to_dt(r["datetime"])
-        return dt or datetime.max
-    merged.sort(key=sort_key)
-
-    # CSV
-    with open(args.out_csv, "w", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        w.writerow(["datetime","host","itemkey","value","score","ts_iso","status"])
-        for r in merged:
-            w.writerow([r["datetime"], r["host"], r["itemkey"], r["value"], r["score"], r["ts_iso"], r["status"]])
-
-    # Markdown (tabela resumida)
-    with open(args.out_md, "w", encoding="utf-8") as f:
-        f.write("# Incident Report (RAISE_INCIDENT)\n\n")
-        f.write(f"- Total: **{len(merged)}**\n\n")
-        f.write("| datetime | host | itemkey | value | score | ts_iso | status |\n")
-        f.write("|---|---|---|---:|---:|---|---|\n")
-        for r in merged:
-            f.write(f"| {r['datetime']} | {r['host']} | `{r['itemkey']}` | {r['value']:.6f} | {r['score']:.6f} | {r['ts_iso']} | {r['status']} |\n")
-
-    print(f"CSV salvo em: {args.out_csv}")
+    tmp_dir = None
+    if args.incremental:
+        state_path = args.state
+        if args.rebuild and os.path.exists(state_path):
+            os.remove(state_path)
+    else:
+        tmp_dir = tempfile.TemporaryDirectory(prefix="incidents-")
+        state_path = os.path.join(tmp_dir.name, "state.sqlite")
+
+    t0 = time.perf_counter()
+    report = IncidentReportService(state_path, reservoir_size=args.reservoir_size)
+    try:
+        counts = report.ingest(args.pending, args.executed)
+        out_table = report.write_table(args.out_csv, fmt=args.format)
+        report.write_markdown(args.out_md)
+        report.write_rollups(args.out_rollups)
+        total = report.total()
+    finally:
+        report.close()
+        if tmp_dir is not None:
+            tmp_dir.cleanup()
+
+    print(f"Tabela salva em: {out_table}")
     print(f"Markdown salvo em: {args.out_md}")
-    print(f"Total de INCIDENTES: {len(merged)}")
+    print(f"Rollups salvos em: {args.out_rollups}")
+    print(f"Total de INCIDENTES: {total}")
+    print(json.dumps({"mode": "incremental" if args.incremental else "full",
+                      "seconds": round(time.perf_counter() - t0, 3), **counts}))
 
 if __name__ == "__main__":
     main()
-
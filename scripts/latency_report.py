@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# scripts/latency_report.py
+# Quebra de latência ponta a ponta por estágio (p50/p95/p99) a partir de executed_actions.jsonl.
+#
+# Estágios (ver src/infrastructure/tracing.py):
+#   collect     clock da amostra -> coleta      analyze  coleta -> score
+#   publish     score -> ação publicada         queue    publicada -> início da execução
+#   execute     início -> fim da execução       end_to_end  clock da amostra -> fim
+#
+# Registros antigos (sem trace) entram com o que dá para reconstruir (ts, published_at,
+# ts_executed). O estágio com maior p95 é indicado como gargalo.
+
+import argparse, json, os, sys, time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from infrastructure.tracing import (STAGE_NAMES, UNATTRIBUTED, parse_ts, stage_latencies, summarize,
+                                    trace_from_record, unattributed)
+
+
+def _group_key(record: dict, by: str) -> str:
+    if not by:
+        return "all"
+    act = record.get("action") or {}
+    return str(act.get(by, record.get(by, "")) or "-")
+
+
+def collect(path: str, by: str = "", since: float = None):
+    """{grupo: {estágio: [latências]}} e contadores de leitura."""
+    groups = defaultdict(lambda: defaultdict(list))
+    stats = {"records": 0, "traced": 0, "invalid": 0, "skipped_since": 0}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:
+                stats["invalid"] += 1
+                continue
+            stats["records"] += 1
+            trace = trace_from_record(rec)
+            if since is not None and (trace.get("exec_end") or 0) < since:
+                stats["skipped_since"] += 1
+                continue
+            if "trace" in rec:
+                stats["traced"] += 1
+            lat = rec.get("latency_s") or stage_latencies(trace)
+            if UNATTRIBUTED not in lat:  # registros gravados antes do estágio "unattributed"
+                lat = dict(lat, **{UNATTRIBUTED: unattributed(lat)})
+            bucket = groups[_group_key(rec, by)]
+            for stage in STAGE_NAMES:
+                v = lat.get(stage)
+                if v is not None:
+                    bucket[stage].append(v)
+    return groups, stats
+
+
+def _fmt_s(v) -> str:
+    if v is None:
+        return "-"
+    return f"{v * 1000:.1f}ms" if v < 1 else f"{v:.2f}s"
+
+
+def print_table(report: dict):
+    for group, stages in report["groups"].items():
+        print(f"\n== {group} ==")
+        print(f"{'estágio':<12} {'n':>7} {'p50':>10} {'p95':>10} {'p99':>10} {'max':>10}")
+        for stage in STAGE_NAMES:
+            s = stages.get(stage, {"count": 0})
+            print(f"{stage:<12} {s['count']:>7} {_fmt_s(s.get('p50')):>10} {_fmt_s(s.get('p95')):>10} "
+                  f"{_fmt_s(s.get('p99')):>10} {_fmt_s(s.get('max')):>10}")
+        if stages.get("bottleneck"):
+            print(f"gargalo (maior p95): {stages['bottleneck']}")
+        if stages.get("unattributed_dominates"):
+            print(f"aviso: p95 de '{UNATTRIBUTED}' maior que o do gargalo — faltam carimbos no trace")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--executed", default="data/actions/executed_actions.jsonl")
+    ap.add_argument("--by", default="", choices=["", "source", "type", "host"],
+                    help="agrupa a quebra por um campo da ação")
+    ap.add_argument("--since", default=None,
+                    help="só execuções a partir deste instante (ISO-8601 ou epoch)")
+    ap.add_argument("--last-hours", type=float, default=None, help="atalho para --since agora-N horas")
+    ap.add_argument("--out", default=None, help="grava o resultado em JSON")
+    ap.add_argument("--json", action="store_true", help="imprime JSON em vez da tabela")
+    args = ap.parse_args()
+
+    if not os.path.exists(args.executed):
+        print(f"[latency] arquivo não encontrado: {args.executed}")
+        sys.exit(1)
+    since = parse_ts(args.since) if args.since else None
+    if args.last_hours is not None:
+        since = time.time() - args.last_hours * 3600
+
+    groups, stats = collect(args.executed, args.by, since)
+    report = {"source": args.executed, "since": since, **stats, "groups": {}}
+    for group, stages in sorted(groups.items()):
+        summary = {stage: summarize(stages.get(stage, [])) for stage in STAGE_NAMES}
+        # tempo não atribuído não é estágio: não vira gargalo, mas é sinalizado quando domina
+        candidates = [(summary[s]["p95"], s) for s in STAGE_NAMES
+                      if s not in ("end_to_end", UNATTRIBUTED) and summary[s]["count"]]
+        summary["bottleneck"] = max(candidates)[1] if candidates else None
+        gap = summary[UNATTRIBUTED]
+        summary["unattributed_dominates"] = bool(candidates and gap["count"] and gap["p95"] > max(candidates)[0])
+        report["groups"][group] = summary
+
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print(f"[latency] {stats['records']} execuções ({stats['traced']} com trace) em {args.executed}")
+        print_table(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+# scripts/render_training_plots.py
+# Renderiza os gráficos do último treino (ROC e matriz de confusão) a partir do
+# plot_data.json gravado pelo ml_trainer (infrastructure/training_plots.py).
+# Útil com TRAIN_RENDER_PLOTS=false, quando o job de treino não desenha os PNGs.
+
+import argparse, os, sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from infrastructure.training_plots import PLOT_DATA_FILE, render_plots
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--data", default=os.path.join("data", "reports", PLOT_DATA_FILE),
+                    help="plot_data.json gravado pelo treino")
+    ap.add_argument("--out-dir", default=None, help="diretório dos PNGs (padrão: o do plot_data.json)")
+    args = ap.parse_args()
+
+    if not os.path.exists(args.data):
+        print(f"[plots] {args.data} não encontrado (rode o ml_trainer antes)")
+        sys.exit(1)
+    for path in render_plots(args.data, args.out_dir):
+        print(f"[plots] {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# scripts/sharding_check.py
+# Verificação do modo shardado com vários processos locais (infrastructure/sharding.py):
+#   1. gera séries sintéticas e roda analyzer_timeseries uma vez sem shards (referência)
+#   2. roda SHARD_COUNT processos em paralelo (SHARD_INDEX=0..N-1) sobre os mesmos dados
+#   3. confere que cada host ficou em exatamente um shard (o seu dono) e que a união
+#      dos shards é igual à referência (mesmas séries, scores e flags)
+#   4. roda o orchestrator sobre os dois e confere que publica as mesmas ações
+#   5. mede o rebalanceamento N -> N+1 e N -> N-1 (hosts que mudam de dono) contra
+#      o mínimo teórico e contra hash módulo N
+# Sai com código 1 se alguma verificação falhar.
+
+import argparse, json, os, shutil, subprocess, sys, tempfile, time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+SRC = os.path.join(ROOT, "src")
+sys.path.insert(0, SRC)
+
+from infrastructure.dataset_io import read_dataset
+from infrastructure.sharding import host_key, shard_files, shard_of, read_sharded
+from infrastructure.synthetic_data import generate_timeseries, host_names
+
+ANALYZER = os.path.join(SRC, "agents", "analyzer_timeseries", "main.py")
+ORCHESTRATOR = os.path.join(SRC, "agents", "orchestrator", "main.py")
+
+
+def _env(**extra):
+    env = dict(os.environ)
+    env.update({"PYTHONPATH": SRC, "METRICS_PORT": "0", "MPLBACKEND": "Agg"})
+    env.update({k: str(v) for k, v in extra.items()})
+    return env
+
+
+def run_parallel(jobs, log_dir):
+    """Dispara todos os processos de uma vez e espera; retorna (segundos, códigos de saída)."""
+    t0 = time.perf_counter()
+    procs = []
+    for name, cmd, env in jobs:
+        log = open(os.path.join(log_dir, f"{name}.log"), "w")
+        procs.append((subprocess.Popen([sys.executable] + cmd, env=env, stdout=log, stderr=subprocess.STDOUT,
+                                       cwd=ROOT), log))
+    codes = []
+    for p, log in procs:
+        codes.append(p.wait())
+        log.close()
+    return time.perf_counter() - t0, codes
+
+
+def published_ids(path):
+    if not os.path.exists(path):
+        return set()
+    with open(path) as f:
+        return {json.loads(l)["id"] for l in f if l.strip()}
+
+
+def rebalance(n_hosts, count):
+    """Fração de hosts que muda de dono ao ir de count para count+1 e count-1."""
+    names = host_names(n_hosts)
+    keys = [host_key(h) for h in names]
+    out = {}
+    for new in (count + 1, count - 1):
+        if new < 1:
+            continue
+        moved = sum(shard_of(h, count) != shard_of(h, new) for h in names)
+        moved_mod = sum(k % count != k % new for k in keys)
+        out[f"{count}->{new}"] = {
+            "moved": round(moved / n_hosts, 4),
+            "minimum": round(abs(new - count) / max(new, count), 4),
+            "modulo_hash": round(moved_mod / n_hosts, 4),
+        }
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--shards", type=int, default=3)
+    ap.add_argument("--hosts", type=int, default=24)
+    ap.add_argument("--items", type=int, default=2)
+    ap.add_argument("--points", type=int, default=120)
+    ap.add_argument("--rebalance-hosts", type=int, default=20000, help="população para medir o rebalanceamento")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--workdir", default=None)
+    ap.add_argument("--keep", action="store_true")
+    args = ap.parse_args()
+
+    ws = args.workdir or tempfile.mkdtemp(prefix="sharding-")
+    raw = os.path.join(ws, "raw", "timeseries")
+    logs = os.path.join(ws, "logs")
+    os.makedirs(logs, exist_ok=True)
+    failures = []
+    report = {"shards": args.shards, "hosts": args.hosts, "items": args.items}
+    try:
+        info = generate_timeseries(raw, args.hosts, args.items, args.points, seed=args.seed)
+        print(f"[shard] {info['series']} séries sintéticas em {raw}")
+
+        base_out = os.path.join(ws, "single", "anomalies_timeseries.csv")
+        shard_out = os.path.join(ws, "sharded", "anomalies_timeseries.csv")
+        secs_single, codes = run_parallel([("single", [ANALYZER], _env(TS_INPUT_DIR=raw, TS_OUTPUT_CSV=base_out))], logs)
+        secs_sharded, codes_sh = run_parallel([
+            (f"shard-{i}", [ANALYZER], _env(TS_INPUT_DIR=raw, TS_OUTPUT_CSV=shard_out,
+                                            SHARD_INDEX=i, SHARD_COUNT=args.shards))
+            for i in range(args.shards)], logs)
+        report.update({"single_s": round(secs_single, 2), "sharded_parallel_s": round(secs_sharded, 2)})
+        if any(codes + codes_sh):
+            failures.append(f"processo com erro (códigos {codes + codes_sh}; ver {logs})")
+
+        # 3. cada host em exatamente um shard, o dono
+        files = shard_files(shard_out)
+        report["shard_files"] = [os.path.basename(f) for f in files]
+        if len(files) != args.shards:
+            failures.append(f"esperados {args.shards} arquivos de shard, encontrados {len(files)}")
+        seen = {}
+        for f in files:
+            idx = int(os.path.basename(f).split(".shard-")[1].split("-of-")[0])
+            for host in read_dataset(f, columns=["host"])["host"].unique():
+                if host in seen:
+                    failures.append(f"host {host} em dois shards ({seen[host]} e {idx})")
+                seen[host] = idx
+                if shard_of(host, args.shards) != idx:
+                    failures.append(f"host {host} no shard {idx}, dono é {shard_of(host, args.shards)}")
+        report["hosts_per_shard"] = [sum(1 for v in seen.values() if v == i) for i in range(args.shards)]
+
+        # união == referência
+        key = ["host", "itemkey", "ts"]
+        single = read_sharded(base_out).sort_values(key).reset_index(drop=True)
+        merged = read_sharded(shard_out).sort_values(key).reset_index(drop=True)
+        cols = ["host", "itemkey", "ts", "value", "score", "is_incident"]
+        if len(single) != len(merged) or not single[cols].equals(merged[cols]):
+            failures.append(f"união dos shards difere da referência ({len(merged)} x {len(single)} linhas)")
+        report["rows"] = len(merged)
+
+        # 4. orchestrator sobre os dois layouts
+        ids = {}
+        for label, ts_input in (("single", base_out), ("sharded", shard_out)):
+            pending = os.path.join(ws, label, "pending_actions.jsonl")
+            run_parallel([(f"orchestrator-{label}", [ORCHESTRATOR], _env(
+                ORCH_INPUT=os.path.join(ws, "none.csv"), ORCH_TS_INPUT=ts_input, ORCH_LOOP_ENABLED="false",
+                ORCH_STATE_PATH=os.path.join(ws, label, ".orch_state.json"), ACTIONS_PENDING=pending,
+                ACTIONS_EXECUTED=os.path.join(ws, label, "executed_actions.jsonl")))], logs)
+            ids[label] = published_ids(pending)
+        report["actions"] = {k: len(v) for k, v in ids.items()}
+        if ids["single"] != ids["sharded"]:
+            failures.append(f"ações diferentes: {len(ids['single'] ^ ids['sharded'])} fora da interseção")
+
+        # 5. rebalanceamento
+        report["rebalance"] = rebalance(args.rebalance_hosts, args.shards)
+        for step, r in report["rebalance"].items():
+            if r["moved"] > r["minimum"] * 1.1 + 0.01:
+                failures.append(f"rebalanceamento {step} moveu {r['moved']:.2%} (mínimo {r['minimum']:.2%})")
+    finally:
+        if not args.keep and not args.workdir:
+            shutil.rmtree(ws, ignore_errors=True)
+
+    report["ok"] = not failures
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    for f in failures:
+        print(f"[shard][FALHA] {f}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
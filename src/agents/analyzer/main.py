@@ -1,19 +1,45 @@
 import os
 from infrastructure.preprocessing_service import PreprocessingService
 from infrastructure.labeling_service import LabelingService
+from infrastructure.pipeline import Pipeline, Stage
+from infrastructure.metrics import AgentMetrics
+
+def _checkpoint(env_name, path, default="false"):
+    # checkpoint em disco opcional por estágio
+    return path if os.getenv(env_name, default).lower() == "true" else None
 
 def main():
+    metrics = AgentMetrics("analyzer")
     input_file = os.getenv("INPUT_FILE", "/data/processed/anomalies_dataset.csv")
     processed_file = os.getenv("PROCESSED_FILE", "/data/processed/dataset_ready.csv")
     labeled_file = os.getenv("LABELED_FILE", "/data/processed/dataset_labeled.csv")
+    scaler_file = os.getenv("SCALER_FILE", "/data/models/preprocessing_scaler.json")
+
+    # 1 - Pré-processamento (ETL): scaler ajustado uma vez e reaproveitado
+    preprocessing = PreprocessingService(
+        input_file,
+        processed_file,
+        scaler_file,
+        chunksize=int(os.getenv("PREPROC_CHUNKSIZE", "50000")),
+        refit=os.getenv("PREPROC_REFIT", "false").lower() == "true",
+    )
 
-    # 1 - Pré-processamento (ETL)
-    preprocessing = PreprocessingService(input_file, processed_file)
-    preprocessing.run()
+    # 2 - Criação dos labels (vetorizada)
+    labeling = LabelingService()
 
-    # 2 - Criação dos labels
-    labeling = LabelingService(processed_file, labeled_file)
-    labeling.run()
+    # Cada chunk passa por preprocess -> label em memória e é gravado incrementalmente
+    # (memória limitada a PREPROC_CHUNKSIZE linhas); só o dataset rotulado (consumido
+    # pelo trainer/orchestrator) é gravado por padrão
+    with metrics.cycle():
+        pipeline = Pipeline([
+            Stage("preprocess", preprocessing.chunk_transformer(preprocessing.resolve_params()),
+                  _checkpoint("CHECKPOINT_PROCESSED", processed_file), schema="triggers_processed"),
+            Stage("label", labeling.label_frame,
+                  _checkpoint("CHECKPOINT_LABELED", labeled_file, default="true"), schema="triggers_processed"),
+        ], name="analyzer", metrics=metrics)
+        pipeline.run_stream(preprocessing.iter_input())
+    metrics.rows_read("anomalies_dataset", preprocessing.rows_in)
+    metrics.linger()
 
 if __name__ == "__main__":
     main()
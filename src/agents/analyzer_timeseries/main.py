@@ -1,11 +1,15 @@
 # src/agents/analyzer_timeseries/main.py
 import os
+import csv
 import glob
 import time
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-from sklearn.ensemble import IsolationForest
+from infrastructure.dataset_io import write_dataset
+from infrastructure.metrics import AgentMetrics, start_metrics_server
+from infrastructure.seasonal_baseline import BaselineStore
+from infrastructure.sharding import ShardConfig
 
 RAW_DIR = os.getenv("TS_INPUT_DIR", "/data/raw/timeseries")
 OUTPUT = os.getenv("TS_OUTPUT_CSV", "/data/processed/anomalies_timeseries.csv")
@@ -17,8 +21,23 @@ ROLL_N = int(os.getenv("TS_ROLL_N", "5"))
 # threshold do score (mais baixo = mais sensível; IsolationForest usa decision_function)
 THRESHOLD = float(os.getenv("TS_THRESHOLD", "-0.1"))
 
+# Baseline sazonal por hora da semana (gravada pelo agente baseline_builder):
+#   auto    -> pontua o último ponto contra a baseline (lookup O(1)); séries/horas sem
+#              histórico suficiente caem para o IsolationForest na janela
+#   iforest -> ignora a baseline
+SCORER = os.getenv("TS_SCORER", "auto").lower()
+BASELINE_PATH = os.getenv("TS_BASELINE_PATH", "/data/models/seasonal_baseline.npz")
+BASELINE_Z = float(os.getenv("TS_BASELINE_Z", "4.0"))                # |z robusto| que vira incidente
+BASELINE_MIN_COUNT = int(os.getenv("TS_BASELINE_MIN_COUNT", "30"))   # amostras mínimas no bucket
+
+# Sharding por host (SHARD_INDEX de SHARD_COUNT): pontua só as séries dos seus hosts
+# e grava em OUTPUT.shard-<i>-of-<n>; o orchestrator lê a união dos shards.
+SHARD = ShardConfig.from_env()
+
 os.makedirs(os.path.dirname(OUTPUT), exist_ok=True)
 
+metrics = AgentMetrics("analyzer_timeseries", serve=False)
+
 def build_features(df: pd.DataFrame) -> pd.DataFrame:
     """
     df com colunas: ts, value, host, itemkey (ordenado por ts)
@@ -41,16 +60,21 @@ def detect_last_point_anomaly(df: pd.DataFrame) -> dict:
     if len(df) < max(ROLL_N, 10):
         return {"score": None, "is_incident": False, "reason": "pouca_amostra"}
 
+    # sklearn só é carregado quando há série para pontuar (~1s de import na partida)
+    from sklearn.ensemble import IsolationForest
+
     feats = df[["value", "rolling_mean", "rolling_std", "diff", "zscore_rolling"]].values
     model = IsolationForest(
         n_estimators=200,
         contamination="auto",
         random_state=42
     )
-    model.fit(feats)
+    with metrics.model_fit("isolation_forest"):
+        model.fit(feats)
 
     # decision_function: > 0 mais normal; < 0 aponta anomalia
-    scores = model.decision_function(feats)
+    with metrics.model_score("isolation_forest"):
+        scores = model.decision_function(feats)
     last_score = float(scores[-1])
     return {
         "score": last_score,
@@ -58,29 +82,65 @@ def detect_last_point_anomaly(df: pd.DataFrame) -> dict:
         "reason": f"decision_function<= {THRESHOLD}"
     }
 
+def series_host(path: str):
+    """Host da série (coluna host da primeira linha; o nome do arquivo não separa host/itemkey sem ambiguidade)."""
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header, row = next(reader, None), next(reader, None)
+    if not header or not row or "host" not in header:
+        return None
+    return row[header.index("host")]
+
 def main():
+    with metrics.cycle():
+        run()
+    metrics.linger()
+
+def run():
     now = int(time.time())
     window_from = now - WINDOW_MIN * 60
 
     rows_out = []
+    baseline = BaselineStore(BASELINE_PATH).get() if SCORER == "auto" else None
+    if baseline is not None:
+        print(f"[analyzer-ts] baseline sazonal: {len(baseline)} séries ({BASELINE_PATH}), |z| >= {BASELINE_Z}")
     files = glob.glob(os.path.join(RAW_DIR, "*.csv"))
-    print(f"[analyzer-ts] lendo {len(files)} séries em {RAW_DIR}, janela {WINDOW_MIN} min...")
+    if SHARD.enabled:
+        files = [p for p in files if (h := series_host(p)) is not None and SHARD.owns(h)]
+    print(f"[analyzer-ts] lendo {len(files)} séries em {RAW_DIR} ({SHARD}), janela {WINDOW_MIN} min...")
 
     for path in files:
         try:
-            df = pd.read_csv(path)
+            df = pd.read_csv(path, usecols=lambda c: c in {"ts", "value", "host", "itemkey", "collected_at"})
+            metrics.rows_read("raw_timeseries", len(df))
             if not {"ts", "value", "host", "itemkey"}.issubset(df.columns):
                 continue
             df = df[df["ts"] >= window_from]
             if df.empty:
                 continue
 
-            df_feat = build_features(df)
-            res = detect_last_point_anomaly(df_feat)
-            if res["score"] is None:
-                continue
+            # 1) baseline sazonal: lookup + comparação só do último ponto
+            last = df.iloc[int(df["ts"].to_numpy().argmax())]
+            res = baseline.score(str(last["host"]), str(last["itemkey"]), int(last["ts"]), float(last["value"]),
+                                 min_count=BASELINE_MIN_COUNT) if baseline is not None else None
+            if res is not None:
+                z = res["z"]
+                res = {"score": -abs(z), "threshold": -BASELINE_Z, "is_incident": abs(z) >= BASELINE_Z,
+                       "scorer": "baseline", "baseline_z": z}
+            else:
+                # 2) IsolationForest na janela
+                df = build_features(df)
+                res = detect_last_point_anomaly(df)
+                if res["score"] is None:
+                    continue
+                res.update(threshold=THRESHOLD, scorer="iforest", baseline_z=np.nan)
+                last = df.iloc[-1]
+            scored_at = time.time()
 
-            last = df_feat.iloc[-1]
+            # tracing: coluna collected_at (gravada na coleta) ou, na falta, o mtime do arquivo
+            collected_at = last["collected_at"] if "collected_at" in df.columns else np.nan
+            if pd.isna(collected_at):
+                collected_at = os.path.getmtime(path)
             rows_out.append({
                 "ts": int(last["ts"]),
                 "ts_iso": datetime.utcfromtimestamp(int(last["ts"])).isoformat()+"Z",
@@ -88,19 +148,26 @@ def main():
                 "itemkey": str(last["itemkey"]),
                 "value": float(last["value"]),
                 "score": float(res["score"]),
-                "threshold": THRESHOLD,
-                "is_incident": bool(res["is_incident"])
+                "threshold": res["threshold"],
+                "is_incident": bool(res["is_incident"]),
+                "collected_at": round(float(collected_at), 6),
+                "scored_at": round(scored_at, 6),
+                "scorer": res["scorer"],
+                "baseline_z": res["baseline_z"]
             })
         except Exception as e:
             print(f"[analyzer-ts] erro em {path}: {e}")
 
     if rows_out:
         df_out = pd.DataFrame(rows_out).sort_values(["host","itemkey","ts"])
-        df_out.to_csv(OUTPUT, index=False)
-        print(f"[analyzer-ts] resultados -> {OUTPUT} (n={len(df_out)})")
+        out = write_dataset(df_out, SHARD.path(OUTPUT), "timeseries")
+        metrics.rows_written("timeseries", len(df_out))
+        print(f"[analyzer-ts] resultados -> {out} (n={len(df_out)}, "
+              f"baseline={int((df_out['scorer'] == 'baseline').sum())})")
     else:
         print("[analyzer-ts] sem resultados (amostras insuficientes ou sem arquivos).")
 
 if __name__ == "__main__":
+    start_metrics_server()
     main()
 
@@ -0,0 +1,41 @@
+# src/agents/baseline_builder/main.py
+# Agente de baselines sazonais: a cada TS_BASELINE_REBUILD_SEC relê o histórico longo das
+# séries (TS_INPUT_DIR, últimos TS_BASELINE_DAYS dias), recalcula mediana/MAD/quantis por
+# (host, itemkey, hora da semana) e grava TS_BASELINE_PATH com troca atômica.
+# O analyzer_timeseries só faz lookup na versão pronta (infrastructure/seasonal_baseline.py).
+
+import os
+import json
+import time
+from infrastructure.metrics import AgentMetrics
+from infrastructure.seasonal_baseline import BaselineRebuilder
+
+RAW_DIR       = os.getenv("TS_INPUT_DIR", "/data/raw/timeseries")
+BASELINE_PATH = os.getenv("TS_BASELINE_PATH", "/data/models/seasonal_baseline.npz")
+# 4 semanas a 1 amostra/min -> ~240 amostras por bucket (hora da semana), folga sobre
+# o TS_BASELINE_MIN_COUNT=30 do analyzer_timeseries
+HISTORY_DAYS  = float(os.getenv("TS_BASELINE_DAYS", "28"))
+REBUILD_SEC   = float(os.getenv("TS_BASELINE_REBUILD_SEC", "3600"))
+
+
+def main():
+    metrics = AgentMetrics("baseline_builder")
+    rebuilder = BaselineRebuilder(RAW_DIR, BASELINE_PATH, history_days=HISTORY_DAYS)
+    print(f"[baseline] iniciado: {RAW_DIR} ({HISTORY_DAYS:g} dias) -> {BASELINE_PATH}, "
+          f"a cada {REBUILD_SEC:g}s", flush=True)
+
+    while True:
+        try:
+            with metrics.cycle():
+                info = rebuilder.run_once()
+                metrics.observe_stage("build", info["build_s"])
+                metrics.rows_written("seasonal_baseline", info["series"])
+            print(json.dumps(info), flush=True)
+        except Exception as e:
+            # não derruba o serviço: a baseline anterior continua valendo
+            print(f"[baseline][warn] falha na reconstrução: {e}", flush=True)
+        time.sleep(REBUILD_SEC)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,48 +7,69 @@ import time
 import sys
 import pandas as pd
 from pyzabbix import ZabbixAPI, ZabbixAPIException
+from infrastructure.dataset_io import write_dataset
+from infrastructure.metrics import AgentMetrics, start_metrics_server
+from infrastructure.sample_buffer import SampleBuffer
+from infrastructure.sharding import ShardConfig
 
 # ================== Config ==================
 ZABBIX_URL  = os.getenv("ZABBIX_URL",  "http://zabbix-web:8080")
 ZABBIX_USER = os.getenv("ZABBIX_USER", "Admin")
 ZABBIX_PASS = os.getenv("ZABBIX_PASS", "zabbix")
 
-# Onde salvar (mantemos os mesmos caminhos para não quebrar o pipeline):
-OUT_TABULAR = "/data/processed/anomalies_dataset.csv"
-OUT_TS      = "/data/processed/anomalies_timeseries.csv"
+# Onde salvar (caminhos lógicos; a extensão segue DATASET_FORMAT, ver infrastructure/dataset_io.py):
+OUT_TABULAR = os.getenv("OUT_TABULAR", "/data/processed/anomalies_dataset.csv")
+OUT_TS      = os.getenv("OUT_TS", "/data/processed/anomalies_timeseries.csv")
 
 # Streaming: intervalo e janela
 COLLECT_INTERVAL_SEC = int(os.getenv("COLLECT_INTERVAL_SEC", "30"))  # ex.: 30s
 ZBX_WINDOW_MIN = int(os.getenv("ZBX_WINDOW_MIN", "5"))               # últimos 5 minutos
 
+# Sharding por host (SHARD_INDEX de SHARD_COUNT, ver infrastructure/sharding.py):
+# cada instância coleta só os seus hosts e grava em OUT_TS.shard-<i>-of-<n>.
+# As triggers vêm de uma única chamada trigger.get e ficam com o shard 0.
+SHARD = ShardConfig.from_env()
+
 # Quais itens de série temporal coletar por host (mantemos simples)
 CPU_KEYS = [
     "system.cpu.util[,system]",
     "system.cpu.util[,user]"
 ]
 
+# Métricas Prometheus (GET /metrics em METRICS_PORT)
+metrics = AgentMetrics("collector", serve=False)
+
 # ================== Funções ==================
 def connect_zabbix():
-    zapi = ZabbixAPI(ZABBIX_URL)
-    zapi.login(ZABBIX_USER, ZABBIX_PASS)
+    with metrics.api_call("zabbix", "user.login"):
+        zapi = ZabbixAPI(ZABBIX_URL)
+        zapi.login(ZABBIX_USER, ZABBIX_PASS)
     return zapi
 
 def collect_triggers(zapi: ZabbixAPI) -> pd.DataFrame:
-    triggers_all = zapi.trigger.get(
-        output=["triggerid", "description", "priority", "lastchange"],
-        selectHosts=["hostid", "name"]
-    ) or []
+    with metrics.api_call("zabbix", "trigger.get"):
+        triggers_all = zapi.trigger.get(
+            output=["triggerid", "description", "priority", "lastchange"],
+            selectHosts=["hostid", "name"]
+        ) or []
     df = pd.DataFrame(triggers_all)
+    # tracing: momento da resposta do trigger.get (lastchange -> collected_at = estágio "collect")
+    df["collected_at"] = round(time.time(), 6)
     return df
 
-def collect_timeseries(zapi: ZabbixAPI) -> pd.DataFrame:
+# Colunas placeholder esperadas pelo orchestrator (o analyzer_timeseries/IF recalcula depois)
+TS_PLACEHOLDERS = {"score": 0.0, "threshold": -0.1, "is_incident": False}
+
+def collect_timeseries(zapi: ZabbixAPI) -> SampleBuffer:
     """
     Busca itens de CPU por host e agrega últimas leituras (ZBX_WINDOW_MIN).
-    Estratégia simples: pegar últimos pontos (history.get) e montar um dataframe.
+    Os pontos do history.get vão direto para um buffer colunar (infrastructure/sample_buffer.py).
     """
     # Descobrir hosts
-    hosts = zapi.host.get(output=["hostid", "name"]) or []
-    rows = []
+    with metrics.api_call("zabbix", "host.get"):
+        hosts = zapi.host.get(output=["hostid", "name"]) or []
+    hosts = [h for h in hosts if SHARD.owns(h["name"])]
+    buf = SampleBuffer()
     now = int(time.time())
     since = now - (ZBX_WINDOW_MIN * 60)
 
@@ -57,7 +78,8 @@ def collect_timeseries(zapi: ZabbixAPI) -> pd.DataFrame:
         hostnm = h["name"]
 
         # Descobre itens do host que batem com nossas keys
-        items = zapi.item.get(hostids=hostid, search={"key_": "system.cpu.util"}, output=["itemid", "name", "key_"]) or []
+        with metrics.api_call("zabbix", "item.get"):
+            items = zapi.item.get(hostids=hostid, search={"key_": "system.cpu.util"}, output=["itemid", "name", "key_"]) or []
 
         # Filtra só as chaves desejadas
         for it in items:
@@ -68,53 +90,36 @@ def collect_timeseries(zapi: ZabbixAPI) -> pd.DataFrame:
             key = it["key_"]
 
             # history.get: value_type 0 (float) costuma cobrir CPU util; se necessário adaptar
-            hist = zapi.history.get(
-                history=0,
-                itemids=iid,
-                time_from=since,
-                time_till=now,
-                sortfield="clock",
-                sortorder="ASC"
-            ) or []
-
-            for p in hist:
-                ts = int(p["clock"])
-                val = float(p.get("value", 0.0))
-                rows.append({
-                    "ts": ts,
-                    "ts_iso": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(ts)),
-                    "host": hostnm,
-                    "itemkey": key,
-                    "value": val
-                })
-
-    df = pd.DataFrame(rows)
-    if df.empty:
-        return df
-
-    # Score simples (placeholder) — aqui seu analyzer_timeseries/IF pode recalcular depois.
-    # Mantemos as colunas esperadas pelo orchestrator.
-    df["score"] = 0.0
-    df["threshold"] = -0.1
-    df["is_incident"] = False
-    return df
-
-def write_csv_safely(df: pd.DataFrame, path: str):
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    # Escreve de forma atômica simples (evita arquivo vazio durante escrita)
-    tmp = path + "._tmp"
-    df.to_csv(tmp, index=False)
-    os.replace(tmp, path)
+            with metrics.api_call("zabbix", "history.get"):
+                hist = zapi.history.get(
+                    history=0,
+                    itemids=iid,
+                    time_from=since,
+                    time_till=now,
+                    sortfield="clock",
+                    sortorder="ASC"
+                ) or []
+            # tracing: momento em que as amostras chegaram (clock -> collected_at = estágio "collect")
+            fetched_at = round(time.time(), 6)
+            buf.add_history(hostnm, key, hist, fetched_at)
+
+    return buf
+
+def write_safely(df, path: str, schema: str) -> str:
+    # Escrita atômica (evita arquivo vazio durante escrita) no formato tipado configurado
+    return write_dataset(df, path, schema)
 
 # ================== Main (streaming) ==================
 if __name__ == "__main__":
+    start_metrics_server()
+
     # Primeiro: tenta conectar (com tolerância)
     start = time.time()
     timeout = 120
     while True:
         try:
             zapi = connect_zabbix()
-            print(f"[collector] Conectado ao Zabbix API: {ZABBIX_URL}")
+            print(f"[collector] Conectado ao Zabbix API: {ZABBIX_URL} ({SHARD})")
             break
         except ZabbixAPIException as e:
             if time.time() - start > timeout:
@@ -127,21 +132,27 @@ if __name__ == "__main__":
     while True:
         cycle_t0 = time.time()
         try:
-            # 1) Triggers (tabular)
-            df_tr = collect_triggers(zapi)
-            if not df_tr.empty:
-                write_csv_safely(df_tr, OUT_TABULAR)
-                print(f"[collector] triggers -> {OUT_TABULAR} (rows={len(df_tr)})")
-            else:
-                print("[collector] triggers vazias (nada a escrever)")
-
-            # 2) Séries temporais recentes
-            df_ts = collect_timeseries(zapi)
-            if not df_ts.empty:
-                write_csv_safely(df_ts, OUT_TS)
-                print(f"[collector] timeseries (últimos {ZBX_WINDOW_MIN} min) -> {OUT_TS} (rows={len(df_ts)})")
-            else:
-                print(f"[collector] timeseries vazias (janela {ZBX_WINDOW_MIN} min)")
+            with metrics.cycle():
+                # 1) Triggers (tabular) — só no shard 0
+                df_tr = collect_triggers(zapi) if SHARD.index == 0 else pd.DataFrame()
+                metrics.rows_read("triggers", len(df_tr))
+                if not df_tr.empty:
+                    out = write_safely(df_tr, OUT_TABULAR, "triggers")
+                    metrics.rows_written("triggers", len(df_tr))
+                    print(f"[collector] triggers -> {out} (rows={len(df_tr)})")
+                elif SHARD.index == 0:
+                    print("[collector] triggers vazias (nada a escrever)")
+
+                # 2) Séries temporais recentes
+                buf = collect_timeseries(zapi)
+                metrics.rows_read("timeseries", len(buf))
+                if not buf.empty:
+                    out = write_safely(buf.to_arrow(TS_PLACEHOLDERS), SHARD.path(OUT_TS), "timeseries")
+                    metrics.rows_written("timeseries", len(buf))
+                    print(f"[collector] timeseries (últimos {ZBX_WINDOW_MIN} min) -> {out} "
+                          f"(rows={len(buf)}, {buf.nbytes / 1024:.0f} KiB)")
+                else:
+                    print(f"[collector] timeseries vazias (janela {ZBX_WINDOW_MIN} min)")
 
         except Exception as e:
             # Não cai o container; apenas loga e segue
@@ -0,0 +1,30 @@
+# src/agents/dashboard_api/main.py
+# API de dados dos dashboards (docs/timeseries.html e docs/incident_dashboard.html):
+# séries reduzidas para a largura do gráfico + agregados de ações/incidentes, com cache.
+
+import os
+from infrastructure.dashboard_data import DashboardDataService, DashboardServer
+
+
+def main():
+    service = DashboardDataService(
+        ts_path=os.getenv("DASHBOARD_TS_INPUT", "/data/processed/anomalies_timeseries.csv"),
+        pending_path=os.getenv("ACTIONS_PENDING", "/data/actions/pending_actions.jsonl"),
+        executed_path=os.getenv("ACTIONS_EXECUTED", "/data/actions/executed_actions.jsonl"),
+        incident_state_path=os.getenv("INCIDENT_STATE_PATH", "/data/reports/.incidents_state.sqlite") or None,
+        cache_size=int(os.getenv("DASHBOARD_CACHE_SIZE", "512")),
+        max_width=int(os.getenv("DASHBOARD_MAX_WIDTH", "4000")),
+    )
+    server = DashboardServer(
+        service,
+        host=os.getenv("DASHBOARD_HOST", "0.0.0.0"),
+        port=int(os.getenv("DASHBOARD_PORT", "8090")),
+        static_dir=os.getenv("DASHBOARD_STATIC_DIR") or None,
+    )
+    host, port = server.address[:2]
+    print(f"[dashboard-api] servindo em http://{host}:{port}", flush=True)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,10 @@
 import os
 import json
+import time
 from infrastructure.action_bus import ActionBus
+from infrastructure.metrics import AgentMetrics
+from infrastructure.tracing import stamp
+from infrastructure.scheduler import load_plan, order_by_plan
 
 def simulate_ack_trigger(action: dict) -> dict:
     """
@@ -21,24 +25,52 @@ def simulate_ack_trigger(action: dict) -> dict:
 def main():
     pending_path = os.getenv("ACTIONS_PENDING", "/data/actions/pending_actions.jsonl")
     executed_path = os.getenv("ACTIONS_EXECUTED", "/data/actions/executed_actions.jsonl")
+    # plano do scheduler (agents/quantum); vazio, ausente ou velho demais = ordem FIFO
+    plan_path = os.getenv("EXEC_PLAN_PATH", "")
+    plan_max_age = float(os.getenv("EXEC_PLAN_MAX_AGE_SEC", "600"))
+    batch_pause = float(os.getenv("EXEC_BATCH_PAUSE_SEC", "0"))  # intervalo entre lotes do plano
 
+    metrics = AgentMetrics("executor")
     bus = ActionBus(pending_path, executed_path)
-    actions = bus.pop_all_pending()
 
     executed = 0
-    for action in actions:
-        atype = action.get("type", "UNKNOWN")
-        if atype == "ACK_TRIGGER":
-            result = simulate_ack_trigger(action)
-        else:
-            result = {"status": "SKIPPED", "message": f"Tipo de ação não suportado: {atype}"}
-        bus.mark_executed(action, result)
-        executed += 1
+    planned = 0
+    plan = None
+    with metrics.cycle():
+        actions = bus.pop_all_pending()
+        metrics.queue_depth("pending_actions", len(actions))
+        metrics.rows_read("pending_actions", len(actions))
+        if plan_path:
+            plan = load_plan(plan_path, plan_max_age)
+        prev_batch = None
+        for action, batch in order_by_plan(actions, plan):
+            planned += batch is not None
+            if batch_pause > 0 and batch is not None and prev_batch is not None and batch != prev_batch:
+                time.sleep(batch_pause)
+            prev_batch = batch
+            atype = action.get("type", "UNKNOWN")
+            # contexto de trace publicado pelo orchestrator + carimbos da execução
+            trace = dict(action.get("trace") or {"trace_id": action.get("id")})
+            stamp(trace, "exec_start")
+            with metrics.api_call("action", atype):
+                if atype == "ACK_TRIGGER":
+                    result = simulate_ack_trigger(action)
+                else:
+                    result = {"status": "SKIPPED", "message": f"Tipo de ação não suportado: {atype}"}
+            stamp(trace, "exec_end")
+            record = bus.mark_executed(action, result, trace)
+            metrics.observe_latency(record["latency_s"])
+            executed += 1
+        metrics.queue_depth("pending_actions", 0)
+        metrics.rows_written("executed_actions", executed)
 
     print(json.dumps({
         "executor": "done",
-        "actions_processed": executed
+        "actions_processed": executed,
+        "order": "plan" if plan else "fifo",
+        "planned": planned
     }, indent=2, ensure_ascii=False))
+    metrics.linger()
 
 if __name__ == "__main__":
     main()
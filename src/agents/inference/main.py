@@ -0,0 +1,63 @@
+# src/agents/inference/main.py
+# Servidor local de inferência: mantém um ModelInferenceService quente e atende
+# POST /predict, GET /stats e GET /health (ver infrastructure/inference_client.py)
+
+import os
+import time
+import threading
+from infrastructure.model_inference_service import ModelInferenceService
+from infrastructure.inference_server import InferenceServer
+from infrastructure.prediction_cache import PredictionCache
+
+
+def load_service() -> ModelInferenceService:
+    registry_dir = os.getenv("MODEL_REGISTRY_DIR", "/data/models/registry")
+    model_path = os.getenv("MODEL_PATH", "/data/models/anomaly_model.pkl")
+    timeout = int(os.getenv("INFERENCE_WAIT_MODEL_SEC", "600"))
+    start = time.time()
+    while True:
+        try:
+            return ModelInferenceService(model_path, registry_dir=registry_dir)
+        except FileNotFoundError as e:
+            if time.time() - start > timeout:
+                raise
+            print(f"[inference] modelo ainda não disponível ({e}); tentando de novo em 10s...")
+            time.sleep(10)
+
+
+def _persist_loop(cache: PredictionCache, interval_s: int):
+    while True:
+        time.sleep(interval_s)
+        try:
+            cache.save()
+        except Exception as e:
+            print(f"[inference] aviso: falha ao persistir cache: {e}")
+
+
+def main():
+    service = load_service()
+
+    # cache de predições (0 = desligada); persistência opcional em disco
+    cache = None
+    cache_size = int(os.getenv("INFERENCE_CACHE_SIZE", "100000"))
+    if cache_size > 0:
+        cache = PredictionCache(cache_size, persist_path=os.getenv("INFERENCE_CACHE_PATH") or None)
+        if cache.persist_path:
+            interval = int(os.getenv("INFERENCE_CACHE_SAVE_SEC", "60"))
+            threading.Thread(target=_persist_loop, args=(cache, interval), daemon=True).start()
+
+    server = InferenceServer(
+        service,
+        host=os.getenv("INFERENCE_HOST", "0.0.0.0"),
+        port=int(os.getenv("INFERENCE_PORT", "8081")),
+        max_batch=int(os.getenv("INFERENCE_MAX_BATCH", "256")),
+        max_wait_ms=float(os.getenv("INFERENCE_MAX_WAIT_MS", "5")),
+        cache=cache,
+    )
+    host, port = server.address[:2]
+    print(f"[inference] servindo modelo (versão={service.version}) em http://{host}:{port}", flush=True)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
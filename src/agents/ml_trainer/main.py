@@ -3,28 +3,57 @@
 
 import os
 from infrastructure.ml_training_service import MLTrainingService
+from infrastructure.metrics import AgentMetrics
+from infrastructure.training_plots import render_plots
 
 
 def main():
-    service = MLTrainingService()
+    metrics = AgentMetrics("ml_trainer")
+    service = MLTrainingService(
+        feature_store_dir=os.getenv("FEATURE_STORE_DIR", "data/features"),
+        feature_store_max_entries=int(os.getenv("FEATURE_STORE_MAX_ENTRIES", "3")),
+        registry_dir=os.getenv("MODEL_REGISTRY_DIR", "data/models/registry"),
+        registry_keep=int(os.getenv("MODEL_REGISTRY_KEEP", "5")),
+    )
 
     input_path = os.getenv("TRAIN_INPUT", "data/processed/dataset_labeled.csv")
     model_path = os.getenv("MODEL_PATH", "data/models/anomaly_model.pkl")
     metrics_path = os.getenv("METRICS_PATH", "data/reports/metrics.json")
     feature_imp_path = os.getenv("FEATURE_IMP_PATH", "data/reports/feature_importances.csv")
 
-    result = service.train_and_save(
-        input_path=input_path,
-        model_path=model_path,
-        metrics_path=metrics_path,
-        feature_imp_path=feature_imp_path,
-    )
+    with metrics.cycle():
+        result = service.train_and_save(
+            input_path=input_path,
+            model_path=model_path,
+            metrics_path=metrics_path,
+            feature_imp_path=feature_imp_path,
+            incremental=os.getenv("TRAIN_INCREMENTAL", "false").lower() == "true",
+            max_trees=int(os.getenv("TRAIN_MAX_TREES", "0")) or None,
+            search=os.getenv("TRAIN_SEARCH", "false").lower() == "true",
+            search_budget_s=float(os.getenv("TRAIN_SEARCH_BUDGET_S", "60")),
+            latency_budget_ms=float(os.getenv("TRAIN_LATENCY_BUDGET_MS", "0")) or None,
+        )
+    metrics.rows_read("dataset_labeled", result.get("rows_total", 0))
+    if "fit_seconds" in result:
+        metrics.observe_fit("random_forest", result["fit_seconds"])
+        if result.get("score_seconds") is not None:  # None: avaliação pulada (sem holdout)
+            metrics.observe_score("random_forest", result["score_seconds"])
 
     print("✅ Treinamento concluído.")
     print("📌 Métricas salvas em:", metrics_path)
     print("📌 Modelo salvo em:", model_path)
+    if result.get("version"):
+        print("📌 Versão no registro:", result["version"])
     print("📌 Importância das features em:", feature_imp_path)
 
+    # Gráficos adiados: modelo/métricas já publicados; PNGs por último (ou sob demanda
+    # com scripts/render_training_plots.py quando TRAIN_RENDER_PLOTS=false)
+    if result.get("plot_data_path") and os.getenv("TRAIN_RENDER_PLOTS", "true").lower() == "true":
+        with metrics.cycle("render_plots"):
+            for path in render_plots(result["plot_data_path"]):
+                print("📌 Gráfico salvo em:", path)
+    metrics.linger()
+
 
 if __name__ == "__main__":
     main()
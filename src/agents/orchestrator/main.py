@@ -1,7 +1,11 @@
 # src/agents/orchestrator/main.py
 import os, json, time, uuid, hashlib
 from datetime import datetime
-import pandas as pd
+from infrastructure.inference_client import InferenceClient
+from infrastructure.dataset_io import read_dataset, dataset_exists, locate_dataset
+from infrastructure.metrics import AgentMetrics, start_metrics_server
+from infrastructure.tracing import new_trace
+from infrastructure.sharding import read_sharded, sharded_exists
 
 TABULAR_INPUT   = os.getenv("ORCH_INPUT", "/data/processed/dataset_labeled.csv")
 TS_INPUT        = os.getenv("ORCH_TS_INPUT", "/data/processed/anomalies_timeseries.csv")
@@ -20,6 +24,9 @@ LOOP_ENABLED    = os.getenv("ORCH_LOOP_ENABLED", "true").lower() == "true"
 LOOP_SECONDS    = int(os.getenv("ORCH_LOOP_SECONDS", "60"))
 STATE_PATH      = os.getenv("ORCH_STATE_PATH", "/data/actions/.orchestrator_state.json")
 DEBUG           = os.getenv("ORCH_DEBUG", "false").lower() == "true"
+INFERENCE_URL   = os.getenv("ORCH_INFERENCE_URL", "")
+
+metrics = AgentMetrics("orchestrator", serve=False)
 
 def _now_iso(): return datetime.utcnow().isoformat() + "Z"
 
@@ -45,9 +52,15 @@ def _publish_action(action: dict):
     with open(PENDING_PATH, "a") as f:
         f.write(json.dumps(action, ensure_ascii=False) + "\n")
 
+# projeção: só as colunas usadas em cada fluxo
+TABULAR_COLUMNS = ["triggerid", "description", "priority", "lastchange", "lastchange_ts", "collected_at",
+                   "hosts", "score"]
+TS_COLUMNS      = ["ts", "host", "itemkey", "value", TS_SCORE_FIELD, TS_FLAG_FIELD, "collected_at", "scored_at"]
+
 def _debug_file_head(path, n=5):
     try:
-        if os.path.exists(path):
+        if dataset_exists(path):
+            path = locate_dataset(path)
             print(json.dumps({
                 "debug": "file_stat",
                 "path": path,
@@ -55,7 +68,7 @@ def _debug_file_head(path, n=5):
                 "size_bytes": os.path.getsize(path)
             }))
             try:
-                df = pd.read_csv(path)
+                df = read_dataset(path)
                 print(json.dumps({
                     "debug": "file_head",
                     "path": path,
@@ -70,17 +83,39 @@ def _debug_file_head(path, n=5):
     except Exception as e:
         print(json.dumps({"debug": "file_stat_error", "path": path, "error": str(e)}))
 
+def _score_with_inference(df):
+    """Preenche a coluna score via servidor de inferência (se configurado e disponível)."""
+    cols = [c for c in ["triggerid", "description", "priority", "lastchange", "hosts"] if c in df.columns]
+    try:
+        t0 = time.time()
+        with metrics.api_call("inference", "predict"):
+            out = InferenceClient(INFERENCE_URL).predict(df[cols].to_dict(orient="records"))
+        df = df.copy()
+        df["score"] = out["pred_score"]
+        if DEBUG:
+            print(json.dumps({"debug": "inference_scored", "rows": len(df), "model_version": out["version"],
+                              "elapsed_ms": round((time.time() - t0) * 1000, 1)}))
+    except Exception as e:
+        print(json.dumps({"debug": "inference_error", "url": INFERENCE_URL, "error": str(e)}))
+    return df
+
 def _process_tabular(state):
-    if not os.path.exists(TABULAR_INPUT):
+    if not dataset_exists(TABULAR_INPUT):
         if DEBUG: print(json.dumps({"debug":"tabular_missing", "path": TABULAR_INPUT}))
         return 0
     try:
-        df = pd.read_csv(TABULAR_INPUT)
+        df = read_dataset(TABULAR_INPUT, columns=TABULAR_COLUMNS, schema="triggers")
     except Exception as e:
         print(json.dumps({"debug":"tabular_read_error", "error": str(e)}))
         return 0
+    metrics.rows_read("tabular", len(df))
     if DEBUG:
         print(json.dumps({"debug":"tabular_loaded", "rows": len(df), "cols": list(df.columns)}))
+    # tracing: score tabular = gravação do dataset pelo analyzer (ou a chamada de inferência)
+    scored_at = os.path.getmtime(locate_dataset(TABULAR_INPUT))
+    if INFERENCE_URL and "score" not in df.columns:
+        df = _score_with_inference(df)
+        scored_at = time.time()
 
     pub = 0
     considered = 0
@@ -108,11 +143,16 @@ def _process_tabular(state):
                 "host_info": str(hosts),
                 "rationale": f"score>={THRESHOLD} ou priority>={PRIORITY_MIN}",
                 "id": uid,
-                "ts": _now_iso()
+                "ts": _now_iso(),
+                # lastchange do dataset rotulado está normalizado: o epoch bruto vem em lastchange_ts
+                "trace": new_trace(uid, sample_ts=row.get("lastchange_ts"),
+                                   collected_at=row.get("collected_at"), scored_at=scored_at,
+                                   published_at=time.time())
             }
             _publish_action(action)
             state["seen"].append(uid)
             pub += 1
+    metrics.rows_written("actions_tabular", pub)
     if DEBUG:
         print(json.dumps({"debug":"tabular_stats", "considered": considered, "passed": passed, "published": pub}))
     return pub
@@ -126,14 +166,16 @@ def _process_timeseries(state):
     if not TS_ENABLE:
         if DEBUG: print(json.dumps({"debug":"ts_disabled"}))
         return 0
-    if not os.path.exists(TS_INPUT):
+    # analyzer_timeseries pode rodar em shards: lê a união (ou o arquivo único)
+    if not sharded_exists(TS_INPUT):
         if DEBUG: print(json.dumps({"debug":"ts_missing", "path": TS_INPUT}))
         return 0
     try:
-        df = pd.read_csv(TS_INPUT)
+        df = read_sharded(TS_INPUT, columns=TS_COLUMNS)
     except Exception as e:
         print(json.dumps({"debug":"ts_read_error", "error": str(e)}))
         return 0
+    metrics.rows_read("timeseries", len(df))
     if DEBUG:
         print(json.dumps({"debug":"ts_loaded", "rows": len(df), "cols": list(df.columns)}))
 
@@ -157,6 +199,7 @@ def _process_timeseries(state):
             uid = _hash_id("timeseries", host, key, ts, f"{score:.6f}")
             if uid in state["seen"]:
                 continue
+            published = time.time()
             action = {
                 "type": "RAISE_INCIDENT",
                 "source": "orchestrator_timeseries",
@@ -168,11 +211,14 @@ def _process_timeseries(state):
                 "ts": ts,
                 "ts_iso": datetime.utcfromtimestamp(ts).isoformat()+"Z",
                 "id": uid,
-                "published_at": _now_iso()
+                "published_at": datetime.utcfromtimestamp(published).isoformat()+"Z",
+                "trace": new_trace(uid, sample_ts=ts, collected_at=row.get("collected_at"),
+                                   scored_at=row.get("scored_at"), published_at=published)
             }
             _publish_action(action)
             state["seen"].append(uid)
             pub += 1
+    metrics.rows_written("actions_timeseries", pub)
     if DEBUG:
         print(json.dumps({
             "debug":"ts_stats",
@@ -190,10 +236,12 @@ def run_once():
         _debug_file_head(TABULAR_INPUT)
         _debug_file_head(TS_INPUT)
 
-    state = _load_state()
-    pub_tab = _process_tabular(state)
-    pub_ts  = _process_timeseries(state)
-    _save_state(state)
+    with metrics.cycle():
+        state = _load_state()
+        pub_tab = _process_tabular(state)
+        pub_ts  = _process_timeseries(state)
+        _save_state(state)
+    metrics.dedupe_size("seen", len(state["seen"]))
 
     summary = {
         "orchestrator": "done",
@@ -206,6 +254,7 @@ def run_once():
     return pub_tab + pub_ts
 
 def main():
+    start_metrics_server()
     if os.getenv("ORCH_LOOP_ENABLED", "true").lower() != "true":
         run_once()
         return
@@ -1,6 +1,59 @@
+# src/agents/quantum/main.py
+# Agente de otimização (antes: stub "simulação QAOA"): lê o backlog de ações pendentes
+# e grava um plano de execução em lotes respeitando limites por host e por handler,
+# com pesos de prioridade. Solver clássico em CPU (guloso + busca local com orçamento
+# de tempo), ver infrastructure/scheduler.py. O executor consome o plano (EXEC_PLAN_PATH).
+
+import os
+import json
 import time
+from infrastructure.action_bus import ActionBus
+from infrastructure.metrics import AgentMetrics
+from infrastructure.scheduler import ActionScheduler, parse_kv, write_plan
+
+PENDING_PATH  = os.getenv("ACTIONS_PENDING", "/data/actions/pending_actions.jsonl")
+EXECUTED_PATH = os.getenv("ACTIONS_EXECUTED", "/data/actions/executed_actions.jsonl")
+PLAN_PATH     = os.getenv("SCHED_PLAN_PATH", "/data/actions/execution_plan.json")
+
+BATCH_SIZE    = int(os.getenv("SCHED_BATCH_SIZE", "50"))
+HOST_CAP      = int(os.getenv("SCHED_HOST_CAP", "2"))                      # ações por host por lote
+HANDLER_CAPS  = parse_kv(os.getenv("SCHED_HANDLER_CAPS", "ACK_TRIGGER=30,RAISE_INCIDENT=30"))
+TYPE_WEIGHTS  = parse_kv(os.getenv("SCHED_TYPE_WEIGHTS", "RAISE_INCIDENT=3,ACK_TRIGGER=1"))
+BUDGET_SEC    = float(os.getenv("SCHED_BUDGET_SEC", "1.0"))                # orçamento do solver
+LOOP_SECONDS  = float(os.getenv("SCHED_LOOP_SECONDS", "10"))
+
+
+def _fingerprint(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def main():
+    metrics = AgentMetrics("scheduler")
+    bus = ActionBus(PENDING_PATH, EXECUTED_PATH)
+    scheduler = ActionScheduler(BATCH_SIZE, HOST_CAP, HANDLER_CAPS, TYPE_WEIGHTS, BUDGET_SEC)
+    print(f"[scheduler] iniciado: lote={BATCH_SIZE} host_cap={HOST_CAP} handlers={HANDLER_CAPS} "
+          f"orçamento={BUDGET_SEC}s -> {PLAN_PATH}", flush=True)
+
+    last = None
+    while True:
+        fp = _fingerprint(PENDING_PATH)
+        if fp != last:  # só replaneja quando a fila muda
+            with metrics.cycle():
+                actions = bus.peek_pending()
+                metrics.queue_depth("pending_actions", len(actions))
+                metrics.rows_read("pending_actions", len(actions))
+                plan = scheduler.plan(actions)
+                metrics.observe_stage("solve", plan["solve_s"])
+                write_plan(plan, PLAN_PATH)
+            last = fp
+            print(json.dumps({k: plan[k] for k in ("actions", "batch_count", "objective", "greedy_objective",
+                                                   "lower_bound", "gap", "solve_s", "ls_moves")}), flush=True)
+        time.sleep(LOOP_SECONDS)
+
 
-print("Agente Quântico iniciado...")
-while True:
-    print("Executando simulação QAOA para otimização...")
-    time.sleep(15)
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,60 @@
+# src/agents/recommender/main.py
+# Agente recomendador: acompanha executed_actions.jsonl (tail incremental) e mantém
+# estatísticas de resultado por (host, itemkey, descrição) para responder
+# "qual a próxima ação recomendada" via API local:
+#   GET /api/recommendations?host=...&itemkey=...&description=...&k=3
+#   GET /api/contexts?level=exact&limit=100
+#   GET /stats, /health
+
+import os
+import signal
+import sys
 import time
+from infrastructure.recommendation import RemediationStats, RecommenderServer
+from infrastructure.metrics import AgentMetrics
+
+EXECUTED_PATH = os.getenv("ACTIONS_EXECUTED", "/data/actions/executed_actions.jsonl")
+SNAPSHOT_PATH = os.getenv("RECO_SNAPSHOT_PATH", "/data/actions/.recommender_snapshot.json")
+POLL_SEC      = float(os.getenv("RECO_POLL_SEC", "5"))
+SNAPSHOT_SEC  = float(os.getenv("RECO_SNAPSHOT_SEC", "60"))
+TOP_K         = int(os.getenv("RECO_TOP_K", "5"))
+
+
+def main():
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))  # docker stop: grava o snapshot final
+    metrics = AgentMetrics("recommender")
+    # tamanho do índice de contextos por nível (não é estado de deduplicação)
+    contexts_gauge = metrics.registry.gauge("recommender_contexts", "Contextos com estatísticas no recomendador",
+                                            ("agent", "level"))
+    service = RemediationStats(EXECUTED_PATH, SNAPSHOT_PATH or None, top_k=TOP_K)
+    print(f"[recommender] snapshot: {service.records} registros; retomando de offset {service.stats()['offset']}")
+
+    server = RecommenderServer(service, host=os.getenv("RECO_HOST", "0.0.0.0"),
+                               port=int(os.getenv("RECO_PORT", "8091")))
+    server.start_background()
+    host, port = server.address[:2]
+    print(f"[recommender] API em http://{host}:{port}/api/recommendations", flush=True)
+
+    last_snapshot = time.time()
+    try:
+        while True:
+            with metrics.cycle():
+                n = service.update()
+                metrics.rows_read("executed_actions", n)
+                for level, count in service.stats()["contexts"].items():
+                    contexts_gauge.labels(metrics.agent, level).set(count)
+            if n:
+                print(f"[recommender] +{n} execuções (total {service.records})", flush=True)
+            if time.time() - last_snapshot >= SNAPSHOT_SEC:
+                service.snapshot()
+                last_snapshot = time.time()
+            time.sleep(POLL_SEC)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.snapshot()
+        server.shutdown()
+
 
-print("Agente Recomendador iniciado...")
-while True:
-    print("Gerando recomendações baseadas na análise...")
-    time.sleep(10)
\ No newline at end of file
+if __name__ == "__main__":
+    main()
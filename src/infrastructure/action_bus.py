@@ -2,7 +2,19 @@ import json
 import os
 import uuid
 from datetime import datetime, timezone
-from typing import Dict
+from typing import Dict, Optional
+
+from infrastructure.tracing import stage_latencies
+
+
+def action_host(action: Dict) -> str:
+    """Host da ação: campo host (séries) ou o primeiro 'name' de host_info (triggers)."""
+    if action.get("host"):
+        return str(action["host"])
+    info = action.get("host_info")
+    if isinstance(info, str) and "'name'" in info:
+        return info.split("'name'", 1)[1].split("'")[1]
+    return ""
 
 class ActionBus:
     """
@@ -30,13 +42,8 @@ class ActionBus:
             f.write(json.dumps(action, ensure_ascii=False) + "\n")
         return action
 
-    def pop_all_pending(self):
-        if not os.path.exists(self.pending):
-            return []
-        with open(self.pending, "r") as f:
-            lines = [l.strip() for l in f if l.strip()]
-        # zera a fila (one-shot)
-        open(self.pending, "w").close()
+    @staticmethod
+    def _parse(lines):
         actions = []
         for ln in lines:
             try:
@@ -45,13 +52,38 @@ class ActionBus:
                 pass
         return actions
 
-    def mark_executed(self, action: Dict, result: Dict):
+    def peek_pending(self):
+        """Lê a fila sem consumir (usado pelo scheduler para montar o plano)."""
+        if not os.path.exists(self.pending):
+            return []
+        with open(self.pending, "r") as f:
+            return self._parse([l.strip() for l in f if l.strip()])
+
+    def pop_all_pending(self):
+        # consome a fila por rename (one-shot): o orchestrator recria o arquivo com um inode
+        # novo no próximo publish, e leitores incrementais (JsonlTailer) veem a troca
+        consuming = self.pending + ".consuming"
+        try:
+            os.replace(self.pending, consuming)
+        except FileNotFoundError:
+            return []
+        with open(consuming, "r") as f:
+            lines = [l.strip() for l in f if l.strip()]
+        os.remove(consuming)
+        return self._parse(lines)
+
+    def mark_executed(self, action: Dict, result: Dict, trace: Optional[Dict] = None):
         record = {
             "id": action.get("id"),
             "ts_executed": self._now(),
             "action": action,
             "result": result
         }
+        if trace is not None:
+            # trace completo (amostra -> execução) e latência por estágio, em segundos
+            record["trace"] = trace
+            record["latency_s"] = stage_latencies(trace)
         with open(self.executed, "a") as f:
             f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return record
 
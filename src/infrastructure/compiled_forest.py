@@ -0,0 +1,122 @@
+# src/infrastructure/compiled_forest.py
+# Exporta um RandomForestClassifier para arrays NumPy contíguos e avalia sem sklearn
+# (sem overhead de validação/joblib por chamada; útil para scoring de poucas linhas)
+
+from typing import Dict
+
+import numpy as np
+
+
+ARRAY_NAMES = ["forest_feature", "forest_threshold", "forest_children",
+               "forest_value", "forest_roots", "forest_classes", "forest_depth"]
+
+
+def compile_forest(clf) -> Dict[str, np.ndarray]:
+    """
+    Achata todas as árvores em arrays globais de nós:
+      - feature/threshold: um elemento por nó
+      - children: (n_nodes, 2) com [direita, esquerda] em índices globais, para indexar
+        com 2 * nó + (x <= threshold) sem np.where
+      - value: probabilidade de cada classe no nó (n_nodes, n_classes)
+      - roots: índice do nó raiz de cada árvore
+    Folhas apontam para si mesmas (filhos = próprio nó, threshold = +inf), então
+    a avaliação é no máximo `depth` passos e a chegada na folha é "nó não mudou".
+    """
+    features, thresholds, children, values, roots = [], [], [], [], []
+    offset = 0
+    depth = 0
+    for est in clf.estimators_:
+        t = est.tree_
+        n = t.node_count
+        idx = np.arange(n, dtype=np.int64)
+        is_leaf = t.children_left == -1
+
+        feat = np.where(is_leaf, 0, t.feature).astype(np.int32)
+        thr = np.where(is_leaf, np.inf, t.threshold).astype(np.float64)
+        left = np.where(is_leaf, idx, t.children_left) + offset
+        right = np.where(is_leaf, idx, t.children_right) + offset
+
+        val = t.value[:, 0, :].astype(np.float64)
+        totals = val.sum(axis=1, keepdims=True)
+        totals[totals == 0] = 1.0
+        val = val / totals
+
+        features.append(feat)
+        thresholds.append(thr)
+        children.append(np.stack([right, left], axis=1).astype(np.int32))
+        values.append(val)
+        roots.append(offset)
+        depth = max(depth, int(t.max_depth))
+        offset += n
+
+    return {
+        "forest_feature": np.concatenate(features),
+        "forest_threshold": np.concatenate(thresholds),
+        "forest_children": np.concatenate(children),
+        "forest_value": np.concatenate(values),
+        "forest_roots": np.asarray(roots, dtype=np.int32),
+        "forest_classes": np.asarray(clf.classes_),
+        "forest_depth": np.asarray([depth], dtype=np.int32),
+    }
+
+
+def has_compiled_forest(arrays: Dict[str, np.ndarray]) -> bool:
+    return all(name in arrays for name in ARRAY_NAMES)
+
+
+class CompiledForest:
+    """
+    Avaliador vetorizado: todos os pares (linha, árvore) descem um nível por iteração;
+    pares que já chegaram na folha saem do conjunto ativo.
+    Vence o sklearn em lotes pequenos (sem overhead por chamada); em lotes grandes o
+    laço em C do sklearn é mais rápido (ver scripts/benchmark_inference.py).
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.feature = arrays["forest_feature"]
+        self.threshold = arrays["forest_threshold"]
+        self.children = np.asarray(arrays["forest_children"]).reshape(-1)
+        self.value = arrays["forest_value"]
+        self.roots = np.asarray(arrays["forest_roots"])
+        self.classes_ = np.asarray(arrays["forest_classes"])
+        self.depth = int(arrays["forest_depth"][0])
+
+    @classmethod
+    def from_sklearn(cls, clf) -> "CompiledForest":
+        return cls(compile_forest(clf))
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """Índice global da folha para cada (linha, árvore)."""
+        # sklearn compara em float32 (X é convertido antes de descer na árvore)
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows, n_feats = X.shape
+        flat = X.ravel()
+        node = np.tile(self.roots.astype(np.int64), n_rows)
+        base = np.repeat(np.arange(n_rows, dtype=np.int64) * n_feats, self.n_trees)
+        out = node.copy()
+        pos = np.arange(node.size)
+        for _ in range(self.depth):
+            go_left = flat[base + self.feature[node]] <= self.threshold[node]
+            nxt = self.children[2 * node + go_left]
+            moved = nxt != node
+            if not moved.all():
+                # folhas apontam para si mesmas: grava e remove do conjunto ativo
+                out[pos[~moved]] = node[~moved]
+                pos, node, base = pos[moved], nxt[moved], base[moved]
+                if not node.size:
+                    break
+            else:
+                node = nxt
+        out[pos] = node
+        return out.reshape(n_rows, self.n_trees)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        leaves = self.apply(X)
+        return self.value[leaves].mean(axis=1)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
@@ -0,0 +1,415 @@
+# src/infrastructure/dashboard_data.py
+# API de dados para os dashboards HTML (docs/*.html):
+#   - séries temporais reduzidas (LTTB / min-max) para a largura do gráfico em pixels
+#   - atividade de ações (pending/executed) pré-agregada por minuto
+#   - rollups de incidentes (IncidentReportService, incremental)
+# Respostas ficam em LRU por (série, intervalo, resolução); a cache é descartada
+# quando o arquivo de origem muda.
+
+import json
+import os
+import threading
+from collections import Counter, OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from infrastructure.action_bus import action_host
+from infrastructure.downsampling import downsample
+from infrastructure.incident_report import IncidentReportService, parse_ts
+from infrastructure.jsonl_tailer import JsonlTailer
+from infrastructure.sharding import read_sharded, sharded_version
+
+TS_COLUMNS = ["ts", "host", "itemkey", "value", "score", "threshold", "is_incident"]
+
+
+def _iso(ts: np.ndarray) -> List[str]:
+    return pd.to_datetime(ts, unit="s", utc=True).strftime("%Y-%m-%dT%H:%M:%SZ").tolist()
+
+
+def _clean(values: np.ndarray) -> List[Optional[float]]:
+    # NaN não é JSON válido
+    return [None if v != v else v for v in values.tolist()]
+
+
+class TimeSeriesStore:
+    """Séries (host, itemkey) em arrays numpy ordenados por ts; recarrega se o arquivo mudar."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.version: Optional[Tuple] = None
+        self.series: Dict[Tuple[str, str], Dict[str, np.ndarray]] = {}
+
+    def refresh(self) -> bool:
+        version = sharded_version(self.path)  # arquivo único ou shards do analyzer_timeseries
+        if version is None or version == self.version:
+            return False
+
+        df = read_sharded(self.path, columns=TS_COLUMNS, schema="timeseries")
+        series = {}
+        if not df.empty:
+            df = df.sort_values(["host", "itemkey", "ts"], kind="mergesort")
+            for (host, itemkey), g in df.groupby(["host", "itemkey"], sort=False):
+                series[(str(host), str(itemkey))] = {
+                    "ts": g["ts"].to_numpy(dtype=np.float64),
+                    "value": pd.to_numeric(g["value"], errors="coerce").to_numpy(dtype=np.float64),
+                    "score": (pd.to_numeric(g["score"], errors="coerce").to_numpy(dtype=np.float64)
+                              if "score" in g else np.full(len(g), np.nan)),
+                    "threshold": (pd.to_numeric(g["threshold"], errors="coerce").to_numpy(dtype=np.float64)
+                                  if "threshold" in g else np.full(len(g), np.nan)),
+                    "is_incident": (g["is_incident"].to_numpy(dtype=bool)
+                                    if "is_incident" in g else np.zeros(len(g), dtype=bool)),
+                }
+        self.series = series
+        self.version = version
+        return True
+
+
+class ActionActivity:
+    """Agregados das ações (contagem por minuto, KPIs, últimas linhas), atualizados por tail."""
+
+    def __init__(self, pending_path: str, executed_path: str, recent: int = 200):
+        self.pending_path = pending_path
+        self._pending = JsonlTailer(pending_path)
+        self._executed = JsonlTailer(executed_path)
+        self.per_minute: Dict[int, List[int]] = {}     # minuto (epoch/60) -> [pending, executed]
+        self.totals = Counter()
+        self.types = Counter()
+        self.hosts = set()
+        self.last_event: Optional[str] = None
+        # pendentes recentes vêm da fila viva (queue), não do histórico publicado
+        self.recent = {"executed": deque(maxlen=recent)}
+        self.recent_max = recent
+        self.queue_depth = 0
+        self.queue_recent: List[Dict] = []
+        self._queue_sig = None
+
+    def _add(self, kind: str, iso, o: Dict, extra: Dict):
+        ts = parse_ts(iso)
+        if ts is not None:
+            bucket = self.per_minute.setdefault(int(ts // 60), [0, 0])
+            bucket[0 if kind == "pending" else 1] += 1
+            iso_s = iso if isinstance(iso, str) else _iso(np.asarray([ts]))[0]
+            if self.last_event is None or iso_s > self.last_event:
+                self.last_event = iso_s
+        host = action_host(o)
+        if host:
+            self.hosts.add(host)
+        self.totals[kind] += 1
+        self.types[o.get("type") or "UNKNOWN"] += 1
+        if kind in self.recent:
+            self.recent[kind].append(self._row(iso, o, host, extra))
+
+    @staticmethod
+    def _row(iso, o: Dict, host, extra: Dict) -> Dict:
+        return {
+            "iso": iso, "type": o.get("type") or "UNKNOWN", "host": host,
+            "itemOrDesc": o.get("itemkey") or o.get("description") or "",
+            # "" = ausente (mesma convenção dos normalizadores do dashboard)
+            "prio": "" if o.get("priority") is None else o["priority"],
+            "score": "" if o.get("score") is None else o["score"],
+            "source": o.get("source") or "", "id": o.get("id") or "", **extra,
+        }
+
+    def refresh_queue(self) -> bool:
+        """
+        Fila atual = linhas do pending_actions.jsonl vivo (o executor consome a fila
+        renomeando o arquivo). Relê só quando o arquivo muda; True se mudou.
+        """
+        try:
+            st = os.stat(self.pending_path)
+            sig = (st.st_ino, st.st_size, st.st_mtime_ns)
+        except FileNotFoundError:
+            sig = None  # consumido (rename) e ainda não recriado: fila vazia
+        if sig == self._queue_sig:
+            return False
+        self._queue_sig = sig
+        depth, tail = 0, deque(maxlen=self.recent_max)
+        if sig is not None:
+            try:
+                with open(self.pending_path, "rb") as f:
+                    for line in f:
+                        if line.strip():
+                            depth += 1
+                            tail.append(line)
+            except FileNotFoundError:
+                pass
+        rows = []
+        for line in tail:
+            try:
+                o = json.loads(line)
+            except ValueError:
+                continue  # linha parcial (append em andamento)
+            rows.append(self._row(o.get("ts_iso") or o.get("ts") or o.get("published_at"),
+                                  o, action_host(o), {}))
+        self.queue_depth, self.queue_recent = depth, rows
+        return True
+
+    def update(self) -> int:
+        n = 0
+        for o in self._pending.read():
+            self._add("pending", o.get("ts_iso") or o.get("ts") or o.get("published_at"), o, {})
+            n += 1
+        for o in self._executed.read():
+            a = o.get("action") or {}
+            r = o.get("result") or {}
+            result = (r.get("status", "") + (" — " + r["message"] if r.get("message") else "")) if r else ""
+            self._add("executed", o.get("ts_executed") or a.get("ts_iso") or a.get("ts"),
+                      {**a, "id": o.get("id") or a.get("id")}, {"result": result})
+            n += 1
+        return n
+
+    def counts(self, start: Optional[float], end: Optional[float], width: int) -> Dict:
+        """Contagens pending/executed em buckets de N minutos (no máximo `width` barras)."""
+        minutes = sorted(m for m in self.per_minute
+                         if (start is None or m * 60 >= start) and (end is None or m * 60 <= end))
+        if not minutes:
+            return {"bucket_minutes": 1, "labels": [], "pending": [], "executed": []}
+        span = minutes[-1] - minutes[0] + 1
+        step = max(1, -(-span // max(1, width)))
+        agg: Dict[int, List[int]] = {}
+        for m in minutes:
+            b = agg.setdefault((m // step) * step, [0, 0])
+            p, e = self.per_minute[m]
+            b[0] += p
+            b[1] += e
+        keys = sorted(agg)
+        return {
+            "bucket_minutes": step,
+            "labels": _iso(np.asarray(keys, dtype=np.float64) * 60),
+            "pending": [agg[k][0] for k in keys],
+            "executed": [agg[k][1] for k in keys],
+        }
+
+
+class _LRU:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[tuple, Dict]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        v = self._data.get(key)
+        if v is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return v
+
+    def put(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+    def drop(self, kind: str):
+        for k in [k for k in self._data if k[0] == kind]:
+            del self._data[k]
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {"entries": len(self._data), "max_entries": self.max_entries, "hits": self.hits,
+                "misses": self.misses, "hit_ratio": (self.hits / total) if total else None}
+
+
+class DashboardDataService:
+    def __init__(self, ts_path: str, pending_path: str, executed_path: str,
+                 incident_state_path: Optional[str] = None, *, cache_size: int = 512,
+                 max_width: int = 4000, recent_rows: int = 50):
+        self.store = TimeSeriesStore(ts_path)
+        self.activity = ActionActivity(pending_path, executed_path)
+        self.pending_path = pending_path
+        self.executed_path = executed_path
+        self.incident_state_path = incident_state_path
+        self.cache = _LRU(cache_size)
+        self.max_width = max_width
+        self.recent_rows = recent_rows
+        self._lock = threading.Lock()
+
+    def _refresh_series(self):
+        if self.store.refresh():
+            self.cache.clear()  # arquivo mudou: respostas antigas não valem mais
+
+    def list_series(self) -> List[Dict]:
+        with self._lock:
+            self._refresh_series()
+            return [{"host": h, "itemkey": k, "points": int(len(s["ts"])),
+                     "start": float(s["ts"][0]), "end": float(s["ts"][-1]),
+                     "incidents": int(s["is_incident"].sum())}
+                    for (h, k), s in sorted(self.store.series.items())]
+
+    def series_data(self, host: str, itemkey: str, start: Optional[float] = None,
+                    end: Optional[float] = None, width: int = 800, method: str = "lttb") -> Dict:
+        width = max(3, min(int(width), self.max_width))
+        key = ("series", host, itemkey, start, end, width, method)
+        with self._lock:
+            self._refresh_series()
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+            s = self.store.series.get((host, itemkey))
+            if s is None:
+                raise KeyError(f"série inexistente: {host} / {itemkey}")
+
+            lo = 0 if start is None else int(np.searchsorted(s["ts"], start, side="left"))
+            hi = len(s["ts"]) if end is None else int(np.searchsorted(s["ts"], end, side="right"))
+            ts, value = s["ts"][lo:hi], s["value"][lo:hi]
+            valid = np.flatnonzero(~np.isnan(value))
+            keep = valid[downsample(ts[valid], value[valid], width, method)]
+            inc = np.flatnonzero(s["is_incident"][lo:hi])
+            tail = np.arange(max(0, hi - lo - self.recent_rows), hi - lo)
+
+            def rows(ix):
+                return {"ts": ts[ix].tolist(), "ts_iso": _iso(ts[ix]), "value": _clean(value[ix]),
+                        "score": _clean(s["score"][lo:hi][ix]), "threshold": _clean(s["threshold"][lo:hi][ix])}
+
+            result = {
+                "host": host, "itemkey": itemkey, "method": method, "width": width,
+                "raw_points": int(hi - lo), "points": int(len(keep)),
+                "incident_count": int(len(inc)),
+                "series": rows(keep),
+                # incidentes sempre visíveis (limitados à largura do gráfico)
+                "incidents": rows(inc[-width:]),
+                "recent": {**rows(tail), "is_incident": s["is_incident"][lo:hi][tail].tolist()},
+            }
+            self.cache.put(key, result)
+            return result
+
+    def actions_summary(self, start: Optional[float] = None, end: Optional[float] = None,
+                        width: int = 120, recent: int = 50) -> Dict:
+        width = max(1, min(int(width), self.max_width))
+        with self._lock:
+            changed = self.activity.update()
+            if self.activity.refresh_queue() or changed:
+                self.cache.drop("actions")  # novas ações ou fila consumida: descarta só a atividade
+            key = ("actions", start, end, width, recent)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+            a = self.activity
+            result = {
+                "pending": a.queue_depth,                 # fila atual (arquivo pending vivo)
+                "published_total": a.totals["pending"],  # acumulado publicado desde o start
+                "executed": a.totals["executed"],
+                "hosts": len(a.hosts),
+                "last_event": a.last_event,
+                "types": dict(a.types),
+                "per_bucket": a.counts(start, end, width),
+                "recent_pending": a.queue_recent[-recent:][::-1],
+                "recent_executed": list(a.recent["executed"])[-recent:][::-1],
+            }
+            self.cache.put(key, result)
+            return result
+
+    def incident_rollups(self) -> Dict:
+        if not self.incident_state_path:
+            raise KeyError("INCIDENT_STATE_PATH não configurado")
+        with self._lock:
+            report = IncidentReportService(self.incident_state_path)
+            try:
+                report.ingest(self.pending_path, self.executed_path)
+                return {"total": report.total(), **report.rollups()}
+            finally:
+                report.close()
+
+    def stats(self) -> Dict:
+        return {"cache": self.cache.stats(), "series": len(self.store.series),
+                "data_version": max(m for _, m in self.store.version) if self.store.version else None}
+
+
+def _make_handler(service: DashboardDataService, static_dir: Optional[str]):
+    def _num(q, name, default=None, cast=float):
+        v = q.get(name, [None])[0]
+        return default if v in (None, "") else cast(v)
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, code: int, payload, content_type="application/json"):
+            body = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Access-Control-Allow-Origin", "*")  # dashboards abertos via file:// ou outra porta
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _static(self, path: str):
+            if not static_dir:
+                self._send(404, {"error": "not found"})
+                return
+            root = os.path.realpath(static_dir)
+            full = os.path.realpath(os.path.join(root, path.lstrip("/") or "index.html"))
+            if not full.startswith(root + os.sep) or not os.path.isfile(full):
+                self._send(404, {"error": "not found"})
+                return
+            ctype = "text/html; charset=utf-8" if full.endswith(".html") else "application/octet-stream"
+            with open(full, "rb") as f:
+                self._send(200, f.read(), ctype)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            q = parse_qs(url.query)
+            try:
+                if url.path == "/health":
+                    self._send(200, {"status": "ok"})
+                elif url.path == "/stats":
+                    self._send(200, service.stats())
+                elif url.path == "/api/series":
+                    self._send(200, service.list_series())
+                elif url.path == "/api/series/data":
+                    self._send(200, service.series_data(
+                        q.get("host", [""])[0], q.get("itemkey", [""])[0],
+                        _num(q, "start"), _num(q, "end"),
+                        _num(q, "width", 800, int), q.get("method", ["lttb"])[0]))
+                elif url.path == "/api/actions/summary":
+                    self._send(200, service.actions_summary(
+                        _num(q, "start"), _num(q, "end"), _num(q, "width", 120, int), _num(q, "recent", 50, int)))
+                elif url.path == "/api/incidents/rollups":
+                    self._send(200, service.incident_rollups())
+                else:
+                    self._static(url.path)
+            except KeyError as e:
+                self._send(404, {"error": str(e.args[0] if e.args else e)})
+            except ValueError as e:
+                self._send(400, {"error": str(e)})
+            except Exception as e:
+                self._send(500, {"error": str(e)})
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return Handler
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class DashboardServer:
+    def __init__(self, service: DashboardDataService, host: str = "0.0.0.0", port: int = 8090,
+                 static_dir: Optional[str] = None):
+        self.service = service
+        self.httpd = _HTTPServer((host, port), _make_handler(service, static_dir))
+
+    @property
+    def address(self):
+        return self.httpd.server_address
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def start_background(self) -> threading.Thread:
+        t = threading.Thread(target=self.serve_forever, name="dashboard-http", daemon=True)
+        t.start()
+        return t
+
+    def shutdown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,335 @@
+# src/infrastructure/dataset_io.py
+# Camada de I/O de datasets: formato colunar tipado (Parquet/Feather) com schema explícito,
+# projeção de colunas e leitura em chunks. CSV continua disponível como exportação opcional.
+#
+# Os caminhos configurados (ex.: /data/processed/dataset_labeled.csv) são "lógicos":
+# a extensão é trocada conforme o formato (dataset_labeled.parquet).
+
+import os
+import ast
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+FORMAT = os.getenv("DATASET_FORMAT", "parquet").lower()          # parquet | feather | csv
+CSV_EXPORT = os.getenv("DATASET_CSV_EXPORT", "false").lower() == "true"
+
+_EXT = {"parquet": ".parquet", "feather": ".feather", "csv": ".csv"}
+
+# Schemas explícitos dos datasets do pipeline (nome lógico -> coluna -> tipo)
+#   "hosts" é lista de structs {hostid, name} (antes: string com repr de lista Python)
+SCHEMAS: Dict[str, Dict[str, str]] = {
+    "triggers": {
+        "triggerid": "int64",
+        "description": "string",
+        "priority": "float64",
+        "lastchange": "int64",
+        "hosts": "hosts",
+        "collected_at": "float64",  # tracing (ver infrastructure/tracing.py)
+    },
+    "triggers_processed": {
+        "triggerid": "int64",
+        "description": "string",
+        "priority": "float64",
+        "lastchange": "float64",   # normalizado [0, 1]
+        "lastchange_ts": "int64",  # lastchange bruto (epoch), para o tracing
+        "collected_at": "float64",  # tracing: nunca normalizado
+        "hosts": "hosts",
+        "label": "int64",          # só no dataset rotulado
+    },
+    "timeseries": {
+        "ts": "int64",
+        "ts_iso": "string",
+        "host": "string",
+        "itemkey": "string",
+        "value": "float64",
+        "score": "float64",
+        "threshold": "float64",
+        "is_incident": "bool",
+        "collected_at": "float64",  # tracing (ver infrastructure/tracing.py)
+        "scored_at": "float64",
+        "scorer": "string",         # baseline | iforest (ver infrastructure/seasonal_baseline.py)
+        "baseline_z": "float64",
+    },
+    "incidents": {
+        "datetime": "string",
+        "host": "string",
+        "itemkey": "string",
+        "value": "float64",
+        "score": "float64",
+        "ts_iso": "string",
+        "status": "string",
+    },
+}
+
+
+def resolve_path(path: str, fmt: Optional[str] = None) -> str:
+    base, _ = os.path.splitext(path)
+    return base + _EXT[(fmt or FORMAT).lower()]
+
+
+def _fmt_of(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    for fmt, e in _EXT.items():
+        if e == ext:
+            return fmt
+    return "csv"
+
+
+def parse_hosts(value):
+    """Normaliza hosts para lista de dicts {hostid, name} (aceita a string legada do CSV)."""
+    if isinstance(value, list):
+        return value
+    if isinstance(value, (tuple, np.ndarray)):  # array vindo do Arrow
+        return list(value)
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return []
+    try:
+        v = ast.literal_eval(str(value))
+        return v if isinstance(v, list) else [v]
+    except Exception:
+        return []
+
+
+def is_list_column(s: pd.Series) -> bool:
+    first = s.dropna().head(1)
+    return not first.empty and isinstance(first.iloc[0], (list, tuple, np.ndarray))
+
+
+def hashable_view(df: pd.DataFrame) -> pd.DataFrame:
+    """Cópia com colunas de lista convertidas em str (para hash/dedup)."""
+    list_cols = [c for c in df.columns if df[c].dtype == object and is_list_column(df[c])]
+    if not list_cols:
+        return df
+    return df.assign(**{c: df[c].map(lambda v: str(list(v)) if v is not None else "") for c in list_cols})
+
+
+def apply_schema(df: pd.DataFrame, schema: Optional[str]) -> pd.DataFrame:
+    """Converte as colunas conhecidas para os tipos do schema (colunas extras ficam como estão)."""
+    if not schema:
+        return df
+    df = df.copy()
+    for col, dtype in SCHEMAS[schema].items():
+        if col not in df.columns:
+            continue
+        if dtype == "hosts":
+            df[col] = df[col].map(parse_hosts)
+        elif dtype == "string":
+            df[col] = df[col].astype("string")
+        elif dtype == "bool":
+            if df[col].dtype == object:
+                df[col] = df[col].map(lambda v: str(v).lower() == "true" if isinstance(v, str) else bool(v))
+            df[col] = df[col].astype(bool)
+        elif dtype == "int64":
+            num = pd.to_numeric(df[col], errors="coerce")
+            df[col] = num.fillna(0).astype("int64") if (num.dropna() % 1 == 0).all() else num
+        else:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype(dtype)
+    return df
+
+
+def _arrow_types():
+    import pyarrow as pa
+    hosts_t = pa.list_(pa.struct([("hostid", pa.string()), ("name", pa.string())]))
+    return {"int64": pa.int64(), "float64": pa.float64(), "string": pa.string(),
+            "bool": pa.bool_(), "hosts": hosts_t}
+
+
+def _arrow_schema(df: pd.DataFrame, schema: Optional[str]):
+    import pyarrow as pa
+    if not schema:
+        return None
+    types = _arrow_types()
+    fields = []
+    for col in df.columns:
+        dtype = SCHEMAS[schema].get(col)
+        if dtype is not None and not (dtype == "int64" and df[col].dtype != "int64"):
+            fields.append(pa.field(col, types[dtype]))
+        else:
+            fields.append(pa.field(col, pa.Schema.from_pandas(df[[col]], preserve_index=False).field(col).type))
+    return pa.schema(fields)
+
+
+def _cast_table(table, schema: Optional[str]):
+    """pyarrow.Table pronto (ex.: SampleBuffer.to_arrow): só ajusta os tipos declarados no schema."""
+    if not schema:
+        return table
+    types = _arrow_types()
+    target = table.schema
+    for i, field in enumerate(target):
+        dtype = SCHEMAS[schema].get(field.name)
+        if dtype is not None and dtype != "hosts" and field.type != types[dtype]:
+            target = target.set(i, field.with_type(types[dtype]))
+    return table if target.equals(table.schema) else table.cast(target)
+
+
+def _to_table(df: pd.DataFrame, schema: Optional[str]):
+    import pyarrow as pa
+    if isinstance(df, pa.Table):
+        return _cast_table(df, schema)
+    df = apply_schema(df, schema)
+    return pa.Table.from_pandas(df, schema=_arrow_schema(df, schema), preserve_index=False)
+
+
+def _csv_frame(df: pd.DataFrame) -> pd.DataFrame:
+    # listas voltam ao repr Python (mesmo texto do CSV antigo)
+    list_cols = [c for c in df.columns if df[c].dtype == object and is_list_column(df[c])]
+    return df.assign(**{c: df[c].map(lambda v: str([dict(x) for x in v])) for c in list_cols}) if list_cols else df
+
+
+def write_dataset(df: pd.DataFrame, path: str, schema: Optional[str] = None, *,
+                  fmt: Optional[str] = None, csv_export: Optional[bool] = None) -> str:
+    """
+    Grava de forma atômica no formato configurado; retorna o caminho efetivo.
+    Aceita também um pyarrow.Table (gravado sem passar por pandas em Parquet/Feather).
+    """
+    fmt = (fmt or FORMAT).lower()
+    out = resolve_path(path, fmt)
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    tmp = out + "._tmp"
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        pq.write_table(_to_table(df, schema), tmp)
+    elif fmt == "feather":
+        import pyarrow.feather as feather
+        feather.write_feather(_to_table(df, schema), tmp)
+    else:
+        if not isinstance(df, pd.DataFrame):
+            df = df.to_pandas()
+        _csv_frame(apply_schema(df, schema)).to_csv(tmp, index=False)
+    os.replace(tmp, out)
+
+    if fmt != "csv" and (CSV_EXPORT if csv_export is None else csv_export):
+        write_dataset(df, path, schema, fmt="csv")
+    return out
+
+
+def locate_dataset(path: str, fmt: Optional[str] = None) -> str:
+    """Caminho no formato configurado; se não existir, cai para o arquivo como informado (ex.: CSV legado)."""
+    out = resolve_path(path, fmt)
+    if not os.path.exists(out) and os.path.exists(path):
+        return path
+    return out
+
+
+def dataset_exists(path: str, fmt: Optional[str] = None) -> bool:
+    return os.path.exists(locate_dataset(path, fmt))
+
+
+def _column_names(src: str, kind: str) -> List[str]:
+    """Nomes das colunas só pelo schema (rodapé do Parquet / cabeçalho IPC do Feather v2)."""
+    if kind == "parquet":
+        import pyarrow.parquet as pq
+        return pq.read_schema(src).names
+    import pyarrow as pa
+    with pa.memory_map(src) as source:
+        return pa.ipc.open_file(source).schema.names
+
+
+def read_dataset(path: str, columns: Optional[List[str]] = None, schema: Optional[str] = None,
+                 *, fmt: Optional[str] = None) -> pd.DataFrame:
+    """Lê o dataset (com projeção de colunas quando o formato suporta)."""
+    src = locate_dataset(path, fmt)
+    kind = _fmt_of(src)
+    if kind in ("parquet", "feather") and columns:
+        names = _column_names(src, kind)
+        columns = [c for c in columns if c in names]  # projeção tolera colunas ausentes (como o CSV)
+    if kind == "parquet":
+        df = pd.read_parquet(src, columns=columns)
+    elif kind == "feather":
+        df = pd.read_feather(src, columns=columns)
+    else:
+        df = pd.read_csv(src, usecols=(lambda c: c in columns) if columns else None)
+    return apply_schema(df, schema)
+
+
+def iter_dataset(path: str, chunksize: int, columns: Optional[List[str]] = None,
+                 *, fmt: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """Lê em chunks de até `chunksize` linhas (memória limitada)."""
+    src = locate_dataset(path, fmt)
+    kind = _fmt_of(src)
+    if kind == "parquet":
+        import pyarrow.parquet as pq
+        pf = pq.ParquetFile(src)
+        for batch in pf.iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    elif kind == "feather":
+        df = pd.read_feather(src, columns=columns)
+        for i in range(0, len(df), chunksize):
+            yield df.iloc[i:i + chunksize]
+    else:
+        yield from pd.read_csv(src, chunksize=chunksize, usecols=(lambda c: c in columns) if columns else None)
+
+
+class DatasetWriter:
+    """Gravação incremental (chunk a chunk) com troca atômica no close()."""
+
+    def __init__(self, path: str, schema: Optional[str] = None, *, fmt: Optional[str] = None,
+                 csv_export: Optional[bool] = None):
+        self.fmt = (fmt or FORMAT).lower()
+        self.logical_path = path
+        self.path = resolve_path(path, self.fmt)
+        self.schema = schema
+        self.csv_export = (CSV_EXPORT if csv_export is None else csv_export) and self.fmt != "csv"
+        self.rows = 0
+        self._tmp = self.path + "._tmp"
+        self._writer = None
+        self._arrow_schema = None
+        self._chunks: List[pd.DataFrame] = []  # só usado por feather (sem escrita incremental)
+        self._csv = None
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+    def write(self, df: pd.DataFrame):
+        if df.empty:
+            return
+        self.rows += len(df)
+        if self.fmt == "parquet":
+            import pyarrow.parquet as pq
+            table = _to_table(df, self.schema)
+            if self._writer is None:
+                self._arrow_schema = table.schema
+                self._writer = pq.ParquetWriter(self._tmp, self._arrow_schema)
+            self._writer.write_table(table.cast(self._arrow_schema))
+        elif self.fmt == "feather":
+            self._chunks.append(df)
+        else:
+            if self._csv is None:
+                self._csv = open(self._tmp, "w", newline="")
+                header = True
+            else:
+                header = False
+            _csv_frame(apply_schema(df, self.schema)).to_csv(self._csv, index=False, header=header)
+
+    def close(self) -> str:
+        if self.fmt == "parquet" and self._writer is not None:
+            self._writer.close()
+        elif self.fmt == "feather":
+            write_dataset(pd.concat(self._chunks, ignore_index=True) if self._chunks else pd.DataFrame(),
+                          self.logical_path, self.schema, fmt="feather", csv_export=False)
+        elif self._csv is not None:
+            self._csv.close()
+
+        if self.fmt != "feather":
+            if os.path.exists(self._tmp):
+                os.replace(self._tmp, self.path)
+            else:
+                write_dataset(pd.DataFrame(), self.logical_path, self.schema, fmt=self.fmt, csv_export=False)
+
+        if self.csv_export:
+            write_dataset(read_dataset(self.path), self.logical_path, self.schema, fmt="csv")
+        return self.path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            if self._writer is not None:
+                self._writer.close()
+            if self._csv is not None:
+                self._csv.close()
+            if os.path.exists(self._tmp):
+                os.remove(self._tmp)
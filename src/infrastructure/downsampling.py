@@ -0,0 +1,60 @@
+# src/infrastructure/downsampling.py
+# Redução de séries para exibição: devolve ÍNDICES dos pontos mantidos (x crescente).
+#   - lttb: Largest-Triangle-Three-Buckets (preserva o formato visual, n_out pontos)
+#   - minmax: mínimo e máximo de cada bucket (preserva picos, até 2 pontos por bucket)
+
+import numpy as np
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # n_out-2 buckets entre o primeiro e o último ponto
+    edges = (np.arange(n_out - 1) * ((n - 2) / (n_out - 2)) + 1).astype(np.int64)
+    edges[-1] = n - 1
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo = hi
+        nhi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[nlo:nhi].mean()
+        avg_y = y[nlo:nhi].mean()
+        # área do triângulo (ponto escolhido anterior, candidato, média do próximo bucket)
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        idx[i + 1] = a
+    return idx
+
+
+def minmax(x: np.ndarray, y: np.ndarray, n_buckets: int) -> np.ndarray:
+    n = len(x)
+    if n_buckets <= 0 or 2 * n_buckets >= n:
+        return np.arange(n)
+    y = np.asarray(y, dtype=np.float64)
+
+    # bucket de cada ponto (por posição, buckets de tamanho ~igual)
+    bucket = (np.arange(n) * n_buckets) // n
+    order = np.lexsort((y, bucket))                 # dentro do bucket, y crescente
+    starts = np.searchsorted(bucket[order], np.arange(n_buckets), side="left")
+    ends = np.append(starts[1:], n) - 1
+    keep = np.concatenate([order[starts], order[ends]])
+    return np.unique(keep)                          # ordena por x e remove duplicados
+
+
+METHODS = {"lttb": lttb, "minmax": minmax}
+
+
+def downsample(x: np.ndarray, y: np.ndarray, width: int, method: str = "lttb") -> np.ndarray:
+    """Índices para desenhar a série em `width` pixels (~width pontos nos dois métodos)."""
+    if method == "lttb":
+        return lttb(x, y, int(width))
+    if method == "minmax":
+        return minmax(x, y, max(1, int(width) // 2))
+    raise ValueError(f"método de downsampling desconhecido: {method} (use {sorted(METHODS)})")
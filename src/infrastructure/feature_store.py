@@ -0,0 +1,224 @@
+# src/infrastructure/feature_store.py
+# Feature store: engenharia de features vetorizada + cache em disco (.npy)
+# Usado tanto pelo treinamento (MLTrainingService) quanto pela inferência (ModelInferenceService)
+
+import os
+import re
+import json
+import shutil
+import hashlib
+import tempfile
+from typing import Optional, Tuple, List
+
+import numpy as np
+import pandas as pd
+
+from infrastructure.dataset_io import read_dataset, locate_dataset, is_list_column
+
+
+# Versão da especificação de features: incremente ao mudar qualquer regra abaixo
+# (invalida automaticamente os caches em disco)
+FEATURE_SPEC_VERSION = "1"
+FEATURES: List[str] = ["priority", "triggerid", "lastchange", "desc_len", "host_count"]
+# colunas brutas lidas do dataset (projeção)
+RAW_COLUMNS: List[str] = ["priority", "triggerid", "lastchange", "description", "hosts"]
+
+
+def feature_spec_hash() -> str:
+    """Hash curto da especificação (versão + lista de features)."""
+    h = hashlib.sha256()
+    h.update(FEATURE_SPEC_VERSION.encode("utf-8"))
+    for f in FEATURES:
+        h.update(b"\0" + f.encode("utf-8"))
+    return h.hexdigest()[:12]
+
+
+def count_hosts(hosts: pd.Series) -> pd.Series:
+    """
+    Conta os hosts de cada linha sem ast.literal_eval.
+    Para strings do tipo "[{'hostid': '10084', 'name': 'Zabbix server'}]" conta as
+    ocorrências de 'hostid'; valores que não são lista contam como 1 (mesma regra
+    do antigo _parse_hosts_len). Colunas de lista (Parquet) usam o tamanho da lista.
+    """
+    if is_list_column(hosts):
+        return hosts.map(lambda v: len(v) if v is not None else 0).astype("int64")
+    s = hosts.astype(str).str.strip()
+    is_list = s.str.startswith("[") & s.str.endswith("]")
+    n = s.str.count(r"""['"]hostid['"]\s*:""")
+    return n.where(is_list, 1).astype("int64")
+
+
+def build_feature_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cria a visão NUMÉRICA do dataset (vetorizada):
+      - desc_len: len(description)
+      - host_count: quantidade de hosts
+      - priority, triggerid, lastchange convertidos para float
+    Colunas ausentes viram 0.
+    """
+    out = pd.DataFrame(index=df.index)
+    for col in ["priority", "triggerid", "lastchange"]:
+        out[col] = df[col] if col in df.columns else 0
+    out["desc_len"] = df["description"].astype(str).str.len() if "description" in df.columns else 0
+    out["host_count"] = count_hosts(df["hosts"]) if "hosts" in df.columns else 0
+
+    for col in FEATURES:
+        out[col] = pd.to_numeric(out[col], errors="coerce").fillna(0.0).astype("float64")
+    return out[FEATURES]
+
+
+def label_file(label_column: str) -> str:
+    """Nome do arquivo de labels da entrada (um por coluna de label pedida)."""
+    return "y." + re.sub(r"[^\w.-]", "_", label_column) + ".npy"
+
+
+def _file_hash(path: str, block_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(block_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class FeatureStore:
+    """
+    Cache de matrizes de features em disco.
+    Chave = hash do conteúdo do arquivo de entrada + hash da especificação de features.
+    Cada entrada é um diretório com X.npy (float64), y.<label>.npy (um por coluna de
+    label pedida, gravado sob demanda numa entrada já existente) e meta.json;
+    a leitura usa mmap (np.load(mmap_mode="r")), então processos diferentes
+    compartilham as mesmas páginas.
+    O dataset de treino é regravado a cada execução (hash novo -> entrada nova): só as
+    max_entries entradas usadas mais recentemente (mtime, renovado a cada hit) ficam em disco.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_entries: int = 3):
+        # cache_dir=None -> sem cache em disco (só computa em memória)
+        # max_entries<=0 -> sem limite
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    # ----- API em memória (inferência) -----
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        return build_feature_frame(df)
+
+    # ----- API baseada em arquivo (treino) -----
+    def cache_key(self, input_path: str) -> str:
+        return f"{_file_hash(locate_dataset(input_path))[:24]}-{feature_spec_hash()}"
+
+    def load_matrix(
+        self,
+        input_path: str,
+        label_column: Optional[str] = None,
+    ) -> Tuple[np.ndarray, Optional[np.ndarray], List[str]]:
+        """
+        Retorna (X, y, features) para o dataset informado, usando o cache se existir.
+        y é None quando label_column não é informado.
+        """
+        if not self.cache_dir:
+            return self._compute(input_path, label_column)
+
+        entry = os.path.join(self.cache_dir, self.cache_key(input_path))
+        x_path = os.path.join(entry, "X.npy")
+        y_path = os.path.join(entry, label_file(label_column)) if label_column else None
+
+        if os.path.exists(x_path) and label_column and not os.path.exists(y_path):
+            # entrada criada sem este label: completa só o y (X continua do cache)
+            self._write_labels(entry, label_column, self._labels(input_path, label_column))
+            print(f"[feature_store] labels '{label_column}' adicionados a {entry}")
+
+        if os.path.exists(x_path) and (label_column is None or os.path.exists(y_path)):
+            X = np.load(x_path, mmap_mode="r")
+            y = np.load(y_path, mmap_mode="r") if label_column else None
+            try:
+                os.utime(entry)  # LRU: hit renova a entrada
+            except OSError:
+                pass
+            print(f"[feature_store] cache hit: {entry}")
+            return X, y, list(FEATURES)
+
+        X, y, feats = self._compute(input_path, label_column)
+        self._write_entry(entry, input_path, X, y, label_column)
+        print(f"[feature_store] cache miss -> {entry}")
+        self.evict(keep=entry)
+        return X, y, feats
+
+    def evict(self, keep: Optional[str] = None) -> List[str]:
+        """Remove as entradas menos usadas além de max_entries (nunca `keep`); retorna as removidas."""
+        if not self.cache_dir or self.max_entries <= 0:
+            return []
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.startswith(".") or not os.path.isdir(path):
+                continue
+            try:
+                entries.append((os.stat(path).st_mtime_ns, path))
+            except FileNotFoundError:
+                continue  # removida por outro processo
+        entries.sort(reverse=True)
+        keep_abs = os.path.abspath(keep) if keep else None
+        removed = []
+        for _, path in entries[self.max_entries:]:
+            if os.path.abspath(path) == keep_abs:
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            removed.append(path)
+        if removed:
+            print(f"[feature_store] {len(removed)} entrada(s) antiga(s) removida(s)")
+        return removed
+
+    def _compute(self, input_path: str, label_column: Optional[str]):
+        columns = RAW_COLUMNS + ([label_column] if label_column else [])
+        df = read_dataset(input_path, columns=columns)
+        y = self._label_array(df, label_column) if label_column else None
+        X = build_feature_frame(df).to_numpy(dtype="float64")
+        return X, y, list(FEATURES)
+
+    @staticmethod
+    def _label_array(df: pd.DataFrame, label_column: str) -> np.ndarray:
+        if label_column not in df.columns:
+            raise ValueError(f"O dataset precisa conter a coluna '{label_column}' (0/1).")
+        return pd.to_numeric(df[label_column], errors="coerce").fillna(0).astype("int64").to_numpy()
+
+    def _labels(self, input_path: str, label_column: str) -> np.ndarray:
+        return self._label_array(read_dataset(input_path, columns=[label_column]), label_column)
+
+    def _write_labels(self, entry: str, label_column: str, y: np.ndarray):
+        # arquivo temporário + os.replace: leitores nunca veem um y parcial
+        fd, tmp = tempfile.mkstemp(prefix=".tmp-", suffix=".npy", dir=entry)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, np.ascontiguousarray(y))
+            os.replace(tmp, os.path.join(entry, label_file(label_column)))
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def _write_entry(self, entry: str, input_path: str, X: np.ndarray, y: Optional[np.ndarray],
+                     label_column: Optional[str] = None):
+        # Escreve num diretório temporário e renomeia (atômico; leitores nunca veem entrada parcial)
+        if os.path.exists(entry):
+            if y is not None and not os.path.exists(os.path.join(entry, label_file(label_column))):
+                self._write_labels(entry, label_column, y)
+            return
+        tmp = tempfile.mkdtemp(prefix=".tmp-", dir=self.cache_dir)
+        try:
+            np.save(os.path.join(tmp, "X.npy"), np.ascontiguousarray(X))
+            if y is not None:
+                np.save(os.path.join(tmp, label_file(label_column)), np.ascontiguousarray(y))
+            with open(os.path.join(tmp, "meta.json"), "w") as f:
+                json.dump({
+                    "source": os.path.abspath(locate_dataset(input_path)),
+                    "rows": int(X.shape[0]),
+                    "features": list(FEATURES),
+                    "feature_spec_version": FEATURE_SPEC_VERSION,
+                    "feature_spec_hash": feature_spec_hash(),
+                }, f, indent=2)
+            os.replace(tmp, entry)
+        except OSError:
+            # outro processo já criou a mesma entrada
+            shutil.rmtree(tmp, ignore_errors=True)
@@ -0,0 +1,321 @@
+# src/infrastructure/incident_report.py
+# Relatório de incidentes (RAISE_INCIDENT) incremental:
+#   - lê pending/executed JSONL a partir de offsets persistidos (JsonlTailer)
+#   - dedup/merge em estado SQLite (executed > pending), sem carregar o histórico
+#   - rollups por host e por itemkey (contagens, percentis de score e de tempo até execução)
+#     com reservatórios de tamanho fixo -> memória constante, independente do tamanho do log
+
+import json
+import math
+import os
+import random
+import sqlite3
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from infrastructure.jsonl_tailer import JsonlTailer
+from infrastructure.tracing import parse_ts
+from infrastructure.dataset_io import DatasetWriter
+
+REPORT_COLUMNS = ["datetime", "host", "itemkey", "value", "score", "ts_iso", "status"]
+ROLLUP_DIMS = ("host", "itemkey")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS incidents (
+    key       TEXT PRIMARY KEY,     -- json [host, itemkey, ts_iso]
+    id        TEXT,
+    datetime  TEXT,
+    dt_sort   REAL,                 -- epoch (s) de datetime, para ordenar
+    host      TEXT,
+    itemkey   TEXT,
+    value     REAL,
+    score     REAL,
+    ts_iso    TEXT,
+    status    TEXT,
+    tte_s     REAL                  -- tempo publicação -> execução (s)
+);
+CREATE INDEX IF NOT EXISTS incidents_dt ON incidents(dt_sort);
+CREATE TABLE IF NOT EXISTS sources (
+    path   TEXT PRIMARY KEY,
+    state  TEXT                     -- json {"offset", "inode", "head", "head_len"} do JsonlTailer
+);
+CREATE TABLE IF NOT EXISTS rollups (
+    dim    TEXT,
+    key    TEXT,
+    state  TEXT,                    -- json do _Rollup
+    PRIMARY KEY (dim, key)
+);
+"""
+
+
+def _num(v) -> Optional[float]:
+    try:
+        f = float(v)
+    except (TypeError, ValueError):
+        return None
+    return f if math.isfinite(f) else None
+
+
+def incident_from_pending(r: Dict) -> Optional[Dict]:
+    if r.get("type") != "RAISE_INCIDENT":
+        return None
+    return {
+        "id": r.get("id"),
+        "datetime": r.get("published_at") or r.get("ts_iso") or "",
+        "host": r.get("host"),
+        "itemkey": r.get("itemkey"),
+        "value": _num(r.get("value")),
+        "score": _num(r.get("score")),
+        "ts_iso": r.get("ts_iso"),
+        "status": "pending",
+        "tte_s": None,
+    }
+
+
+def incident_from_executed(r: Dict) -> Optional[Dict]:
+    act = r.get("action") or {}
+    if act.get("type") != "RAISE_INCIDENT":
+        return None
+    executed, published = parse_ts(r.get("ts_executed")), parse_ts(act.get("published_at"))
+    return {
+        "id": r.get("id"),
+        "datetime": r.get("ts_executed") or act.get("ts_iso") or "",
+        "host": act.get("host"),
+        "itemkey": act.get("itemkey"),
+        "value": _num(act.get("value")),
+        "score": _num(act.get("score")),
+        "ts_iso": act.get("ts_iso"),
+        "status": "executed",
+        "tte_s": (executed - published) if executed is not None and published is not None else None,
+    }
+
+
+class _Reservoir:
+    """Amostra uniforme de tamanho fixo (algoritmo R) para percentis aproximados."""
+
+    def __init__(self, size: int, n: int = 0, sample: Optional[List[float]] = None):
+        self.size = size
+        self.n = n
+        self.sample = sample or []
+
+    def add(self, x: float, rng: random.Random):
+        self.n += 1
+        if len(self.sample) < self.size:
+            self.sample.append(x)
+        else:
+            j = rng.randrange(self.n)
+            if j < self.size:
+                self.sample[j] = x
+
+    def percentiles(self, qs) -> Dict[str, Optional[float]]:
+        if not self.sample:
+            return {f"p{q}": None for q in qs}
+        vals = np.percentile(np.asarray(self.sample, dtype=np.float64), qs)
+        return {f"p{q}": float(v) for q, v in zip(qs, vals)}
+
+
+class _Rollup:
+    def __init__(self, reservoir_size: int, state: Optional[Dict] = None):
+        state = state or {}
+        self.count = state.get("count", 0)
+        self.pending = state.get("pending", 0)
+        self.executed = state.get("executed", 0)
+        self.score_sum = state.get("score_sum", 0.0)
+        self.score_min = state.get("score_min")
+        self.score_max = state.get("score_max")
+        self.tte_sum = state.get("tte_sum", 0.0)
+        self.last_datetime = state.get("last_datetime")
+        self.scores = _Reservoir(reservoir_size, state.get("score_n", 0), state.get("score_sample"))
+        self.tte = _Reservoir(reservoir_size, state.get("tte_n", 0), state.get("tte_sample"))
+
+    def add_incident(self, inc: Dict, rng: random.Random):
+        self.count += 1
+        self.pending += inc["status"] == "pending"
+        self.executed += inc["status"] == "executed"
+        s = inc["score"]
+        if s is not None:
+            self.score_sum += s
+            self.score_min = s if self.score_min is None else min(self.score_min, s)
+            self.score_max = s if self.score_max is None else max(self.score_max, s)
+            self.scores.add(s, rng)
+        if inc["datetime"] and (self.last_datetime is None or inc["datetime"] > self.last_datetime):
+            self.last_datetime = inc["datetime"]
+
+    def mark_executed(self, inc: Dict, rng: random.Random):
+        self.pending -= 1
+        self.executed += 1
+        self.add_tte(inc, rng)
+
+    def add_tte(self, inc: Dict, rng: random.Random):
+        if inc["tte_s"] is not None:
+            self.tte_sum += inc["tte_s"]
+            self.tte.add(inc["tte_s"], rng)
+
+    def state(self) -> Dict:
+        return {
+            "count": self.count, "pending": self.pending, "executed": self.executed,
+            "score_sum": self.score_sum, "score_min": self.score_min, "score_max": self.score_max,
+            "score_n": self.scores.n, "score_sample": self.scores.sample,
+            "tte_sum": self.tte_sum, "tte_n": self.tte.n, "tte_sample": self.tte.sample,
+            "last_datetime": self.last_datetime,
+        }
+
+    def summary(self) -> Dict:
+        return {
+            "count": self.count,
+            "pending": self.pending,
+            "executed": self.executed,
+            "score_mean": (self.score_sum / self.scores.n) if self.scores.n else None,
+            "score_min": self.score_min,
+            "score_max": self.score_max,
+            **{f"score_{k}": v for k, v in self.scores.percentiles([50, 90, 99]).items()},
+            "tte_mean_s": (self.tte_sum / self.tte.n) if self.tte.n else None,
+            **{f"tte_{k}_s": v for k, v in self.tte.percentiles([50, 95]).items()},
+            "last_datetime": self.last_datetime,
+        }
+
+
+class IncidentReportService:
+    """
+    Estado do relatório em SQLite (state_path). Cada ingest() processa só as linhas
+    novas dos JSONL e grava offsets + incidentes + rollups na mesma transação.
+    """
+
+    def __init__(self, state_path: str, reservoir_size: int = 512, seed: int = 42):
+        os.makedirs(os.path.dirname(state_path) or ".", exist_ok=True)
+        self.state_path = state_path
+        self.reservoir_size = reservoir_size
+        self._rng = random.Random(seed)
+        self.conn = sqlite3.connect(state_path)
+        self.conn.executescript(_SCHEMA)
+        self._rollups: Dict[tuple, _Rollup] = {}
+        self._dirty = set()
+        for dim, key, state in self.conn.execute("SELECT dim, key, state FROM rollups"):
+            self._rollups[(dim, key)] = _Rollup(reservoir_size, json.loads(state))
+
+    def close(self):
+        self.conn.close()
+
+    # ----- ingestão -----
+    def _tailer(self, path: str) -> JsonlTailer:
+        row = self.conn.execute("SELECT state FROM sources WHERE path = ?", (path,)).fetchone()
+        return JsonlTailer.from_state(path, json.loads(row[0]) if row else None)
+
+    def _rollup(self, dim: str, key) -> _Rollup:
+        k = (dim, "" if key is None else str(key))
+        if k not in self._rollups:
+            self._rollups[k] = _Rollup(self.reservoir_size)
+        self._dirty.add(k)
+        return self._rollups[k]
+
+    def _merge(self, inc: Dict) -> str:
+        key = json.dumps([inc["host"], inc["itemkey"], inc["ts_iso"]])
+        row = self.conn.execute("SELECT status FROM incidents WHERE key = ?", (key,)).fetchone()
+        values = (inc["id"], inc["datetime"], parse_ts(inc["datetime"]), inc["host"], inc["itemkey"],
+                  inc["value"], inc["score"], inc["ts_iso"], inc["status"], inc["tte_s"], key)
+
+        if row is None:
+            self.conn.execute(
+                "INSERT INTO incidents (id, datetime, dt_sort, host, itemkey, value, score, ts_iso,"
+                " status, tte_s, key) VALUES (?,?,?,?,?,?,?,?,?,?,?)", values)
+            for dim in ROLLUP_DIMS:
+                r = self._rollup(dim, inc[dim])
+                r.add_incident(inc, self._rng)
+                if inc["status"] == "executed":
+                    r.add_tte(inc, self._rng)
+            return "new"
+
+        if row[0] == "pending" and inc["status"] == "executed":
+            # executed prevalece sobre pending (mesma regra do relatório completo)
+            self.conn.execute(
+                "UPDATE incidents SET id=?, datetime=?, dt_sort=?, host=?, itemkey=?, value=?, score=?,"
+                " ts_iso=?, status=?, tte_s=? WHERE key=?", values)
+            for dim in ROLLUP_DIMS:
+                self._rollup(dim, inc[dim]).mark_executed(inc, self._rng)
+            return "updated"
+        return "duplicate"
+
+    def ingest(self, pending_path: str, executed_path: str) -> Dict:
+        counts = {"lines": 0, "new": 0, "updated": 0, "duplicate": 0}
+        with self.conn:  # transação única: offsets só avançam junto com o estado
+            for path, parse in ((pending_path, incident_from_pending), (executed_path, incident_from_executed)):
+                tailer = self._tailer(path)
+                for rec in tailer.read():
+                    inc = parse(rec)
+                    if inc is not None:
+                        counts[self._merge(inc)] += 1
+                counts["lines"] += tailer.lines_read
+                self.conn.execute("INSERT OR REPLACE INTO sources (path, state) VALUES (?, ?)",
+                                  (path, json.dumps(tailer.state())))
+            for k in self._dirty:
+                self.conn.execute("INSERT OR REPLACE INTO rollups (dim, key, state) VALUES (?, ?, ?)",
+                                  (k[0], k[1], json.dumps(self._rollups[k].state())))
+        self._dirty.clear()
+        return counts
+
+    # ----- consultas -----
+    def total(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM incidents").fetchone()[0]
+
+    def iter_incidents(self, chunksize: int = 10_000) -> Iterator[pd.DataFrame]:
+        """Incidentes ordenados por datetime (sem data válida no fim), em chunks."""
+        cur = self.conn.execute(
+            f"SELECT {', '.join(REPORT_COLUMNS)} FROM incidents ORDER BY dt_sort IS NULL, dt_sort, key")
+        while True:
+            rows = cur.fetchmany(chunksize)
+            if not rows:
+                break
+            yield pd.DataFrame.from_records(rows, columns=REPORT_COLUMNS)
+
+    def rollups(self) -> Dict[str, Dict[str, Dict]]:
+        out: Dict[str, Dict[str, Dict]] = {dim: {} for dim in ROLLUP_DIMS}
+        for (dim, key), r in sorted(self._rollups.items()):
+            out[dim][key] = r.summary()
+        return out
+
+    # ----- saídas -----
+    def write_table(self, path: str, fmt: str = "csv") -> str:
+        with DatasetWriter(path, "incidents", fmt=fmt, csv_export=False) as writer:
+            for chunk in self.iter_incidents():
+                writer.write(chunk)
+        return writer.path
+
+    def write_rollups(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"total": self.total(), **self.rollups()}, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def write_markdown(self, path: str):
+        def fmt(v, spec=".6f"):
+            return "" if v is None or (isinstance(v, float) and math.isnan(v)) else format(v, spec)
+
+        rollups = self.rollups()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("# Incident Report (RAISE_INCIDENT)\n\n")
+            f.write(f"- Total: **{self.total()}**\n\n")
+
+            for dim in ROLLUP_DIMS:
+                f.write(f"## Por {dim}\n\n")
+                f.write(f"| {dim} | total | pending | executed | score p50 | score p90 | score p99 | tte p50 (s) | tte p95 (s) |\n")
+                f.write("|---|---:|---:|---:|---:|---:|---:|---:|---:|\n")
+                for key, s in rollups[dim].items():
+                    label = f"`{key}`" if dim == "itemkey" else key
+                    f.write(f"| {label} | {s['count']} | {s['pending']} | {s['executed']} | {fmt(s['score_p50'])} |"
+                            f" {fmt(s['score_p90'])} | {fmt(s['score_p99'])} | {fmt(s['tte_p50_s'], '.1f')} |"
+                            f" {fmt(s['tte_p95_s'], '.1f')} |\n")
+                f.write("\n")
+
+            f.write("## Incidentes\n\n")
+            f.write("| datetime | host | itemkey | value | score | ts_iso | status |\n")
+            f.write("|---|---|---|---:|---:|---|---|\n")
+            for chunk in self.iter_incidents():
+                for r in chunk.itertuples(index=False):
+                    f.write(f"| {r.datetime} | {r.host} | `{r.itemkey}` | {fmt(r.value)} | {fmt(r.score)} |"
+                            f" {r.ts_iso} | {r.status} |\n")
+        os.replace(tmp, path)
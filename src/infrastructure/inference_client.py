@@ -0,0 +1,47 @@
+# src/infrastructure/inference_client.py
+# Cliente leve (só stdlib) do servidor de inferência: agentes pedem scores sem
+# importar sklearn/pandas nem carregar o modelo.
+
+import json
+import urllib.request
+from typing import Dict, List
+
+
+class InferenceClient:
+    def __init__(self, base_url: str, timeout: float = 10.0, chunk_size: int = 500):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+
+    def _request(self, path: str, payload=None) -> Dict:
+        data = None
+        headers = {}
+        if payload is not None:
+            data = json.dumps(payload, default=str).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        req = urllib.request.Request(self.base_url + path, data=data, headers=headers,
+                                     method="POST" if data is not None else "GET")
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+            return json.loads(resp.read().decode("utf-8"))
+
+    def predict(self, rows: List[Dict]) -> Dict[str, list]:
+        """
+        rows: registros com as colunas brutas (triggerid, description, priority, ...).
+        Retorna {"pred_score": [...], "pred_label": [...], "version": ...}.
+        """
+        out = {"pred_score": [], "pred_label": [], "version": None}
+        for i in range(0, len(rows), self.chunk_size):
+            resp = self._request("/predict", {"rows": rows[i:i + self.chunk_size]})
+            out["pred_score"].extend(resp["pred_score"])
+            out["pred_label"].extend(resp["pred_label"])
+            out["version"] = resp.get("version")
+        return out
+
+    def stats(self) -> Dict:
+        return self._request("/stats")
+
+    def health(self) -> bool:
+        try:
+            return self._request("/health").get("status") == "ok"
+        except Exception:
+            return False
@@ -0,0 +1,208 @@
+# src/infrastructure/inference_server.py
+# Servidor HTTP local de inferência: um ModelInferenceService "quente" compartilhado,
+# com micro-batching (junta requisições concorrentes até max_batch linhas ou max_wait_ms).
+
+import json
+import queue
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from infrastructure.model_inference_service import ModelInferenceService
+from infrastructure.prediction_cache import CachedInferenceService, PredictionCache
+
+
+class _Pending:
+    __slots__ = ("rows", "enqueued", "done", "result", "error")
+
+    def __init__(self, rows: List[Dict]):
+        self.rows = rows
+        self.enqueued = time.perf_counter()
+        self.done = threading.Event()
+        self.result: Optional[Dict] = None
+        self.error: Optional[str] = None
+
+
+class MicroBatcher:
+    """
+    Uma thread consome a fila: pega a primeira requisição, espera até max_wait_ms
+    por outras (ou até max_batch linhas) e pontua tudo numa única chamada.
+    """
+
+    def __init__(
+        self,
+        service: ModelInferenceService,
+        *,
+        max_batch: int = 256,
+        max_wait_ms: float = 5.0,
+        stats_window: int = 10000,
+    ):
+        self.service = service
+        self.max_batch = max_batch
+        self.max_wait_s = max_wait_ms / 1000.0
+        self._queue: "queue.Queue[_Pending]" = queue.Queue()
+        self._latencies_ms = deque(maxlen=stats_window)
+        self._batch_sizes = deque(maxlen=stats_window)
+        self._requests = 0
+        self._rows = 0
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._loop, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, rows: List[Dict], timeout: float = 30.0) -> Dict:
+        item = _Pending(rows)
+        self._queue.put(item)
+        if not item.done.wait(timeout):
+            raise TimeoutError("timeout aguardando o micro-batch")
+        if item.error:
+            raise RuntimeError(item.error)
+        return item.result
+
+    def _collect(self) -> List[_Pending]:
+        first = self._queue.get()
+        batch, n_rows = [first], len(first.rows)
+        deadline = time.perf_counter() + self.max_wait_s
+        while n_rows < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            n_rows += len(item.rows)
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._collect()
+            try:
+                self.service.reload_if_changed()
+                rows = [r for item in batch for r in item.rows]
+                out = self.service.predict_batch(pd.DataFrame.from_records(rows))
+                scores = out["pred_score"].to_numpy(dtype=float)
+                labels = out["pred_label"].to_numpy()
+                start = 0
+                for item in batch:
+                    end = start + len(item.rows)
+                    item.result = {
+                        "pred_score": scores[start:end].tolist(),
+                        "pred_label": [int(v) for v in labels[start:end]],
+                        "version": self.service.version,
+                    }
+                    start = end
+            except Exception as e:
+                for item in batch:
+                    item.error = str(e)
+            now = time.perf_counter()
+            with self._lock:
+                self._batch_sizes.append(sum(len(i.rows) for i in batch))
+                for item in batch:
+                    self._latencies_ms.append((now - item.enqueued) * 1000.0)
+                    self._requests += 1
+                    self._rows += len(item.rows)
+            for item in batch:
+                item.done.set()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lat = np.asarray(self._latencies_ms) if self._latencies_ms else None
+            sizes = np.asarray(self._batch_sizes) if self._batch_sizes else None
+            return {
+                "requests": self._requests,
+                "rows": self._rows,
+                "queue_depth": self._queue.qsize(),
+                "latency_ms_p50": float(np.percentile(lat, 50)) if lat is not None else None,
+                "latency_ms_p99": float(np.percentile(lat, 99)) if lat is not None else None,
+                "batch_size_mean": float(sizes.mean()) if sizes is not None else None,
+                "batch_size_max": int(sizes.max()) if sizes is not None else None,
+                "batches": len(self._batch_sizes),
+                "model_version": self.service.version,
+                "max_batch": self.max_batch,
+                "max_wait_ms": self.max_wait_s * 1000.0,
+                # CachedInferenceService expõe hit ratio / tempo economizado
+                "cache": self.service.stats() if hasattr(self.service, "stats") else None,
+            }
+
+
+def _make_handler(batcher: MicroBatcher):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, code: int, payload: Dict):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send(200, {"status": "ok", "model_version": batcher.service.version})
+            elif self.path == "/stats":
+                self._send(200, batcher.stats())
+            else:
+                self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path != "/predict":
+                self._send(404, {"error": "not found"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", "0"))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                rows = payload.get("rows") or []
+                if not isinstance(rows, list):
+                    raise ValueError("'rows' deve ser uma lista de registros")
+            except Exception as e:
+                self._send(400, {"error": str(e)})
+                return
+            if not rows:
+                self._send(200, {"pred_score": [], "pred_label": [], "version": batcher.service.version})
+                return
+            try:
+                self._send(200, batcher.submit(rows))
+            except Exception as e:
+                self._send(500, {"error": str(e)})
+
+        def log_message(self, fmt, *args):
+            pass  # sem log por requisição (hot path)
+
+    return Handler
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # backlog maior: muitos clientes concorrentes por ciclo
+
+
+class InferenceServer:
+    def __init__(self, service: ModelInferenceService, host: str = "0.0.0.0", port: int = 8081,
+                 *, max_batch: int = 256, max_wait_ms: float = 5.0,
+                 cache: Optional[PredictionCache] = None):
+        if cache is not None:
+            service = CachedInferenceService(service, cache)
+        self.cache = cache
+        self.batcher = MicroBatcher(service, max_batch=max_batch, max_wait_ms=max_wait_ms)
+        self.httpd = _HTTPServer((host, port), _make_handler(self.batcher))
+
+    @property
+    def address(self):
+        return self.httpd.server_address
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def start_background(self) -> threading.Thread:
+        t = threading.Thread(target=self.serve_forever, name="inference-http", daemon=True)
+        t.start()
+        return t
+
+    def shutdown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,101 @@
+# src/infrastructure/jsonl_tailer.py
+# Leitura incremental de arquivos JSONL a partir de um offset em bytes persistido.
+# Usado pelo relatório de incidentes e por consumidores contínuos (ex.: recomendador).
+
+import hashlib
+import json
+import os
+from typing import Dict, Iterator, Optional, Tuple
+
+
+class JsonlTailer:
+    """
+    Lê só as linhas novas de um JSONL desde o último offset.
+      - linha final incompleta (sem '\\n') fica para a próxima leitura
+      - arquivo truncado ou trocado (inode diferente) recomeça do início
+      - truncado no lugar e reescrito além do offset (mesmo inode, tamanho maior) também:
+        o início do arquivo (até HEAD_BYTES já lidos) é comparado com uma impressão digital
+      - linhas inválidas são puladas (mesma regra do read_jsonl antigo)
+    O estado ({"offset", "inode", "head", "head_len"}) deve ser persistido pelo chamador
+    junto com o resultado do processamento, para não reprocessar nem perder linhas.
+    """
+
+    HEAD_BYTES = 1024
+
+    def __init__(self, path: str, offset: int = 0, inode: Optional[int] = None,
+                 head: Optional[str] = None, head_len: int = 0):
+        self.path = path
+        self.offset = int(offset or 0)
+        self.inode = inode
+        self.head = head          # sha1 dos primeiros head_len bytes já lidos
+        self.head_len = int(head_len or 0)
+        self.lines_read = 0
+        self.invalid_lines = 0
+
+    @classmethod
+    def from_state(cls, path: str, state: Optional[Dict]) -> "JsonlTailer":
+        state = state or {}
+        return cls(path, state.get("offset", 0), state.get("inode"), state.get("head"), state.get("head_len", 0))
+
+    def state(self) -> Dict:
+        return {"offset": self.offset, "inode": self.inode, "head": self.head, "head_len": self.head_len}
+
+    @staticmethod
+    def _fingerprint(f, n: int) -> str:
+        f.seek(0)
+        return hashlib.sha1(f.read(n)).hexdigest()
+
+    def _check_rotation(self, st: os.stat_result, f):
+        rotated = (self.inode is not None and st.st_ino != self.inode) or st.st_size < self.offset
+        if not rotated and self.offset and self.head is not None and self.head_len:
+            # estado antigo (sem head) não tem como ser conferido
+            rotated = self._fingerprint(f, self.head_len) != self.head
+        if rotated:
+            self.offset = 0
+            self.head, self.head_len = None, 0
+        self.inode = st.st_ino
+
+    def _update_head(self, f):
+        n = min(self.offset, self.HEAD_BYTES)
+        if n > self.head_len:
+            pos = f.tell()
+            self.head, self.head_len = self._fingerprint(f, n), n
+            f.seek(pos)
+
+    def read_lines(self, max_lines: Optional[int] = None) -> Iterator[Tuple[bytes, int]]:
+        """Gera (linha_bruta, offset_após_a_linha); o offset só avança em linhas completas."""
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        n = 0
+        with f:
+            st = os.fstat(f.fileno())
+            self._check_rotation(st, f)
+            if st.st_size == self.offset:
+                return
+            f.seek(self.offset)
+            while max_lines is None or n < max_lines:
+                raw = f.readline()
+                if not raw.endswith(b"\n"):
+                    break  # fim do arquivo ou escritor ainda no meio da linha
+                self.offset += len(raw)
+                n += 1
+                if self.head_len < self.HEAD_BYTES:
+                    self._update_head(f)
+                yield raw, self.offset
+        self.lines_read += n
+
+    def read(self, max_lines: Optional[int] = None) -> Iterator[Dict]:
+        """Gera os registros JSON novos (dicts)."""
+        for raw, _ in self.read_lines(max_lines):
+            raw = raw.strip()
+            if not raw:
+                continue
+            try:
+                rec = json.loads(raw)
+            except json.JSONDecodeError:
+                self.invalid_lines += 1
+                continue
+            if isinstance(rec, dict):
+                yield rec
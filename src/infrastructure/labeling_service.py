@@ -1,18 +1,26 @@
 import pandas as pd
 
+from infrastructure.dataset_io import read_dataset, write_dataset
+
 class LabelingService:
-    def __init__(self, input_file, output_file):
+    def __init__(self, input_file=None, output_file=None, threshold=0.5):
         self.input_file = input_file
         self.output_file = output_file
+        self.threshold = threshold
+
+    def label_frame(self, df):
+        """Cria a coluna label (priority > threshold = 1, caso contrário 0), vetorizado."""
+        df = df.copy()
+        priority = pd.to_numeric(df["priority"], errors="coerce")
+        df["label"] = (priority > self.threshold).astype("int64")
+        return df
 
     def run(self):
         # Carrega o dataset
-        df = pd.read_csv(self.input_file)
+        df = read_dataset(self.input_file)
 
-        # Cria a coluna label (priority > 0.5 = 1, caso contrário 0)
-        df["label"] = df["priority"].apply(lambda x: 1 if x > 0.5 else 0)
+        df = self.label_frame(df)
 
         # Salva no novo arquivo
-        df.to_csv(self.output_file, index=False)
-        print(f"Arquivo com labels salvo em: {self.output_file}")
-
+        out = write_dataset(df, self.output_file, "triggers_processed")
+        print(f"Arquivo com labels salvo em: {out}")
@@ -0,0 +1,321 @@
+# src/infrastructure/metrics.py
+# Instrumentação Prometheus compartilhada pelos agentes (sem dependências externas).
+#
+#   metrics = AgentMetrics("collector")     # sobe GET /metrics em METRICS_PORT (0 = desligado)
+#   with metrics.cycle():                    # histograma de duração + ciclos ok/erro
+#       with metrics.api_call("zabbix", "trigger.get"):
+#           ...
+#       metrics.rows_written("triggers", len(df))
+#
+# Em laços quentes, acumule localmente e registre uma vez por lote: cada chamada
+# custa um lookup em dict + lock (~1-2 µs).
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(v: str) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(v: float) -> str:
+    v = float(v)
+    if v == float("inf"):
+        return "+Inf"
+    return str(int(v)) if v.is_integer() and abs(v) < 1e15 else repr(v)
+
+
+class _Child:
+    __slots__ = ("value", "lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self.lock:
+            self.value += amount
+
+    def set(self, value: float):
+        self.value = float(value)
+
+    def dec(self, amount: float = 1.0):
+        self.inc(-amount)
+
+
+class _HistogramChild:
+    __slots__ = ("upper", "counts", "sum", "count", "lock")
+
+    def __init__(self, upper: Tuple[float, ...]):
+        self.upper = upper
+        self.counts = [0] * (len(upper) + 1)   # último = +Inf (não cumulativo; acumula no render)
+        self.sum = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def observe(self, value: float):
+        i = bisect_left(self.upper, value)
+        with self.lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    @contextmanager
+    def time(self):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0)
+
+
+class _Family:
+    kind = "untyped"
+
+    def __init__(self, name: str, doc: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        return _Child()
+
+    def labels(self, *values, **kw):
+        key = tuple(str(v) for v in values) if values else tuple(str(kw[n]) for n in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name}: esperados labels {self.labelnames}, recebidos {key}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _label_str(self, key: Tuple[str, ...], extra: str = "") -> str:
+        parts = [f'{n}="{_escape(v)}"' for n, v in zip(self.labelnames, key)]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in sorted(self._children.items()):
+            lines.append(f"{self.name}{self._label_str(key)} {_fmt(child.value)}")
+        return lines
+
+
+class Counter(_Family):
+    kind = "counter"
+
+
+class Gauge(_Family):
+    kind = "gauge"
+
+
+class Histogram(_Family):
+    kind = "histogram"
+
+    def __init__(self, name: str, doc: str, labelnames: Sequence[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, doc, labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in sorted(self._children.items()):
+            with child.lock:
+                counts, total, n = list(child.counts), child.sum, child.count
+            acc = 0
+            for upper, c in zip(self.buckets + (float("inf"),), counts):
+                acc += c
+                le = 'le="%s"' % _fmt(upper)
+                lines.append(f"{self.name}_bucket{self._label_str(key, le)} {acc}")
+            lines.append(f"{self.name}_sum{self._label_str(key)} {_fmt(total)}")
+            lines.append(f"{self.name}_count{self._label_str(key)} {n}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._families: Dict[str, _Family] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, *args, **kw):
+        with self._lock:
+            fam = self._families.get(name)
+            if fam is None:
+                fam = self._families[name] = cls(name, *args, **kw)
+            elif not isinstance(fam, cls):
+                raise ValueError(f"métrica {name} já registrada como {fam.kind}")
+            return fam
+
+    def counter(self, name: str, doc: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get(Counter, name, doc, labelnames)
+
+    def gauge(self, name: str, doc: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get(Gauge, name, doc, labelnames)
+
+    def histogram(self, name: str, doc: str, labelnames: Sequence[str] = (),
+                  buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, doc, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        with self._lock:
+            families = list(self._families.values())
+        lines: List[str] = []
+        for fam in families:
+            lines.extend(fam.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+# ----- servidor /metrics -----
+def _make_handler(registry: Registry):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return Handler
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+_server: Optional[_HTTPServer] = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: Optional[int] = None, addr: str = "0.0.0.0",
+                         registry: Registry = REGISTRY) -> Optional[_HTTPServer]:
+    """Sobe o endpoint /metrics numa thread daemon (uma vez por processo). port=0 desliga."""
+    global _server
+    port = int(os.getenv("METRICS_PORT", "0")) if port is None else port
+    if not port:
+        return None
+    with _server_lock:
+        if _server is None:
+            _server = _HTTPServer((addr, port), _make_handler(registry))
+            threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+            print(f"[metrics] /metrics em http://{addr}:{_server.server_address[1]}", flush=True)
+        return _server
+
+
+# ----- métricas padrão dos agentes -----
+class AgentMetrics:
+    """Conjunto padrão de métricas de um agente (todas com o label agent=<nome>)."""
+
+    def __init__(self, agent: str, registry: Registry = REGISTRY, serve: bool = True):
+        self.agent = agent
+        self.registry = registry
+        r = registry
+        self._cycle = r.histogram("agent_cycle_duration_seconds", "Duração de cada ciclo/etapa do agente",
+                                  ("agent", "stage"))
+        self._cycles = r.counter("agent_cycles_total", "Ciclos executados por status", ("agent", "status"))
+        self._last_ok = r.gauge("agent_last_success_timestamp_seconds", "Epoch do último ciclo sem erro", ("agent",))
+        self._read = r.counter("agent_rows_read_total", "Linhas lidas", ("agent", "dataset"))
+        self._written = r.counter("agent_rows_written_total", "Linhas gravadas/publicadas", ("agent", "dataset"))
+        self._fit = r.histogram("agent_model_fit_seconds", "Tempo de ajuste de modelo", ("agent", "model"))
+        self._score = r.histogram("agent_model_score_seconds", "Tempo de score/predição", ("agent", "model"),
+                                  buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0))
+        self._api = r.histogram("agent_api_call_duration_seconds", "Latência de chamadas a APIs externas",
+                                ("agent", "api", "method"))
+        self._api_errors = r.counter("agent_api_errors_total", "Chamadas a APIs que falharam", ("agent", "api", "method"))
+        self._queue = r.gauge("agent_queue_depth", "Itens aguardando numa fila", ("agent", "queue"))
+        self._dedupe = r.gauge("agent_dedupe_state_size", "Entradas no estado de deduplicação", ("agent", "state"))
+        self._latency = r.histogram("agent_action_latency_seconds", "Latência por estágio, da amostra à ação executada",
+                                    ("agent", "stage"),
+                                    buckets=(0.01, 0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0))
+        r.gauge("agent_start_time_seconds", "Epoch de início do processo", ("agent",)).labels(agent).set(time.time())
+        if serve:
+            start_metrics_server()
+
+    @contextmanager
+    def cycle(self, stage: str = "cycle"):
+        t0 = time.perf_counter()
+        status = "error"
+        try:
+            yield
+            status = "ok"
+        finally:
+            self._cycle.labels(self.agent, stage).observe(time.perf_counter() - t0)
+            if stage == "cycle":
+                self._cycles.labels(self.agent, status).inc()
+                if status == "ok":
+                    self._last_ok.labels(self.agent).set(time.time())
+
+    def observe_stage(self, stage: str, seconds: float):
+        self._cycle.labels(self.agent, stage).observe(seconds)
+
+    def rows_read(self, dataset: str, n: int):
+        self._read.labels(self.agent, dataset).inc(n)
+
+    def rows_written(self, dataset: str, n: int):
+        self._written.labels(self.agent, dataset).inc(n)
+
+    def model_fit(self, model: str):
+        return self._fit.labels(self.agent, model).time()
+
+    def model_score(self, model: str):
+        return self._score.labels(self.agent, model).time()
+
+    def observe_fit(self, model: str, seconds: float):
+        self._fit.labels(self.agent, model).observe(seconds)
+
+    def observe_score(self, model: str, seconds: float):
+        self._score.labels(self.agent, model).observe(seconds)
+
+    @contextmanager
+    def api_call(self, api: str, method: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self._api_errors.labels(self.agent, api, method).inc()
+            raise
+        finally:
+            self._api.labels(self.agent, api, method).observe(time.perf_counter() - t0)
+
+    def queue_depth(self, queue: str, n: int):
+        self._queue.labels(self.agent, queue).set(n)
+
+    def dedupe_size(self, state: str, n: int):
+        self._dedupe.labels(self.agent, state).set(n)
+
+    def observe_latency(self, latencies: Dict[str, Optional[float]]):
+        """Latências por estágio de uma ação (saída de tracing.stage_latencies)."""
+        for stage, seconds in latencies.items():
+            if seconds is not None and seconds >= 0:
+                self._latency.labels(self.agent, stage).observe(seconds)
+
+    def linger(self):
+        """Jobs de execução única: mantém /metrics no ar por METRICS_LINGER_SEC para o último scrape."""
+        seconds = float(os.getenv("METRICS_LINGER_SEC", "0"))
+        if seconds > 0 and _server is not None:
+            time.sleep(seconds)
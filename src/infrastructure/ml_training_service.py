@@ -1,65 +1,109 @@
 # src/infrastructure/ml_training_service.py
 # Serviço de treinamento com engenharia de features, métricas e gráficos
 # Compatível com seu main.py atual (train_and_save)
+# sklearn/joblib são importados nas funções que treinam/carregam modelos e matplotlib só
+# na renderização adiada dos gráficos (infrastructure/training_plots.py).
 
 import os
 import json
-import ast
+import math
+import time
+import warnings
+from datetime import datetime, timezone
 from typing import Optional, Tuple, List
 
-import joblib
+import numpy as np
 import pandas as pd
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import (
-    classification_report,
-    precision_recall_fscore_support,
-    roc_auc_score,
-    roc_curve,
-    confusion_matrix,
-    ConfusionMatrixDisplay,
-)
-from sklearn.model_selection import train_test_split
-
-# backend headless para salvar imagens em container/servidor
-import matplotlib
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
+
+from infrastructure.feature_store import FeatureStore, FEATURES, build_feature_frame, feature_spec_hash
+from infrastructure.model_registry import ModelRegistry
+from infrastructure.compiled_forest import compile_forest
+from infrastructure.training_plots import save_plot_data, render_plots
 
 
 # ----------------------------
 # Helpers de engenharia de features
 # ----------------------------
 
-def _parse_hosts_len(x: str) -> int:
-    """
-    Converte a string do tipo "[{'hostid': '10084', 'name': 'Zabbix server'}]"
-    no tamanho da lista (quantos hosts). Em caso de erro, retorna 1.
-    """
-    try:
-        v = ast.literal_eval(str(x))
-        return len(v) if isinstance(v, list) else 1
-    except Exception:
-        return 1
-
-
 def _build_numeric_view(df: pd.DataFrame) -> Tuple[pd.DataFrame, List[str]]:
     """
-    Cria uma visão NUMÉRICA do dataset:
+    Cria uma visão NUMÉRICA do dataset (delegada ao feature store):
       - desc_len: len(description)
       - host_count: len(lista de hosts)
       - priority, triggerid, lastchange convertidos para float
     """
-    work = df.copy()
+    X = build_feature_frame(df)
+    return X, list(FEATURES)
 
-    work["desc_len"] = work["description"].astype(str).str.len()
-    work["host_count"] = work["hosts"].astype(str).apply(_parse_hosts_len)
 
-    for col in ["priority", "triggerid", "lastchange", "desc_len", "host_count"]:
-        work[col] = pd.to_numeric(work[col], errors="coerce").fillna(0.0)
+# ----------------------------
+# Helpers de linhagem (treino incremental)
+# ----------------------------
+
+def _row_hashes(X: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Hash (uint64) de cada linha = vetor de features + label."""
+    frame = pd.DataFrame(np.asarray(X))
+    frame["__label__"] = np.asarray(y)
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy(dtype="uint64")
 
-    features = ["priority", "triggerid", "lastchange", "desc_len", "host_count"]
-    X = work[features]
-    return X, features
+
+def _lineage_paths(model_path: str) -> Tuple[str, str]:
+    base, _ = os.path.splitext(model_path)
+    return base + ".lineage.json", base + ".rows.npy"
+
+
+def _load_lineage(model_path: str) -> Tuple[Optional[dict], Optional[np.ndarray]]:
+    meta_path, rows_path = _lineage_paths(model_path)
+    if not (os.path.exists(meta_path) and os.path.exists(rows_path)):
+        return None, None
+    try:
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+        return meta, np.load(rows_path)
+    except Exception as e:
+        print(f"[ml_trainer] aviso: linhagem ilegível ({e}); treino completo")
+        return None, None
+
+
+def _save_lineage(model_path: str, meta: dict, row_hashes: np.ndarray):
+    meta_path, rows_path = _lineage_paths(model_path)
+    tmp_rows = rows_path + ".tmp.npy"
+    np.save(tmp_rows, np.unique(row_hashes))
+    os.replace(tmp_rows, rows_path)
+    tmp_meta = meta_path + ".tmp"
+    with open(tmp_meta, "w") as f:
+        json.dump(meta, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_meta, meta_path)
+
+
+def _load_previous_model(model_path: str):
+    if not os.path.exists(model_path):
+        return None
+    import joblib
+    from sklearn.ensemble import RandomForestClassifier
+
+    obj = joblib.load(model_path)
+    # aceita tanto o classificador "puro" quanto o bundle {"model", "features"}
+    if isinstance(obj, dict):
+        obj = obj.get("model")
+    return obj if isinstance(obj, RandomForestClassifier) else None
+
+
+# mínimo de linhas novas para separar um holdout não ajustado no treino incremental
+_MIN_INCREMENTAL_HOLDOUT = 10
+
+
+def _load_previous_metrics(metrics_path: str) -> dict:
+    """Métricas da última avaliação (metrics.json), ou {} se não houver."""
+    try:
+        with open(metrics_path) as f:
+            report = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(report, dict):
+        return {}
+    report.pop("_search_", None)
+    return report
 
 
 # ----------------------------
@@ -67,9 +111,19 @@ def _build_numeric_view(df: pd.DataFrame) -> Tuple[pd.DataFrame, List[str]]:
 # ----------------------------
 
 class MLTrainingService:
-    def __init__(self):
-        """Serviço de treinamento com features numéricas embutidas."""
-        pass
+    def __init__(self, feature_store_dir: Optional[str] = None, registry_dir: Optional[str] = None,
+                 feature_store_max_entries: int = 3, registry_keep: int = 5):
+        """
+        Serviço de treinamento com features numéricas do feature store.
+        feature_store_dir: diretório de cache das matrizes (None = sem cache em disco).
+        feature_store_max_entries: matrizes mantidas no cache (as mais recentes; 0 = sem limite).
+        registry_keep: versões mantidas no registro após cada publicação (além da atual e da
+        anterior; 0 = não remove nenhuma).
+        registry_dir: registro de modelos versionado (None = só grava model_path).
+        """
+        self.feature_store = FeatureStore(feature_store_dir, max_entries=feature_store_max_entries)
+        self.registry = ModelRegistry(registry_dir) if registry_dir else None
+        self.registry_keep = registry_keep
 
     def train_and_save(
         self,
@@ -84,6 +138,14 @@ class MLTrainingService:
         max_depth: Optional[int] = None,
         generate_plots: bool = True,            # <-- habilita gráficos por padrão
         plots_dir: Optional[str] = None,        # ex.: "/data/reports"
+        render_plots_now: bool = False,         # False: só grava plot_data.json (render_plots depois)
+        incremental: bool = False,              # warm start a partir do modelo anterior
+        max_trees: Optional[int] = None,        # teto da floresta (descarta as árvores mais antigas)
+        replay_ratio: float = 0.2,              # fração de linhas antigas reamostradas por incremento
+        search: bool = False,                   # busca de hiperparâmetros antes do fit final
+        search_budget_s: float = 60.0,
+        latency_budget_ms: Optional[float] = None,
+        search_workers: Optional[int] = None,
     ):
         """
         Treina RandomForest e salva artefatos (modelo, métricas, importâncias e gráficos).
@@ -96,42 +158,113 @@ class MLTrainingService:
 
         Kwargs úteis:
           - test_size, random_state, n_estimators, max_depth
-          - generate_plots: se True, salva ROC e Matriz de Confusão
-          - plots_dir: diretório para gráficos (obrigatório se generate_plots=True)
+          - generate_plots: se True, salva os dados de ROC e Matriz de Confusão (plot_data.json)
+          - plots_dir: diretório para gráficos (padrão: diretório das métricas)
+          - render_plots_now: desenha os PNGs já no treino; por padrão a renderização fica
+            para depois (render_plots / scripts/render_training_plots.py)
+          - incremental: carrega o modelo anterior e treina novas árvores só nas
+            linhas novas desde o último treino (linhagem em <modelo>.lineage.json)
+          - max_trees: limite de árvores no modo incremental (remove as mais antigas)
+          - replay_ratio: linhas antigas misturadas a cada incremento (evita esquecer classes)
+          - search: successive halving (CV, process pool) no conjunto de treino, limitado a
+            search_budget_s segundos; escolhe o melhor F1 com latência por linha
+            <= latency_budget_ms e grava a fronteira em metrics.json (_search_)
         """
-        # 1) Carregar dataset
-        df = pd.read_csv(input_path)
-        if "label" not in df.columns:
-            raise ValueError("O dataset precisa conter a coluna 'label' (0/1).")
-
-        y = pd.to_numeric(df["label"], errors="coerce").fillna(0).astype(int)
-
-        # 2) Features numéricas
-        X, feat_names = _build_numeric_view(df)
-
-        # 3) Split
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=test_size, random_state=random_state, stratify=y
-        )
-
-        # 4) Modelo
-        clf = RandomForestClassifier(
-            n_estimators=n_estimators,
-            max_depth=max_depth,
-            class_weight="balanced_subsample",
-            random_state=random_state,
-            n_jobs=-1,
-        )
-        clf.fit(X_train, y_train)
+        import joblib
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.metrics import classification_report, precision_recall_fscore_support, roc_auc_score
+        from sklearn.model_selection import train_test_split
+
+        # 1-2) Dataset + features numéricas (cache em disco via feature store)
+        X, y, feat_names = self.feature_store.load_matrix(input_path, label_column="label")
+        row_hashes = _row_hashes(X, y)
+        search_result = None
+
+        fitted = None
+        if incremental:
+            fitted = self._fit_incremental(
+                X, y, row_hashes, model_path,
+                test_size=test_size,
+                random_state=random_state,
+                n_estimators=n_estimators,
+                max_trees=max_trees,
+                replay_ratio=replay_ratio,
+            )
+            if fitted is not None and fitted.get("noop"):
+                print("[ml_trainer] nenhuma linha nova desde o último treino; modelo mantido")
+                return {
+                    "model_path": model_path,
+                    "metrics_path": metrics_path,
+                    "feature_importances_path": feature_imp_path,
+                    "features": feat_names,
+                    "mode": "noop",
+                    "rows_new": 0,
+                }
+
+        eval_skipped = None
+        if fitted is not None:
+            clf = fitted["clf"]
+            X_test, y_test = fitted["X_test"], fitted["y_test"]
+            eval_skipped = fitted["eval_skipped"]
+            lineage_entry = fitted["lineage"]
+        else:
+            # 3) Split
+            X_train, X_test, y_train, y_test = train_test_split(
+                X, y, test_size=test_size, random_state=random_state, stratify=y
+            )
 
-        # 5) Avaliação
-        # Relatório padrão (usa threshold interno do RF) e evita warnings nas métricas
-        y_pred = clf.predict(X_test)
-        report = classification_report(y_test, y_pred, output_dict=True, zero_division=0)
+            # 4) Modelo (hiperparâmetros fixos ou vindos da busca)
+            params = {"n_estimators": n_estimators, "max_depth": max_depth}
+            if search:
+                from infrastructure.model_search import HyperparameterSearch
+
+                search_result = HyperparameterSearch(
+                    time_budget_s=search_budget_s,
+                    max_workers=search_workers,
+                    random_state=random_state,
+                ).run(X_train, y_train, latency_budget_ms=latency_budget_ms)
+                if search_result["best_params"]:
+                    params = dict(search_result["best_params"])
+                    print(f"[ml_trainer] busca: melhores parâmetros {params}")
+                else:
+                    print("[ml_trainer] busca sem resultados no orçamento; usando parâmetros padrão")
+            clf = RandomForestClassifier(
+                class_weight="balanced_subsample",
+                random_state=random_state,
+                n_jobs=-1,
+                **params,
+            )
+            t0 = time.perf_counter()
+            clf.fit(X_train, y_train)
+            lineage_entry = {
+                "mode": "full",
+                "rows_total": int(len(y)),
+                "rows_new": int(len(y)),
+                "rows_fitted": int(len(y_train)),
+                "trees_added": int(params["n_estimators"]),
+                "fit_seconds": round(time.perf_counter() - t0, 4),
+            }
 
-        # Probabilidade para ROC e threshold alternativo
-        diagnostics = {"features": feat_names}
+        # 5) Avaliação
+        y_pred = y_proba = score_seconds = None
+        if eval_skipped:
+            # sem holdout: mantém as métricas da avaliação anterior e marca a avaliação como pulada
+            print(f"[ml_trainer] avaliação pulada: {eval_skipped}; métricas anteriores mantidas")
+            report = _load_previous_metrics(metrics_path)
+            report["_evaluation_"] = {"skipped": True, "reason": eval_skipped, "metrics_from": "previous"}
+            diagnostics = dict(report.get("_diagnostics_") or {}, features=feat_names)
+        else:
+            # Relatório padrão (usa threshold interno do RF) e evita warnings nas métricas
+            t0 = time.perf_counter()
+            y_pred = clf.predict(X_test)
+            score_seconds = time.perf_counter() - t0
+            report = classification_report(y_test, y_pred, output_dict=True, zero_division=0)
+            report["_evaluation_"] = {"skipped": False, "rows": int(len(y_test))}
+            diagnostics = {"features": feat_names}
         try:
+            if eval_skipped:
+                raise LookupError("sem holdout")
+            # Probabilidade para ROC e threshold alternativo
             y_proba = clf.predict_proba(X_test)[:, 1]
 
             # Métricas com threshold alternativo 0.4 (diagnóstico)
@@ -154,7 +287,10 @@ class MLTrainingService:
         except Exception:
             y_proba = None  # modelo sem predict_proba
 
+        diagnostics["training"] = lineage_entry
         report["_diagnostics_"] = diagnostics
+        if search_result is not None:
+            report["_search_"] = search_result
 
         # 6) Persistência (modelo/métricas/importâncias)
         os.makedirs(os.path.dirname(model_path), exist_ok=True)
@@ -162,7 +298,31 @@ class MLTrainingService:
         if feature_imp_path:
             os.makedirs(os.path.dirname(feature_imp_path), exist_ok=True)
 
-        joblib.dump(clf, model_path)
+        # bundle no formato esperado pelo ModelInferenceService
+        joblib.dump({"model": clf, "features": feat_names}, model_path)
+
+        lineage_meta, _ = _load_lineage(model_path)
+        history = (lineage_meta or {}).get("history", [])
+        lineage_entry = dict(lineage_entry, n_estimators=len(clf.estimators_),
+                             ts=datetime.now(timezone.utc).isoformat(),
+                             input=os.path.abspath(input_path))
+        history.append(lineage_entry)
+        _save_lineage(model_path, {"rows_seen": int(len(np.unique(row_hashes))),
+                                   "history": history[-100:]}, row_hashes)
+
+        version = None
+        if self.registry is not None:
+            previous = self.registry.current_version()
+            version = self.registry.publish(
+                clf,
+                feat_names,
+                feature_spec_hash=feature_spec_hash(),
+                metrics={k: v for k, v in report.items() if k != "_search_"},
+                arrays=compile_forest(clf),  # avaliador compilado (mmap) para inferência
+                extra={"training": lineage_entry},
+            )
+            if self.registry_keep > 0:
+                self.registry.prune(keep=self.registry_keep, protect=[previous])
 
         with open(metrics_path, "w") as f:
             json.dump(report, f, indent=2, ensure_ascii=False)
@@ -173,38 +333,18 @@ class MLTrainingService:
             ).sort_values("importance", ascending=False)
             fi.to_csv(feature_imp_path, index=False)
 
-        # 7) Gráficos (opcional)
-        if generate_plots:
+        # 7) Gráficos (opcional): dados agora, PNGs depois (ou já, com render_plots_now)
+        plot_data_path = None
+        if generate_plots and y_pred is not None:
             if not plots_dir:
                 # usa o diretório das métricas por padrão
                 plots_dir = os.path.dirname(metrics_path)
-            os.makedirs(plots_dir, exist_ok=True)
-
-            # ROC (se houver proba)
-            if y_proba is not None:
-                try:
-                    fpr, tpr, _ = roc_curve(y_test, y_proba)
-                    plt.figure()
-                    plt.plot(fpr, tpr, linewidth=2)
-                    plt.plot([0, 1], [0, 1], "--")
-                    plt.xlabel("FPR")
-                    plt.ylabel("TPR")
-                    plt.title("ROC Curve")
-                    plt.savefig(os.path.join(plots_dir, "roc_curve.png"), bbox_inches="tight")
-                    plt.close()
-                except Exception as e:
-                    print(f"[ml_trainer] aviso: falha ao salvar ROC: {e}")
-
-            # Matriz de confusão (threshold 0.5)
             try:
-                cm = confusion_matrix(y_test, y_pred)
-                disp = ConfusionMatrixDisplay(confusion_matrix=cm)
-                disp.plot()
-                plt.title("Confusion Matrix (thr=0.5)")
-                plt.savefig(os.path.join(plots_dir, "confusion_matrix.png"), bbox_inches="tight")
-                plt.close()
+                plot_data_path = save_plot_data(plots_dir, y_test, y_pred, y_proba)
+                if render_plots_now:
+                    render_plots(plot_data_path, plots_dir)
             except Exception as e:
-                print(f"[ml_trainer] aviso: falha ao salvar matriz de confusão: {e}")
+                print(f"[ml_trainer] aviso: falha ao salvar dados dos gráficos: {e}")
 
         # Logs úteis
         print("[ml_trainer] features usadas:", feat_names)
@@ -218,5 +358,105 @@ class MLTrainingService:
             "metrics_path": metrics_path,
             "feature_importances_path": feature_imp_path,
             "features": feat_names,
+            "mode": lineage_entry["mode"],
+            "rows_new": lineage_entry["rows_new"],
+            "rows_total": lineage_entry["rows_total"],
+            "fit_seconds": lineage_entry["fit_seconds"],
+            "score_seconds": score_seconds,
+            "rows_scored": int(len(y_test)) if y_pred is not None else 0,
+            "evaluation_skipped": bool(eval_skipped),
+            "version": version,
             "report": report,
+            "plot_data_path": plot_data_path,
+        }
+
+    def _fit_incremental(
+        self,
+        X: np.ndarray,
+        y: np.ndarray,
+        row_hashes: np.ndarray,
+        model_path: str,
+        *,
+        test_size: float,
+        random_state: int,
+        n_estimators: int,
+        max_trees: Optional[int],
+        replay_ratio: float,
+    ) -> Optional[dict]:
+        """
+        Cresce a floresta anterior (warm_start) com árvores treinadas só nas linhas novas
+        (+ uma amostra de linhas antigas). Retorna None quando é preciso treino completo.
+        """
+        _, seen = _load_lineage(model_path)
+        clf = _load_previous_model(model_path)
+        if seen is None or clf is None:
+            print("[ml_trainer] sem modelo/linhagem anterior; treino completo")
+            return None
+
+        new_mask = ~np.isin(row_hashes, seen)
+        n_new = int(new_mask.sum())
+        if n_new == 0:
+            return {"noop": True}
+
+        from sklearn.model_selection import train_test_split
+
+        rng = np.random.default_rng(random_state)
+        new_idx = np.flatnonzero(new_mask)
+        old_idx = np.flatnonzero(~new_mask)
+        n_replay = min(len(old_idx), int(math.ceil(n_new * replay_ratio)))
+        replay_idx = rng.choice(old_idx, size=n_replay, replace=False) if n_replay else old_idx[:0]
+
+        # holdout só das linhas novas: as antigas já foram vistas pelas árvores anteriores,
+        # então não servem de teste. Com poucas linhas novas não há holdout e a avaliação
+        # é pulada (nunca pontua o modelo nas linhas em que acabou de treinar).
+        y_new = y[new_idx]
+        counts = np.bincount(y_new.astype(int))
+        test_idx = None
+        if len(new_idx) >= _MIN_INCREMENTAL_HOLDOUT:
+            stratify = y_new if len(counts[counts > 0]) > 1 and (counts[counts > 0] >= 2).all() else None
+            fit_new, test_idx = train_test_split(
+                new_idx, test_size=test_size, random_state=random_state, stratify=stratify
+            )
+        else:
+            fit_new = new_idx
+
+        fit_idx = np.concatenate([fit_new, replay_idx])
+        if set(np.unique(y[fit_idx])) != set(clf.classes_):
+            print("[ml_trainer] classes do incremento diferem do modelo; treino completo")
+            return None
+
+        trees_added = max(10, int(math.ceil(n_estimators * n_new / len(y))))
+        before = len(clf.estimators_)
+        clf.set_params(warm_start=True, n_estimators=before + trees_added)
+        with warnings.catch_warnings():
+            # balanced_subsample + warm_start: pesos recalculados só no incremento (intencional)
+            warnings.simplefilter("ignore", UserWarning)
+            t0 = time.perf_counter()
+            clf.fit(X[fit_idx], y[fit_idx])
+            fit_seconds = time.perf_counter() - t0
+
+        dropped = 0
+        if max_trees and len(clf.estimators_) > max_trees:
+            dropped = len(clf.estimators_) - max_trees
+            clf.estimators_ = clf.estimators_[dropped:]
+            clf.set_params(n_estimators=len(clf.estimators_))
+
+        print(f"[ml_trainer] incremental: {n_new} linhas novas, +{trees_added} árvores"
+              f" (-{dropped} antigas), total={len(clf.estimators_)}")
+        return {
+            "clf": clf,
+            "X_test": X[test_idx] if test_idx is not None else None,
+            "y_test": y[test_idx] if test_idx is not None else None,
+            "eval_skipped": None if test_idx is not None else
+                f"{n_new} linhas novas (< {_MIN_INCREMENTAL_HOLDOUT}): sem holdout fora do ajuste",
+            "lineage": {
+                "mode": "incremental",
+                "rows_total": int(len(y)),
+                "rows_new": n_new,
+                "rows_fitted": int(len(fit_idx)),
+                "rows_replayed": int(n_replay),
+                "trees_added": int(trees_added),
+                "trees_dropped": int(dropped),
+                "fit_seconds": round(fit_seconds, 4),
+            },
         }
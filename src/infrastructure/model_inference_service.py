@@ -1,41 +1,137 @@
 import os
-import joblib
+import threading
+import numpy as np
 import pandas as pd
-from typing import Dict, List
+from typing import Dict, List, Optional
+
+from infrastructure.feature_store import FeatureStore, FEATURES
+from infrastructure.model_registry import ModelRegistry
+from infrastructure.compiled_forest import CompiledForest, has_compiled_forest
 
 class ModelInferenceService:
     """
     Carrega o modelo treinado (joblib) e faz predições em lote.
-    Espera um dict com {"model": sklearn_estimator, "features": [..]}.
+    Espera um dict com {"model": sklearn_estimator, "features": [..]};
+    um estimador "puro" (formato antigo) usa as features padrão do feature store.
+    Com use_compiled=True, florestas são avaliadas pelo CompiledForest (arrays NumPy)
+    em lotes de até compiled_max_batch linhas; lotes maiores vão para o sklearn.
+    Versões do registro com arrays compilados não carregam o estimador sklearn na partida:
+    ele só é desserializado no primeiro lote que precisar dele (self.model).
     """
 
-    def __init__(self, model_path: str):
-        if not os.path.exists(model_path):
+    def __init__(
+        self,
+        model_path: Optional[str] = None,
+        *,
+        registry_dir: Optional[str] = None,
+        use_compiled: bool = True,
+        compiled_max_batch: int = 256,
+    ):
+        self.use_compiled = use_compiled
+        self.compiled_max_batch = compiled_max_batch
+        self.registry = ModelRegistry(registry_dir) if registry_dir else None
+        self.version: Optional[str] = None
+        self.feature_store = FeatureStore()
+        self._model_lock = threading.Lock()
+
+        if self.registry is not None and self.registry.current_version():
+            self._apply_bundle(self.registry.load(lazy_model=use_compiled))
+            return
+        if not model_path or not os.path.exists(model_path):
             raise FileNotFoundError(f"Modelo não encontrado em: {model_path}")
-        bundle = joblib.load(model_path)
-        self.model = bundle["model"]
+        import joblib
+        self._apply_bundle(joblib.load(model_path))
+
+    @classmethod
+    def from_registry(cls, registry_dir: str) -> "ModelInferenceService":
+        return cls(registry_dir=registry_dir)
+
+    def _apply_bundle(self, bundle):
+        if not isinstance(bundle, dict):
+            bundle = {"model": bundle, "features": list(FEATURES)}
+        self._model = bundle["model"]
+        self._load_model = bundle.get("load_model")
         self.features: List[str] = bundle["features"]
+        self.version = bundle.get("version")
+
+        # avaliador compilado: arrays do registro (mmap) ou exportados na hora
+        self.compiled: Optional[CompiledForest] = None
+        if self.use_compiled:
+            arrays = bundle.get("arrays") or {}
+            if has_compiled_forest(arrays):
+                self.compiled = CompiledForest(arrays)
+            elif hasattr(self.model, "estimators_") and hasattr(self.model, "classes_"):
+                self.compiled = CompiledForest.from_sklearn(self.model)
+
+    @property
+    def model(self):
+        """Estimador sklearn (carregado na primeira vez que um lote cai fora do avaliador compilado)."""
+        if self._model is None and self._load_model is not None:
+            with self._model_lock:
+                if self._model is None:
+                    self._model = self._load_model()["model"]
+        return self._model
+
+    def reload_if_changed(self) -> bool:
+        """Troca para a versão atual do registro se mudou (custo: um stat). Retorna True se recarregou."""
+        if self.registry is None:
+            return False
+        new_version = self.registry.poll(self.version)
+        if not new_version:
+            return False
+        self._apply_bundle(self.registry.load(new_version, lazy_model=self.use_compiled))
+        print(f"[inference] modelo recarregado: versão {new_version}")
+        return True
 
     def prepare_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        # Garante as colunas esperadas pelo modelo; preenche ausentes com 0
-        X = pd.DataFrame()
+        # Features derivadas (desc_len, host_count, ...) vêm do feature store,
+        # com as mesmas regras do treino; demais ausentes são preenchidas com 0
+        derived = self.feature_store.transform(df)
+        X = pd.DataFrame(index=df.index)
         for col in self.features:
-            X[col] = df[col] if col in df.columns else 0
+            if col in FEATURES:
+                X[col] = derived[col]
+            else:
+                X[col] = df[col] if col in df.columns else 0
         return X
 
+    def feature_matrix(self, df: pd.DataFrame) -> np.ndarray:
+        """Matriz float64 (linhas x self.features) montada direto em NumPy."""
+        derived = self.feature_store.transform(df)
+        cols = []
+        for col in self.features:
+            if col in FEATURES:
+                cols.append(derived[col].to_numpy(dtype=np.float64))
+            elif col in df.columns:
+                cols.append(pd.to_numeric(df[col], errors="coerce").fillna(0.0).to_numpy(dtype=np.float64))
+            else:
+                cols.append(np.zeros(len(df), dtype=np.float64))
+        return np.column_stack(cols) if cols else np.empty((len(df), 0))
+
+    def predict_matrix(self, X: np.ndarray) -> Dict[str, np.ndarray]:
+        """Scores para uma matriz já pronta: {"pred_score": ..., "pred_label": ...}."""
+        if self.compiled is not None and len(X) <= self.compiled_max_batch:
+            proba = self.compiled.predict_proba(X)
+            return {
+                "pred_score": proba[:, 1] if proba.shape[1] > 1 else np.zeros(len(X)),
+                "pred_label": self.compiled.classes_[np.argmax(proba, axis=1)],
+            }
+        if hasattr(self.model, "feature_names_in_"):
+            X = pd.DataFrame(X, columns=self.features)
+        if hasattr(self.model, "predict_proba"):
+            score = self.model.predict_proba(X)[:, 1]
+        else:
+            score = np.zeros(len(X))
+        return {"pred_score": score, "pred_label": self.model.predict(X)}
+
     def predict_batch(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Retorna DataFrame com colunas:
           - pred_label
           - pred_score (probabilidade da classe 1, se disponível)
         """
-        X = self.prepare_features(df)
+        out = self.predict_matrix(self.feature_matrix(df))
         result = pd.DataFrame(index=df.index)
-        if hasattr(self.model, "predict_proba"):
-            proba = self.model.predict_proba(X)
-            result["pred_score"] = proba[:, 1]
-        else:
-            result["pred_score"] = 0.0
-        result["pred_label"] = self.model.predict(X)
+        result["pred_score"] = out["pred_score"]
+        result["pred_label"] = out["pred_label"]
         return result
-
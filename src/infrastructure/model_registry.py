@@ -0,0 +1,168 @@
+# src/infrastructure/model_registry.py
+# Registro de modelos versionado: cada versão é um diretório imutável com o bundle
+# (modelo + features + hash da spec + métricas + timestamp) e um ponteiro atômico "CURRENT".
+
+import os
+import json
+import uuid
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+class ModelRegistry:
+    """
+    Layout em disco:
+      <root>/versions/<versão>/model.joblib   (joblib sem compressão -> carregável com mmap)
+      <root>/versions/<versão>/arrays/*.npy    (arrays auxiliares, sempre abertos com mmap)
+      <root>/versions/<versão>/meta.json
+      <root>/CURRENT                           (nome da versão ativa; trocado com os.replace)
+
+    Consumidores fazem poll() (apenas um stat do CURRENT) e só recarregam quando muda.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.versions_dir = os.path.join(root, "versions")
+        self.current_path = os.path.join(root, "CURRENT")
+        os.makedirs(self.versions_dir, exist_ok=True)
+        self._stat: Optional[Tuple[int, int]] = None
+        self._stat_version: Optional[str] = None
+
+    # ----- escrita -----
+    def publish(
+        self,
+        model,
+        features: List[str],
+        *,
+        feature_spec_hash: Optional[str] = None,
+        metrics: Optional[Dict] = None,
+        arrays: Optional[Dict[str, np.ndarray]] = None,
+        extra: Optional[Dict] = None,
+        make_current: bool = True,
+    ) -> str:
+        trained_at = datetime.now(timezone.utc)
+        version = trained_at.strftime("%Y%m%dT%H%M%S") + "-" + uuid.uuid4().hex[:6]
+
+        import joblib
+
+        tmp = tempfile.mkdtemp(prefix=".tmp-", dir=self.versions_dir)
+        try:
+            joblib.dump({"model": model, "features": list(features)},
+                        os.path.join(tmp, "model.joblib"), compress=0)
+            if arrays:
+                os.makedirs(os.path.join(tmp, "arrays"))
+                for name, arr in arrays.items():
+                    np.save(os.path.join(tmp, "arrays", f"{name}.npy"), np.ascontiguousarray(arr))
+            meta = {
+                "version": version,
+                "trained_at": trained_at.isoformat(),
+                "features": list(features),
+                "feature_spec_hash": feature_spec_hash,
+                "metrics": metrics or {},
+                "arrays": sorted(arrays) if arrays else [],
+            }
+            meta.update(extra or {})
+            with open(os.path.join(tmp, "meta.json"), "w") as f:
+                json.dump(meta, f, indent=2, ensure_ascii=False, default=str)
+            os.replace(tmp, os.path.join(self.versions_dir, version))
+        except Exception:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+
+        if make_current:
+            self.set_current(version)
+        print(f"[model_registry] versão publicada: {version}")
+        return version
+
+    def set_current(self, version: str):
+        if not os.path.isdir(os.path.join(self.versions_dir, version)):
+            raise FileNotFoundError(f"Versão inexistente no registro: {version}")
+        tmp = self.current_path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(version + "\n")
+        os.replace(tmp, self.current_path)
+
+    def prune(self, keep: int = 5, protect: Iterable[Optional[str]] = ()) -> List[str]:
+        """
+        Remove versões antigas, mantendo as `keep` mais recentes, a atual e as de `protect`
+        (ex.: a versão anterior, para rollback). Retorna as versões removidas.
+        """
+        spared = {self.current_version(), *protect}
+        versions = self.list_versions()
+        removed = []
+        for v in versions[:-keep] if keep > 0 else versions:
+            if v not in spared:
+                shutil.rmtree(os.path.join(self.versions_dir, v), ignore_errors=True)
+                removed.append(v)
+        if removed:
+            print(f"[model_registry] {len(removed)} versão(ões) antiga(s) removida(s)")
+        return removed
+
+    # ----- leitura -----
+    def list_versions(self) -> List[str]:
+        """Versões em ordem de publicação (timestamp do nome; empate no mesmo segundo pelo mtime)."""
+        def order(v):
+            try:
+                return v.split("-", 1)[0], os.stat(os.path.join(self.versions_dir, v)).st_mtime_ns
+            except FileNotFoundError:
+                return v.split("-", 1)[0], 0
+        return sorted((v for v in os.listdir(self.versions_dir) if not v.startswith(".")), key=order)
+
+    def current_version(self) -> Optional[str]:
+        try:
+            with open(self.current_path, "r") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def poll(self, known_version: Optional[str]) -> Optional[str]:
+        """
+        Retorna a versão atual se for diferente de known_version, senão None.
+        Custo: um os.stat; o arquivo só é lido quando mtime/tamanho mudam.
+        """
+        try:
+            st = os.stat(self.current_path)
+        except FileNotFoundError:
+            return None
+        key = (st.st_mtime_ns, st.st_ino)
+        if key != self._stat:
+            self._stat = key
+            self._stat_version = self.current_version()
+        return self._stat_version if self._stat_version != known_version else None
+
+    def meta(self, version: str) -> Dict:
+        with open(os.path.join(self.versions_dir, version, "meta.json"), "r") as f:
+            return json.load(f)
+
+    def load(self, version: Optional[str] = None, mmap: bool = True, lazy_model: bool = False) -> Dict:
+        """
+        Carrega o bundle {"model", "features", "version", "meta", "arrays"}.
+        Com mmap=True os arrays numpy são mapeados em memória (somente leitura).
+        Com lazy_model=True e arrays exportados, o estimador (joblib/sklearn) não é carregado:
+        "model" fica None e "load_model" devolve o bundle do joblib quando for preciso.
+        """
+        version = version or self.current_version()
+        if not version:
+            raise FileNotFoundError(f"Nenhuma versão ativa em: {self.root}")
+        vdir = os.path.join(self.versions_dir, version)
+        mode = "r" if mmap else None
+        meta = self.meta(version)
+
+        def load_model():
+            import joblib
+            return joblib.load(os.path.join(vdir, "model.joblib"), mmap_mode=mode)
+
+        if lazy_model and meta.get("arrays") and meta.get("features"):
+            bundle = {"model": None, "features": list(meta["features"]), "load_model": load_model}
+        else:
+            bundle = load_model()
+        arrays = {
+            name: np.load(os.path.join(vdir, "arrays", f"{name}.npy"), mmap_mode=mode)
+            for name in meta.get("arrays", [])
+        }
+        bundle.update({"version": version, "meta": meta, "arrays": arrays})
+        return bundle
@@ -0,0 +1,236 @@
+# src/infrastructure/model_search.py
+# Busca de hiperparâmetros com orçamento de tempo (successive halving em process pool)
+# Registra a fronteira custo/qualidade: tempo de fit, latência de inferência e F1 por candidato
+
+import os
+import time
+import signal
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+DEFAULT_GRID: Dict[str, list] = {
+    "n_estimators": [25, 50, 100, 200],
+    "max_depth": [4, 8, 16, None],
+    "min_samples_leaf": [1, 5],
+}
+
+# Dados compartilhados por worker (enviados uma vez via initializer, não por tarefa)
+_X = None
+_y = None
+
+
+def _init_worker(X: np.ndarray, y: np.ndarray, pids=None):
+    global _X, _y
+    _X, _y = X, y
+    if pids is not None:
+        pids.put(os.getpid())  # o processo pai encerra os workers por PID ao estourar o orçamento
+
+
+def _median_ms(fn, repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000.0)
+    return float(np.median(times))
+
+
+def _evaluate_candidate(params: dict, rows: np.ndarray, n_splits: int, random_state: int) -> dict:
+    """Avalia um candidato com CV estratificado num subconjunto de linhas (executa no worker)."""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import f1_score
+    from sklearn.model_selection import StratifiedKFold
+
+    X, y = _X[rows], _y[rows]
+    cv = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+    f1s, fit_times = [], []
+    clf = None
+    X_val = None
+    for tr, va in cv.split(X, y):
+        clf = RandomForestClassifier(
+            class_weight="balanced_subsample",
+            random_state=random_state,
+            n_jobs=1,
+            **params,
+        )
+        t0 = time.perf_counter()
+        clf.fit(X[tr], y[tr])
+        fit_times.append(time.perf_counter() - t0)
+        X_val = X[va]
+        f1s.append(f1_score(y[va], clf.predict(X_val), zero_division=0))
+
+    # latência de inferência do último fold: 1 linha e lote do fold de validação
+    one = X_val[:1]
+    lat_row = _median_ms(lambda: clf.predict_proba(one), repeats=15)
+    lat_batch = _median_ms(lambda: clf.predict_proba(X_val), repeats=3)
+    return {
+        "params": params,
+        "rows": int(len(rows)),
+        "f1_mean": float(np.mean(f1s)),
+        "f1_std": float(np.std(f1s)),
+        "fit_time_s": float(np.mean(fit_times)),
+        "latency_ms_row": lat_row,
+        "latency_us_per_row_batch": lat_batch * 1000.0 / max(1, len(X_val)),
+    }
+
+
+def _pareto(results: List[dict]) -> List[dict]:
+    """Marca os candidatos não dominados em (F1 maior, latência menor)."""
+    for r in results:
+        r["pareto"] = not any(
+            o is not r
+            and o["f1_mean"] >= r["f1_mean"]
+            and o["latency_ms_row"] <= r["latency_ms_row"]
+            and (o["f1_mean"] > r["f1_mean"] or o["latency_ms_row"] < r["latency_ms_row"])
+            for o in results
+        )
+    return results
+
+
+def _worker_pids(pids) -> List[int]:
+    """PIDs registrados pelos workers no initializer."""
+    out = []
+    while not pids.empty():
+        out.append(pids.get())
+    return out
+
+
+def _shutdown_now(pool: ProcessPoolExecutor, pids: List[int]):
+    """Fecha o pool sem esperar os candidatos em execução (o fit do sklearn não é interrompível)."""
+    pool.shutdown(wait=False, cancel_futures=True)
+    for pid in pids:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass  # worker já saiu
+    # com os workers mortos o pool vira "broken" e a thread de gerência sai sem esperar fits
+    pool.shutdown(wait=True)
+
+
+class HyperparameterSearch:
+    """
+    Successive halving com orçamento de parede:
+      - rodada i avalia os candidatos sobreviventes com min_rows * eta^i linhas (CV);
+      - mantém o melhor 1/eta por F1 e repete até usar todas as linhas;
+      - ao estourar o orçamento, usa os resultados da rodada mais alta já concluída;
+        candidatos ainda em execução são abandonados (workers encerrados), então o
+        orçamento vale para o tempo de parede de run().
+    """
+
+    def __init__(
+        self,
+        param_grid: Optional[Dict[str, list]] = None,
+        *,
+        time_budget_s: float = 60.0,
+        n_splits: int = 3,
+        eta: int = 3,
+        min_rows: int = 300,
+        max_workers: Optional[int] = None,
+        random_state: int = 42,
+    ):
+        self.param_grid = param_grid or DEFAULT_GRID
+        self.time_budget_s = time_budget_s
+        self.n_splits = n_splits
+        self.eta = eta
+        self.min_rows = min_rows
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.random_state = random_state
+
+    def candidates(self) -> List[dict]:
+        keys = list(self.param_grid)
+        return [dict(zip(keys, vals)) for vals in itertools.product(*(self.param_grid[k] for k in keys))]
+
+    def run(self, X: np.ndarray, y: np.ndarray, latency_budget_ms: Optional[float] = None) -> dict:
+        X = np.ascontiguousarray(X)
+        y = np.asarray(y).astype(int)
+        deadline = time.monotonic() + self.time_budget_s
+        rng = np.random.default_rng(self.random_state)
+        order = rng.permutation(len(y))
+
+        survivors = self.candidates()
+        rungs = []
+        rows = min(len(y), self.min_rows)
+        timed_out = False
+
+        ctx = multiprocessing.get_context()
+        pids = ctx.SimpleQueue()
+        pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=ctx,
+                                   initializer=_init_worker, initargs=(X, y, pids))
+        try:
+            while survivors:
+                subset = np.sort(order[:rows])
+                futures = {pool.submit(_evaluate_candidate, p, subset, self.n_splits, self.random_state)
+                           for p in survivors}
+                done_results = []
+                pending = futures
+                while pending:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        timed_out = True
+                        break
+                    done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        try:
+                            done_results.append(fut.result())
+                        except Exception as e:
+                            print(f"[model_search] candidato falhou: {e}")
+                if timed_out:
+                    # rodada incompleta só substitui a anterior se avaliou todos
+                    if done_results and not rungs:
+                        rungs.append({"rows": rows, "results": done_results, "complete": False})
+                    break
+
+                if not done_results:
+                    # todos os candidatos da rodada falharam: fica com a rodada anterior
+                    print(f"[model_search] rodada com {rows} linhas sem resultados; usando a anterior")
+                    break
+                rungs.append({"rows": rows, "results": done_results, "complete": True})
+                if rows >= len(y) or len(done_results) <= 1:
+                    break
+                # candidatos fora do orçamento de latência não sobem de rodada (se houver algum dentro)
+                ranked = [r for r in done_results
+                          if latency_budget_ms is None or r["latency_ms_row"] <= latency_budget_ms]
+                ranked = ranked or done_results
+                ranked.sort(key=lambda r: r["f1_mean"], reverse=True)
+                keep = max(1, len(ranked) // self.eta)
+                survivors = [r["params"] for r in ranked[:keep]]
+                rows = min(len(y), rows * self.eta)
+        finally:
+            if timed_out:
+                _shutdown_now(pool, _worker_pids(pids))
+            else:
+                pool.shutdown(wait=True)
+
+        if not rungs:
+            return {"best_params": None, "timed_out": timed_out, "frontier": [], "rungs": []}
+
+        final = rungs[-1]["results"]
+        # fronteira: resultado mais recente (rodada mais alta) de cada candidato avaliado
+        latest = {}
+        for rung in rungs:
+            for r in rung["results"]:
+                latest[repr(sorted(r["params"].items(), key=lambda kv: kv[0]))] = r
+        frontier = _pareto(list(latest.values()))
+        eligible = [r for r in final
+                    if latency_budget_ms is None or r["latency_ms_row"] <= latency_budget_ms]
+        if eligible:
+            best = max(eligible, key=lambda r: (r["f1_mean"], -r["latency_ms_row"]))
+        else:
+            # nenhum cabe no orçamento de latência: escolhe o mais rápido
+            best = min(final, key=lambda r: r["latency_ms_row"])
+
+        return {
+            "best_params": best["params"],
+            "best": best,
+            "latency_budget_ms": latency_budget_ms,
+            "time_budget_s": self.time_budget_s,
+            "timed_out": timed_out,
+            "frontier": sorted(frontier, key=lambda r: r["latency_ms_row"]),
+            "rungs": [{"rows": r["rows"], "candidates": len(r["results"]), "complete": r["complete"]}
+                      for r in rungs],
+        }
@@ -0,0 +1,146 @@
+# src/infrastructure/pipeline.py
+# Pipeline em memória: estágios recebem/retornam DataFrames, com checkpoint em disco
+# opcional por estágio e tempo de cada estágio registrado.
+#   run()         um DataFrame inteiro passa por cada estágio (memória ~ dataset)
+#   run_stream()  cada chunk passa por todos os estágios e é gravado incrementalmente
+#                 (DatasetWriter); memória limitada ao tamanho do chunk
+
+import json
+import time
+from contextlib import ExitStack
+from typing import Callable, Iterable, List, Optional
+
+import pandas as pd
+
+from infrastructure.dataset_io import DatasetWriter, write_dataset
+
+
+class Stage:
+    def __init__(self, name: str, fn: Callable, checkpoint_path: Optional[str] = None,
+                 schema: Optional[str] = None):
+        """
+        fn: recebe o DataFrame do estágio anterior (None no primeiro) e retorna um DataFrame.
+        checkpoint_path: se informado, grava a saída do estágio nesse caminho (via dataset_io).
+        schema: schema do dataset_io usado no checkpoint.
+        """
+        self.name = name
+        self.fn = fn
+        self.checkpoint_path = checkpoint_path
+        self.schema = schema
+
+
+class Pipeline:
+    def __init__(self, stages: List[Stage], name: str = "pipeline", metrics=None):
+        """metrics: AgentMetrics opcional (duração por estágio e linhas gravadas em checkpoint)."""
+        self.stages = stages
+        self.name = name
+        self.metrics = metrics
+        self.timings: List[dict] = []
+
+    def run(self, data: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        self.timings = []
+        t_start = time.perf_counter()
+        for stage in self.stages:
+            rows_in = None if data is None else len(data)
+            t0 = time.perf_counter()
+            data = stage.fn(data)
+            elapsed = time.perf_counter() - t0
+
+            ckpt_s = None
+            if stage.checkpoint_path:
+                t1 = time.perf_counter()
+                write_dataset(data, stage.checkpoint_path, stage.schema)
+                ckpt_s = time.perf_counter() - t1
+                if self.metrics is not None:
+                    self.metrics.rows_written(stage.name, len(data))
+            if self.metrics is not None:
+                self.metrics.observe_stage(stage.name, elapsed)
+
+            timing = {
+                "pipeline": self.name,
+                "stage": stage.name,
+                "seconds": round(elapsed, 4),
+                "rows_in": rows_in,
+                "rows_out": len(data),
+                "checkpoint": stage.checkpoint_path,
+                "checkpoint_seconds": round(ckpt_s, 4) if ckpt_s is not None else None,
+            }
+            self.timings.append(timing)
+            print(json.dumps(timing, ensure_ascii=False))
+
+        print(json.dumps({
+            "pipeline": self.name,
+            "total_seconds": round(time.perf_counter() - t_start, 4),
+            "stages": len(self.stages),
+        }))
+        return data
+
+    def run_stream(self, chunks: Iterable[pd.DataFrame], source: str = "read") -> int:
+        """
+        Executa os estágios chunk a chunk (fn recebe e devolve um chunk; estágios com
+        estado entre chunks, como dedup, guardam esse estado na própria fn). Checkpoints
+        são gravados com DatasetWriter (troca atômica ao final). Chunk vazio não segue
+        para os estágios seguintes. Retorna as linhas que saíram do último estágio.
+        `source` nomeia o tempo gasto produzindo os chunks (leitura).
+        """
+        self.timings = []
+        t_start = time.perf_counter()
+        acc = {s.name: {"seconds": 0.0, "rows_in": 0, "rows_out": 0, "ckpt": 0.0} for s in self.stages}
+        read = {"seconds": 0.0, "rows_out": 0, "chunks": 0}
+        with ExitStack() as stack:
+            writers = {s.name: stack.enter_context(DatasetWriter(s.checkpoint_path, s.schema))
+                       for s in self.stages if s.checkpoint_path}
+            it = iter(chunks)
+            while True:
+                t0 = time.perf_counter()
+                data = next(it, None)
+                read["seconds"] += time.perf_counter() - t0
+                if data is None:
+                    break
+                read["chunks"] += 1
+                read["rows_out"] += len(data)
+                for stage in self.stages:
+                    a = acc[stage.name]
+                    a["rows_in"] += len(data)
+                    t0 = time.perf_counter()
+                    data = stage.fn(data)
+                    a["seconds"] += time.perf_counter() - t0
+                    a["rows_out"] += len(data)
+                    if stage.name in writers:
+                        t1 = time.perf_counter()
+                        writers[stage.name].write(data)
+                        a["ckpt"] += time.perf_counter() - t1
+                    if data.empty:
+                        break
+
+        if self.metrics is not None:
+            self.metrics.observe_stage(source, read["seconds"])
+        timing = {"pipeline": self.name, "stage": source, "seconds": round(read["seconds"], 4),
+                  "rows_in": None, "rows_out": read["rows_out"], "chunks": read["chunks"]}
+        self.timings.append(timing)
+        print(json.dumps(timing, ensure_ascii=False))
+        for stage in self.stages:
+            a = acc[stage.name]
+            if self.metrics is not None:
+                self.metrics.observe_stage(stage.name, a["seconds"])
+                if stage.checkpoint_path:
+                    self.metrics.rows_written(stage.name, a["rows_out"])
+            timing = {
+                "pipeline": self.name,
+                "stage": stage.name,
+                "seconds": round(a["seconds"], 4),
+                "rows_in": a["rows_in"],
+                "rows_out": a["rows_out"],
+                "checkpoint": stage.checkpoint_path,
+                "checkpoint_seconds": round(a["ckpt"], 4) if stage.checkpoint_path else None,
+            }
+            self.timings.append(timing)
+            print(json.dumps(timing, ensure_ascii=False))
+
+        print(json.dumps({
+            "pipeline": self.name,
+            "total_seconds": round(time.perf_counter() - t_start, 4),
+            "stages": len(self.stages),
+            "chunks": read["chunks"],
+        }))
+        return acc[self.stages[-1].name]["rows_out"] if self.stages else read["rows_out"]
@@ -0,0 +1,172 @@
+# src/infrastructure/prediction_cache.py
+# Cache de predições na frente do ModelInferenceService.predict_batch:
+# chave = hash do vetor de features (+ versão do modelo), LRU limitado, persistência opcional.
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from infrastructure.model_inference_service import ModelInferenceService
+
+_UNSET = "<unset>"
+
+
+def row_hashes(X: np.ndarray, version: Optional[str]) -> np.ndarray:
+    """Hash uint64 por linha da matriz de features, misturado com a versão do modelo."""
+    h = pd.util.hash_pandas_object(pd.DataFrame(np.asarray(X, dtype=np.float64)), index=False)
+    salt = np.uint64(int(pd.util.hash_array(np.asarray([str(version)], dtype=object))[0]))
+    return h.to_numpy(dtype=np.uint64) ^ salt
+
+
+class PredictionCache:
+    """
+    LRU de (score, label) por hash de linha. Toda a cache pertence a uma versão de modelo:
+    ao mudar a versão, é esvaziada (invalidação automática).
+    """
+
+    def __init__(self, max_entries: int = 100_000, persist_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.persist_path = persist_path
+        self.version: Optional[str] = _UNSET
+        self._data: "OrderedDict[int, tuple[float, int]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._miss_time_s = 0.0
+        self._lock = threading.Lock()  # save() pode rodar em outra thread
+
+    def __len__(self):
+        return len(self._data)
+
+    def ensure_version(self, version: Optional[str]):
+        if version == self.version:
+            return
+        if self.version != _UNSET:
+            self.invalidations += 1
+        with self._lock:
+            self._data.clear()
+            self.version = version
+        self._load_persisted()
+
+    def get_many(self, keys: np.ndarray):
+        """Retorna (scores, labels, máscara de acertos) para as chaves."""
+        n = len(keys)
+        scores = np.zeros(n, dtype=np.float64)
+        labels = np.zeros(n, dtype=np.int64)
+        hit = np.zeros(n, dtype=bool)
+        data = self._data
+        with self._lock:
+            for i, k in enumerate(keys.tolist()):
+                v = data.get(k)
+                if v is not None:
+                    data.move_to_end(k)
+                    scores[i], labels[i] = v
+                    hit[i] = True
+        return scores, labels, hit
+
+    def put_many(self, keys: np.ndarray, scores: np.ndarray, labels: np.ndarray):
+        data = self._data
+        with self._lock:
+            for k, s, l in zip(keys.tolist(), scores.tolist(), labels.tolist()):
+                data[k] = (s, int(l))
+                data.move_to_end(k)
+            while len(data) > self.max_entries:
+                data.popitem(last=False)
+
+    def record(self, hits: int, misses: int, miss_time_s: float):
+        self.hits += hits
+        self.misses += misses
+        self._miss_time_s += miss_time_s
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        per_miss = self._miss_time_s / self.misses if self.misses else 0.0
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / total) if total else None,
+            "time_saved_s": self.hits * per_miss,  # estimativa: custo médio por linha não cacheada
+            "invalidations": self.invalidations,
+            "model_version": self.version,
+        }
+
+    # ----- persistência -----
+    def save(self):
+        if not self.persist_path:
+            return
+        os.makedirs(os.path.dirname(self.persist_path) or ".", exist_ok=True)
+        with self._lock:
+            keys = np.fromiter(self._data.keys(), dtype=np.uint64, count=len(self._data))
+            vals = list(self._data.values())
+            version = self.version
+        tmp = self.persist_path + ".tmp.npz"
+        np.savez(
+            tmp,
+            keys=keys,
+            scores=np.asarray([v[0] for v in vals], dtype=np.float64),
+            labels=np.asarray([v[1] for v in vals], dtype=np.int64),
+            version=np.asarray([str(version)]),
+        )
+        os.replace(tmp, self.persist_path)
+
+    def _load_persisted(self):
+        if not self.persist_path or not os.path.exists(self.persist_path):
+            return
+        try:
+            with np.load(self.persist_path) as z:
+                if str(z["version"][0]) != str(self.version):
+                    return  # cache de outra versão do modelo: descarta
+                self.put_many(z["keys"], z["scores"], z["labels"])
+        except Exception as e:
+            print(f"[prediction_cache] aviso: cache persistida ilegível ({e})")
+
+
+class CachedInferenceService:
+    """Mesma interface do ModelInferenceService; só as linhas não cacheadas vão para o modelo."""
+
+    def __init__(self, service: ModelInferenceService, cache: PredictionCache):
+        self.service = service
+        self.cache = cache
+        self.cache.ensure_version(service.version)
+
+    @property
+    def version(self) -> Optional[str]:
+        return self.service.version
+
+    def reload_if_changed(self) -> bool:
+        changed = self.service.reload_if_changed()
+        self.cache.ensure_version(self.service.version)
+        return changed
+
+    def predict_batch(self, df: pd.DataFrame) -> pd.DataFrame:
+        self.cache.ensure_version(self.service.version)
+        X = self.service.feature_matrix(df)
+        keys = row_hashes(X, self.service.version)
+        scores, labels, hit = self.cache.get_many(keys)
+
+        miss = ~hit
+        n_miss = int(miss.sum())
+        elapsed = 0.0
+        if n_miss:
+            t0 = time.perf_counter()
+            out = self.service.predict_matrix(X[miss])
+            elapsed = time.perf_counter() - t0
+            scores[miss] = out["pred_score"]
+            labels[miss] = out["pred_label"]
+            self.cache.put_many(keys[miss], scores[miss], labels[miss])
+        self.cache.record(int(hit.sum()), n_miss, elapsed)
+
+        result = pd.DataFrame(index=df.index)
+        result["pred_score"] = scores
+        result["pred_label"] = labels
+        return result
+
+    def stats(self) -> Dict:
+        return self.cache.stats()
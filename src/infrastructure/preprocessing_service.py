@@ -1,35 +1,149 @@
 import pandas as pd
 import os
+import json
+from datetime import datetime, timezone
+
+from infrastructure.dataset_io import iter_dataset, hashable_view, dataset_exists, DatasetWriter
 
 class PreprocessingService:
-    def __init__(self, input_path, output_path):
+    """
+    ETL do dataset tabular, separado em fit/transform:
+      - fit(): calcula min/max das colunas numéricas (streaming, em chunks) e persiste em JSON
+      - transform(): aplica os parâmetros persistidos chunk a chunk (memória limitada),
+        removendo duplicatas entre chunks via conjunto de hashes de linha
+    Colunas de ID (ex.: triggerid) nunca são normalizadas.
+    raw_copies: colunas copiadas ANTES da normalização (ex.: lastchange -> lastchange_ts,
+    epoch usado como sample_ts no tracing do orchestrator).
+    passthrough: colunas de tracing (epoch) que seguem sem normalização, como os IDs.
+    """
+
+    def __init__(self, input_path, output_path, scaler_path=None, *,
+                 chunksize=50_000, id_columns=("triggerid",), refit=False,
+                 raw_copies=(("lastchange", "lastchange_ts"),), passthrough=("collected_at",)):
         self.input_path = input_path
         self.output_path = output_path
+        self.scaler_path = scaler_path or os.path.join(os.path.dirname(output_path), "scaler.json")
+        self.chunksize = chunksize
+        self.id_columns = list(id_columns)
+        self.refit = refit
+        self.raw_copies = dict(raw_copies)
+        self.passthrough = list(passthrough)
+        self.rows_in = 0  # linhas lidas na última transformação
 
-    def run(self):
-        if not os.path.exists(self.input_path):
-            raise FileNotFoundError(f"Arquivo {self.input_path} não encontrado.")
+    def _chunks(self):
+        return iter_dataset(self.input_path, self.chunksize)
+
+    def fit(self):
+        """Calcula e persiste min/max por coluna numérica (exceto IDs)."""
+        mins, maxs = {}, {}
+        numeric = None
+        for chunk in self._chunks():
+            chunk = chunk.fillna(0)
+            cols = set(chunk.select_dtypes(include=["int64", "float64"]).columns) \
+                - set(self.id_columns) - set(self.passthrough)
+            # coluna só é numérica se for numérica em todos os chunks
+            numeric = cols if numeric is None else numeric & cols
+            for col in cols:
+                lo, hi = float(chunk[col].min()), float(chunk[col].max())
+                mins[col] = min(lo, mins.get(col, lo))
+                maxs[col] = max(hi, maxs.get(col, hi))
+
+        params = {
+            "columns": {c: {"min": mins[c], "max": maxs[c]} for c in sorted(numeric or [])},
+            "id_columns": self.id_columns,
+            "source": self.input_path,
+            "fitted_at": datetime.now(timezone.utc).isoformat(),
+        }
+        os.makedirs(os.path.dirname(self.scaler_path) or ".", exist_ok=True)
+        tmp = self.scaler_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(params, f, indent=2)
+        os.replace(tmp, self.scaler_path)
+        print(f"[PreprocessingService] Parâmetros do scaler salvos em {self.scaler_path}")
+        return params
 
-        print(f"[PreprocessingService] Lendo dados de {self.input_path}...")
-        df = pd.read_csv(self.input_path)
+    def load_params(self):
+        with open(self.scaler_path, "r") as f:
+            return json.load(f)
 
-        # Remover duplicatas
-        df.drop_duplicates(inplace=True)
+    def transform_frame(self, df, params, seen=None):
+        """
+        Aplica dedup + fillna + normalização a um DataFrame (um chunk).
+        seen: conjunto de hashes de linhas já emitidas (dedup entre chunks).
+        """
+        if seen is not None:
+            hashes = pd.util.hash_pandas_object(hashable_view(df), index=False).to_numpy()
+            keep = []
+            for h in hashes.tolist():
+                keep.append(h not in seen)
+                seen.add(h)
+            df = df[keep]
+        else:
+            df = df[~hashable_view(df).duplicated()]
 
-        # Tratar valores ausentes (exemplo: preencher com 0)
-        df.fillna(0, inplace=True)
+        df = df.fillna(0)
+        for col, copy in self.raw_copies.items():
+            if col in df.columns:
+                df[copy] = df[col]
+        for col, p in params["columns"].items():
+            if col not in df.columns or col in self.id_columns or col in self.passthrough:
+                continue
+            lo, hi = p["min"], p["max"]
+            if hi != lo:
+                # valores fora do intervalo ajustado ficam fora de [0, 1] (sem clipping)
+                df[col] = (pd.to_numeric(df[col], errors="coerce").fillna(0) - lo) / (hi - lo)
+        return df
 
-        # Normalizar colunas numéricas
-        num_cols = df.select_dtypes(include=["int64", "float64"]).columns
-        for col in num_cols:
-            max_val = df[col].max()
-            min_val = df[col].min()
-            if max_val != min_val:
-                df[col] = (df[col] - min_val) / (max_val - min_val)
+    def iter_input(self):
+        """Chunks brutos do dataset de entrada (conta rows_in)."""
+        self.rows_in = 0
+        for chunk in self._chunks():
+            self.rows_in += len(chunk)
+            yield chunk
 
-        # Salvar dataset pronto
-        os.makedirs(os.path.dirname(self.output_path), exist_ok=True)
-        df.to_csv(self.output_path, index=False)
+    def chunk_transformer(self, params=None):
+        """Função chunk -> chunk transformado, com dedup entre chunks (estágio de Pipeline.run_stream)."""
+        params = params or self.load_params()
+        seen = set()
+        return lambda chunk: self.transform_frame(chunk, params, seen)
 
-        print(f"[PreprocessingService] Dataset pronto salvo em {self.output_path}")
+    def iter_transform(self, params=None):
+        """Gera os chunks transformados (sem gravar em disco)."""
+        transform = self.chunk_transformer(params)
+        for chunk in self.iter_input():
+            out = transform(chunk)
+            if not out.empty:
+                yield out
 
+    def transform(self, params=None):
+        params = params or self.load_params()
+        with DatasetWriter(self.output_path, "triggers_processed") as writer:
+            for out in self.iter_transform(params):
+                writer.write(out)
+        return writer.rows
+
+    def resolve_params(self):
+        """Parâmetros do scaler: ajusta (fit) se refit ou se ainda não persistidos."""
+        if not dataset_exists(self.input_path):
+            raise FileNotFoundError(f"Arquivo {self.input_path} não encontrado.")
+
+        print(f"[PreprocessingService] Lendo dados de {self.input_path} (chunks de {self.chunksize})...")
+        if self.refit or not os.path.exists(self.scaler_path):
+            return self.fit()
+        print(f"[PreprocessingService] Usando scaler persistido em {self.scaler_path}")
+        return self.load_params()
+
+    def process(self):
+        """
+        Executa o ETL e devolve o DataFrame INTEIRO em memória (sem gravar dataset_ready).
+        Memória proporcional ao dataset: para memória limitada use run() ou
+        iter_input() + chunk_transformer() com Pipeline.run_stream (analyzer).
+        """
+        params = self.resolve_params()
+        chunks = list(self.iter_transform(params))
+        return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+
+    def run(self):
+        params = self.resolve_params()
+        rows = self.transform(params)
+        print(f"[PreprocessingService] Dataset pronto salvo em {self.output_path} (rows={rows})")
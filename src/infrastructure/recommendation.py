@@ -0,0 +1,284 @@
+# src/infrastructure/recommendation.py
+# Recomendação da próxima ação a partir do histórico de execuções (executed_actions.jsonl).
+#
+# Estatísticas de resultado por contexto (host, itemkey, descrição da trigger) e tipo de
+# ação, mantidas em memória e atualizadas por tail do JSONL: cada ciclo custa O(registros
+# novos). Para cada contexto guardamos o top-k já ordenado, então a consulta é um lookup
+# em dict (O(1)). Contextos sem histórico caem para níveis mais gerais:
+#   exact  (host, itemkey, descrição)
+#   item   (*, itemkey, descrição)     mesmo problema em outros hosts
+#   global (*, *, *)
+# O estado (estatísticas + offset do tailer) é gravado em snapshot atômico periódico;
+# ao reiniciar, só as linhas posteriores ao snapshot são lidas.
+
+import json
+import os
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from infrastructure.action_bus import action_host
+from infrastructure.jsonl_tailer import JsonlTailer
+from infrastructure.tracing import parse_ts
+
+SNAPSHOT_VERSION = 1
+LEVELS = ("exact", "item", "global")
+ANY = "*"
+
+Context = Tuple[str, str, str]  # (host, itemkey, descrição)
+
+
+def action_context(action: Dict) -> Context:
+    return (action_host(action), str(action.get("itemkey") or ""), str(action.get("description") or ""))
+
+
+def _level_keys(ctx: Context) -> List[Tuple[str, Context]]:
+    host, itemkey, desc = ctx
+    return [("exact", ctx), ("item", (ANY, itemkey, desc)), ("global", (ANY, ANY, ANY))]
+
+
+class _Outcome:
+    """Resultados de um tipo de ação num contexto."""
+    __slots__ = ("n", "ok", "skipped", "failed", "last_ts", "latency_ewma")
+
+    def __init__(self, n=0, ok=0, skipped=0, failed=0, last_ts=None, latency_ewma=None):
+        self.n, self.ok, self.skipped, self.failed = n, ok, skipped, failed
+        self.last_ts = last_ts
+        self.latency_ewma = latency_ewma
+
+    def add(self, status: str, ts: Optional[float], latency: Optional[float], alpha: float):
+        self.n += 1
+        if status == "OK":
+            self.ok += 1
+        elif status == "SKIPPED":
+            self.skipped += 1
+        else:
+            self.failed += 1
+        if ts is not None and (self.last_ts is None or ts > self.last_ts):
+            self.last_ts = ts
+        if latency is not None:
+            self.latency_ewma = latency if self.latency_ewma is None else \
+                alpha * latency + (1 - alpha) * self.latency_ewma
+
+    @property
+    def score(self) -> float:
+        # taxa de sucesso com prior Beta(1, 1): poucas execuções não dominam o ranking
+        return (self.ok + 1) / (self.n + 2)
+
+    def to_list(self) -> list:
+        return [self.n, self.ok, self.skipped, self.failed, self.last_ts, self.latency_ewma]
+
+
+class RemediationStats:
+    """
+    Índices em memória: (nível, contexto) -> {tipo de ação: _Outcome} e o top-k ordenado
+    de cada contexto (tupla imutável, trocada a cada atualização; leitura sem lock).
+    """
+
+    def __init__(self, executed_path: str, snapshot_path: Optional[str] = None, *,
+                 top_k: int = 5, latency_alpha: float = 0.2):
+        self.executed_path = executed_path
+        self.snapshot_path = snapshot_path
+        self.top_k = top_k
+        self.latency_alpha = latency_alpha
+        self._stats: Dict[Tuple[str, Context], Dict[str, _Outcome]] = {}
+        self._topk: Dict[Tuple[str, Context], Tuple[Dict, ...]] = {}
+        self._contexts = Counter()  # nível -> contextos distintos (mantido em add_record/_load_snapshot)
+        self._tailer = JsonlTailer(executed_path)
+        self._lock = threading.Lock()
+        self.records = 0
+        self.last_update: Optional[float] = None
+        self.last_snapshot: Optional[float] = None
+        self._dirty = False
+        if snapshot_path:
+            self._load_snapshot()
+
+    # ----- atualização incremental -----
+    def _ranked(self, outcomes: Dict[str, _Outcome]) -> Tuple[Dict, ...]:
+        ranked = sorted(outcomes.items(), key=lambda kv: (kv[1].score, kv[1].n, kv[1].last_ts or 0), reverse=True)
+        return tuple({
+            "action": atype,
+            "score": round(o.score, 4),
+            "executions": o.n,
+            "ok": o.ok,
+            "skipped": o.skipped,
+            "failed": o.failed,
+            "last_executed": o.last_ts,
+            "latency_s": None if o.latency_ewma is None else round(o.latency_ewma, 3),
+        } for atype, o in ranked[:self.top_k])
+
+    def add_record(self, record: Dict) -> bool:
+        action = record.get("action") or {}
+        atype = action.get("type")
+        if not atype:
+            return False
+        status = str((record.get("result") or {}).get("status") or "")
+        ts = parse_ts(record.get("ts_executed"))
+        latency = (record.get("latency_s") or {}).get("end_to_end")
+        for key in _level_keys(action_context(action)):
+            outcomes = self._stats.get(key)
+            if outcomes is None:
+                outcomes = self._stats[key] = {}
+                self._contexts[key[0]] += 1
+            o = outcomes.get(atype)
+            if o is None:
+                o = outcomes[atype] = _Outcome()
+            o.add(status, ts, latency, self.latency_alpha)
+            self._topk[key] = self._ranked(outcomes)  # O(tipos de ação no contexto)
+        return True
+
+    def update(self, max_lines: Optional[int] = None) -> int:
+        """Aplica as linhas novas do JSONL; retorna quantos registros entraram."""
+        n = 0
+        with self._lock:
+            for rec in self._tailer.read(max_lines):
+                if self.add_record(rec):
+                    n += 1
+            if n:
+                self.records += n
+                self._dirty = True
+            self.last_update = time.time()
+        return n
+
+    # ----- consultas (O(1)) -----
+    def recommend(self, host: str = "", itemkey: str = "", description: str = "", k: Optional[int] = None) -> Dict:
+        k = self.top_k if k is None else max(1, min(int(k), self.top_k))
+        for level, ctx in _level_keys((host or "", itemkey or "", description or "")):
+            top = self._topk.get((level, ctx))
+            if top:
+                return {"level": level, "context": {"host": ctx[0], "itemkey": ctx[1], "description": ctx[2]},
+                        "recommendations": list(top[:k])}
+        return {"level": None, "context": None, "recommendations": []}
+
+    def contexts(self, level: str = "exact", limit: int = 100) -> List[Dict]:
+        if level not in LEVELS:
+            raise ValueError(f"nível desconhecido: {level} (use {list(LEVELS)})")
+        out = []
+        for (lvl, ctx), top in list(self._topk.items()):
+            if lvl != level:
+                continue
+            out.append({"host": ctx[0], "itemkey": ctx[1], "description": ctx[2],
+                        "executions": sum(o.n for o in self._stats[(lvl, ctx)].values()),
+                        "best": top[0]["action"] if top else None})
+            if len(out) >= limit:
+                break
+        return out
+
+    def stats(self) -> Dict:
+        return {
+            "records": self.records,
+            "contexts": {lvl: self._contexts[lvl] for lvl in LEVELS},
+            "offset": self._tailer.offset,
+            "invalid_lines": self._tailer.invalid_lines,
+            "last_update": self.last_update,
+            "last_snapshot": self.last_snapshot,
+        }
+
+    # ----- snapshot -----
+    def snapshot(self, force: bool = False) -> bool:
+        """Grava estatísticas + offset do tailer (atômico). Sem mudanças, não grava."""
+        if not self.snapshot_path or not (self._dirty or force):
+            return False
+        with self._lock:
+            payload = {
+                "version": SNAPSHOT_VERSION,
+                "executed_path": self.executed_path,
+                "tailer": self._tailer.state(),
+                "records": self.records,
+                "stats": [[lvl, *ctx, atype, *o.to_list()]
+                          for (lvl, ctx), outcomes in self._stats.items() for atype, o in outcomes.items()],
+            }
+            self._dirty = False
+        os.makedirs(os.path.dirname(self.snapshot_path) or ".", exist_ok=True)
+        tmp = self.snapshot_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.replace(tmp, self.snapshot_path)
+        self.last_snapshot = time.time()
+        return True
+
+    def _load_snapshot(self):
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"[recommender] snapshot ignorado ({e}); reconstruindo do início")
+            return
+        if payload.get("version") != SNAPSHOT_VERSION or payload.get("executed_path") != self.executed_path:
+            print("[recommender] snapshot incompatível; reconstruindo do início")
+            return
+        for lvl, host, itemkey, desc, atype, *values in payload.get("stats", []):
+            self._stats.setdefault((lvl, (host, itemkey, desc)), {})[atype] = _Outcome(*values)
+        for key, outcomes in self._stats.items():
+            self._topk[key] = self._ranked(outcomes)
+        self._contexts = Counter(lvl for lvl, _ in self._stats)
+        self._tailer = JsonlTailer.from_state(self.executed_path, payload.get("tailer"))
+        self.records = int(payload.get("records", 0))
+
+
+# ----- API local -----
+def _make_handler(service: RemediationStats):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, code: int, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            q = {k: v[0] for k, v in parse_qs(url.query).items()}
+            try:
+                if url.path == "/health":
+                    self._send(200, {"status": "ok"})
+                elif url.path == "/stats":
+                    self._send(200, service.stats())
+                elif url.path == "/api/recommendations":
+                    self._send(200, service.recommend(q.get("host", ""), q.get("itemkey", ""),
+                                                      q.get("description", ""), q.get("k") or None))
+                elif url.path == "/api/contexts":
+                    self._send(200, service.contexts(q.get("level", "exact"), int(q.get("limit", 100))))
+                else:
+                    self._send(404, {"error": "not found"})
+            except ValueError as e:
+                self._send(400, {"error": str(e)})
+            except Exception as e:
+                self._send(500, {"error": str(e)})
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return Handler
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class RecommenderServer:
+    def __init__(self, service: RemediationStats, host: str = "0.0.0.0", port: int = 8091):
+        self.service = service
+        self.httpd = _HTTPServer((host, port), _make_handler(service))
+
+    @property
+    def address(self):
+        return self.httpd.server_address
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def start_background(self) -> threading.Thread:
+        t = threading.Thread(target=self.serve_forever, name="recommender-http", daemon=True)
+        t.start()
+        return t
+
+    def shutdown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,116 @@
+# src/infrastructure/sample_buffer.py
+# Buffer colunar das amostras de séries temporais do collector.
+#
+# Em vez de um dict Python por ponto (+ time.strftime para ts_iso em cada amostra),
+# as respostas do history.get são decodificadas direto em colunas tipadas (array.array):
+#   ts (int64), value (float64), collected_at (float64), host/itemkey (int32, códigos internados)
+# ~32 bytes por amostra. ts_iso só é gerado na exportação, vetorizado (Arrow/NumPy).
+#
+# to_arrow()/to_frame() expõem as colunas numéricas sem cópia (views NumPy sobre os arrays);
+# host/itemkey saem como dicionário/categoria (códigos + tabela de nomes).
+# Depois da primeira exportação o buffer fica somente leitura: views vivas impedem o
+# redimensionamento dos arrays (BufferError). O collector usa um buffer novo por ciclo.
+
+from array import array
+from typing import Dict, Iterable, List, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+ISO_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+class SampleBuffer:
+    def __init__(self):
+        self._ts = array("q")
+        self._value = array("d")
+        self._collected_at = array("d")
+        self._host = array("i")
+        self._item = array("i")
+        self._host_codes: Dict[str, int] = {}
+        self._item_codes: Dict[str, int] = {}
+        self.hosts: List[str] = []
+        self.itemkeys: List[str] = []
+
+    # ----- entrada -----
+    @staticmethod
+    def _intern(name: str, codes: Dict[str, int], names: List[str]) -> int:
+        code = codes.get(name)
+        if code is None:
+            code = codes[name] = len(names)
+            names.append(name)
+        return code
+
+    def add_history(self, host: str, itemkey: str, points: Iterable[Mapping],
+                    collected_at: float) -> int:
+        """Anexa os pontos de um history.get ({"clock": "...", "value": "..."}); retorna quantos."""
+        points = points if isinstance(points, list) else list(points)
+        n = len(points)
+        if not n:
+            return 0
+        self._ts.extend([int(p["clock"]) for p in points])
+        self._value.extend([float(p.get("value", 0.0)) for p in points])
+        self._collected_at.extend(array("d", [collected_at]) * n)
+        self._host.extend(array("i", [self._intern(host, self._host_codes, self.hosts)]) * n)
+        self._item.extend(array("i", [self._intern(itemkey, self._item_codes, self.itemkeys)]) * n)
+        return n
+
+    def __len__(self) -> int:
+        return len(self._ts)
+
+    @property
+    def empty(self) -> bool:
+        return not len(self._ts)
+
+    @property
+    def nbytes(self) -> int:
+        cols = (self._ts, self._value, self._collected_at, self._host, self._item)
+        return sum(c.itemsize * len(c) for c in cols)
+
+    # ----- views sem cópia -----
+    def columns(self) -> Dict[str, np.ndarray]:
+        return {
+            "ts": np.frombuffer(self._ts, dtype=np.int64),
+            "value": np.frombuffer(self._value, dtype=np.float64),
+            "collected_at": np.frombuffer(self._collected_at, dtype=np.float64),
+            "host": np.frombuffer(self._host, dtype=np.int32),
+            "itemkey": np.frombuffer(self._item, dtype=np.int32),
+        }
+
+    @staticmethod
+    def iso(ts: np.ndarray) -> np.ndarray:
+        """ts (segundos UTC) -> 'YYYY-MM-DDTHH:MM:SSZ', vetorizado."""
+        return np.datetime_as_string(ts.astype("datetime64[s]"), unit="s", timezone="UTC")
+
+    def to_arrow(self, constants: Optional[Mapping[str, object]] = None):
+        """pyarrow.Table no layout do schema "timeseries" (+ colunas constantes, ex.: score=0.0)."""
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        c = self.columns()
+        ts = pa.array(c["ts"])
+        cols = {
+            "ts": ts,
+            "ts_iso": pc.strftime(ts.cast(pa.timestamp("s", tz="UTC")), format=ISO_FORMAT),
+            "host": pa.DictionaryArray.from_arrays(pa.array(c["host"]), pa.array(self.hosts, pa.string())),
+            "itemkey": pa.DictionaryArray.from_arrays(pa.array(c["itemkey"]), pa.array(self.itemkeys, pa.string())),
+            "value": pa.array(c["value"]),
+        }
+        for name, v in (constants or {}).items():
+            cols[name] = pa.array(np.full(len(self), v))
+        cols["collected_at"] = pa.array(c["collected_at"])
+        return pa.table(cols)
+
+    def to_frame(self, iso: bool = True, constants: Optional[Mapping[str, object]] = None) -> pd.DataFrame:
+        """DataFrame com as colunas numéricas sem cópia e host/itemkey categóricos."""
+        c = self.columns()
+        data = {"ts": c["ts"]}
+        if iso:
+            data["ts_iso"] = self.iso(c["ts"])
+        data["host"] = pd.Categorical.from_codes(c["host"], categories=pd.Index(self.hosts, dtype=object))
+        data["itemkey"] = pd.Categorical.from_codes(c["itemkey"], categories=pd.Index(self.itemkeys, dtype=object))
+        data["value"] = c["value"]
+        for name, v in (constants or {}).items():
+            data[name] = np.full(len(self), v)
+        data["collected_at"] = c["collected_at"]
+        return pd.DataFrame(data, copy=False)
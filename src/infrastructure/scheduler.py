@@ -0,0 +1,398 @@
+# src/infrastructure/scheduler.py
+# Plano de execução das ações pendentes com limites de capacidade (substitui o stub QAOA).
+#
+# As ações são agrupadas em lotes executados em sequência. Em cada lote:
+#   - no máximo batch_size ações
+#   - no máximo host_cap ações por host          (não sobrecarregar o mesmo servidor)
+#   - no máximo handler_caps[tipo] por handler   (ACK_TRIGGER, RAISE_INCIDENT, ...)
+# Objetivo: minimizar o atraso ponderado  sum(peso_i * (lote_i + 1)),  peso = prioridade.
+#
+# Solver (somente CPU, sem ILP, somente stdlib):
+#   1. construção gulosa: peso decrescente, cada ação no primeiro lote viável (first-fit)
+#   2. busca local até esgotar o orçamento (ou uma passada sem melhora), numa janela de
+#      lotes anteriores ao da ação:
+#        relocate  ação vai para um lote anterior que tenha folga
+#        eject     ação entra num lote anterior e desloca uma ação mais leve que a bloqueava
+#                  para o primeiro lote viável depois dele (quando o saldo ponderado é positivo)
+# O limitante inferior (relaxações por lote, por host e por handler) mede a qualidade (gap).
+
+import json
+import math
+import os
+import random
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from infrastructure.action_bus import action_host
+
+PLAN_VERSION = 1
+DEFAULT_TYPE_WEIGHTS = {"RAISE_INCIDENT": 3.0, "ACK_TRIGGER": 1.0}
+
+
+def parse_kv(spec: str) -> Dict[str, float]:
+    """'ACK_TRIGGER=20,RAISE_INCIDENT=30' -> {"ACK_TRIGGER": 20.0, ...}"""
+    out = {}
+    for part in (spec or "").split(","):
+        if "=" in part:
+            k, v = part.split("=", 1)
+            out[k.strip()] = float(v)
+    return out
+
+
+def _float(v, default: float = 0.0) -> float:
+    try:
+        f = float(v)
+    except (TypeError, ValueError):
+        return default
+    return f if math.isfinite(f) else default
+
+
+def action_weight(action: Dict, type_weights: Dict[str, float]) -> float:
+    """
+    Peso de prioridade: peso do tipo x (1 + 4 x severidade), severidade em [0, 1].
+    priority já vem normalizada em [0, 1] pelo preprocessing (orchestrator); só é limitada.
+    """
+    severity = min(1.0, max(0.0, _float(action.get("priority"))))
+    score = _float(action.get("score"))
+    if action.get("type") == "RAISE_INCIDENT":
+        severity = max(severity, min(1.0, -score))           # decision_function: mais negativo = mais anômalo
+    else:
+        severity = max(severity, min(1.0, max(0.0, score)))  # probabilidade do modelo tabular
+    return type_weights.get(action.get("type"), 1.0) * (1.0 + 4.0 * severity)
+
+
+def _find(nxt: Dict[int, int], b: int) -> int:
+    """Primeiro lote >= b fora de `nxt` (lotes cheios apontam para o seguinte), com compressão."""
+    root = b
+    while root in nxt:
+        root = nxt[root]
+    while b != root:
+        nxt[b], b = root, nxt[b]
+    return root
+
+
+class _Plan:
+    """Atribuição ação -> lote com contadores por lote (host, handler, tamanho)."""
+
+    def __init__(self, hosts: Sequence[int], handlers: Sequence[int], weights: Sequence[float],
+                 batch_size: int, host_cap: int, handler_caps: Sequence[int]):
+        self.h, self.t, self.w = hosts, handlers, weights
+        self.B, self.hc, self.tc = batch_size, host_cap, handler_caps
+        self.batch = [-1] * len(weights)
+        self.members: List[List[int]] = []
+        self.size: List[int] = []
+        self.host_cnt: List[Dict[int, int]] = []
+        self.hnd_cnt: List[List[int]] = []
+
+    def _ensure(self, b: int):
+        while len(self.members) <= b:
+            self.members.append([])
+            self.size.append(0)
+            self.host_cnt.append({})
+            self.hnd_cnt.append([0] * len(self.tc))
+
+    def fits(self, j: int, b: int, ignore: int = -1) -> bool:
+        """j cabe no lote b (considerando `ignore` fora do lote, se estiver nele)?"""
+        if b >= len(self.members):
+            return True
+        h, t = self.h[j], self.t[j]
+        size, hc, tc = self.size[b], self.host_cnt[b].get(h, 0), self.hnd_cnt[b][t]
+        if ignore >= 0 and self.batch[ignore] == b:
+            size -= 1
+            hc -= self.h[ignore] == h
+            tc -= self.t[ignore] == t
+        return size < self.B and hc < self.hc and tc < self.tc[t]
+
+    def place(self, j: int, b: int):
+        self._ensure(b)
+        h, t = self.h[j], self.t[j]
+        self.batch[j] = b
+        self.members[b].append(j)
+        self.size[b] += 1
+        self.host_cnt[b][h] = self.host_cnt[b].get(h, 0) + 1
+        self.hnd_cnt[b][t] += 1
+
+    def remove(self, j: int):
+        b, h, t = self.batch[j], self.h[j], self.t[j]
+        self.members[b].remove(j)
+        self.size[b] -= 1
+        self.host_cnt[b][h] -= 1
+        self.hnd_cnt[b][t] -= 1
+        self.batch[j] = -1
+
+    def objective(self) -> float:
+        return sum(w * (b + 1) for w, b in zip(self.w, self.batch))
+
+    def first_fit(self, order: Sequence[int]):
+        """
+        Cada ação no primeiro lote viável. Para cada limite (tamanho, handler, host) um
+        union-find "próximo lote com folga" pula os lotes cheios: O(n α(n)) no total,
+        em vez de varrer lotes cheios a cada ação.
+        """
+        size_nxt: Dict[int, int] = {}
+        hnd_nxt: List[Dict[int, int]] = [{} for _ in self.tc]
+        host_nxt: Dict[int, Dict[int, int]] = {}
+        for j in order:
+            h, t = self.h[j], self.t[j]
+            hn, tn = host_nxt.setdefault(h, {}), hnd_nxt[t]
+            b = 0
+            while True:
+                nb = _find(hn, _find(tn, _find(size_nxt, b)))
+                if nb == b:
+                    break
+                b = nb
+            self.place(j, b)
+            if self.size[b] >= self.B:
+                size_nxt[b] = b + 1
+            if self.hnd_cnt[b][t] >= self.tc[t]:
+                tn[b] = b + 1
+            if self.host_cnt[b][h] >= self.hc:
+                hn[b] = b + 1
+
+    def compact(self):
+        """Remove lotes esvaziados pela busca local (os seguintes sobem: o objetivo só melhora)."""
+        keep = [b for b, m in enumerate(self.members) if m]
+        if len(keep) == len(self.members):
+            return
+        self.members = [self.members[b] for b in keep]
+        self.size = [self.size[b] for b in keep]
+        self.host_cnt = [self.host_cnt[b] for b in keep]
+        self.hnd_cnt = [self.hnd_cnt[b] for b in keep]
+        for nb, m in enumerate(self.members):
+            for j in m:
+                self.batch[j] = nb
+
+    def _earliest(self, k: int, start: int, stop: int, ignore: int) -> Optional[int]:
+        for b in range(start, stop + 1):
+            if self.fits(k, b, ignore):
+                return b
+        return None
+
+    def _improve(self, j: int, lo: int) -> Optional[Tuple[int, ...]]:
+        """Primeiro movimento que melhora j dentro dos lotes [lo, lote de j); retorna os lotes tocados."""
+        h, t, w = self.h, self.t, self.w
+        b2, wj, hj, tj = self.batch[j], w[j], h[j], t[j]
+        tcap = self.tc[tj]
+        # room[b - lo]: primeiro lote >= b com vaga de tamanho, por handler e para o host de j
+        # (b2 sempre conta, pois j sai dele). Limitante inferior do destino de k: evita testar
+        # lote a lote onde k não caberia de qualquer forma.
+        def next_room(full) -> List[int]:
+            room = [b2] * (b2 - lo + 1)
+            for b in range(b2 - 1, lo - 1, -1):
+                room[b - lo] = room[b - lo + 1] if full(b) else b
+            return room
+
+        room = next_room(lambda b: self.size[b] >= self.B)
+        room_t = [next_room(lambda b, tt=tt: self.hnd_cnt[b][tt] >= self.tc[tt]) for tt in range(len(self.tc))]
+        room_h = next_room(lambda b: self.host_cnt[b].get(hj, 0) >= self.hc)
+        for b1 in range(lo, b2):
+            # qual limite bloqueia j em b1? remover k só resolve se k ocupar o mesmo limite
+            full_h = self.host_cnt[b1].get(hj, 0) >= self.hc
+            full_t = self.hnd_cnt[b1][tj] >= tcap
+            if not (full_h or full_t or self.size[b1] >= self.B):
+                self.remove(j)
+                self.place(j, b1)
+                return b1, b2
+            gain_in = wj * (b2 - b1)
+            i = b1 + 1 - lo
+            # k vai no mínimo para start_lb: mais pesado que `limit`, o deslocamento não compensa
+            start_lb = max(room[i], min(r[i] for r in room_t))
+            limit = gain_in / (start_lb - b1)
+            best = None
+            for k in self.members[b1]:
+                wk = w[k]
+                if wk >= limit or (full_h and h[k] != hj) or (full_t and t[k] != tj):
+                    continue
+                if best is not None and gain_in - wk <= best[0]:
+                    continue  # mesmo indo para b1 + 1, k não supera o melhor candidato
+                # k só compensa se não for empurrado mais que gain_in / wk lotes
+                stop = min(b2, b1 + int(math.ceil(gain_in / wk)) - 1)
+                start = max(room[i], room_t[t[k]][i], room_h[i] if h[k] == hj else 0)
+                if start > stop:
+                    continue
+                bk = self._earliest(k, start, stop, ignore=j)
+                if bk is None:
+                    continue
+                gain = gain_in - wk * (bk - b1)
+                if gain > 1e-9 and (best is None or gain > best[0]):
+                    best = (gain, k, bk)
+            if best is not None:
+                _, k, bk = best
+                self.remove(j)
+                self.remove(k)
+                self.place(j, b1)
+                self.place(k, bk)
+                return b1, b2, bk
+        return None
+
+    def local_search(self, deadline: float, window: int = 64, seed: int = 0) -> int:
+        """
+        Relocate/eject com first-improvement, só nos `window` lotes antes do lote da ação:
+        o custo por candidato não cresce com o número de lotes (com 100k ações são ~2500).
+          - candidatos em ordem aleatória (semente fixa): por atraso ponderado, a passada começava
+            pelos hosts quentes, saturados e sem movimento possível, e gastava o orçamento neles;
+          - don't-look: candidato sem movimento só é retestado se algum lote da sua janela mudou;
+          - para quando uma passada não acha movimento.
+        Retorna o número de movimentos.
+        """
+        moves = 0
+        rng = random.Random(seed)
+        changed = [0] * len(self.members)  # último movimento (1, 2, ...) que alterou cada lote
+        failed: Dict[int, int] = {}        # ação -> número de movimentos quando falhou
+        improved = True
+        while improved and time.perf_counter() < deadline:
+            improved = False
+            candidates = [j for j, b in enumerate(self.batch) if b > 0]
+            rng.shuffle(candidates)
+            for j in candidates:
+                if time.perf_counter() >= deadline:
+                    return moves
+                b2 = self.batch[j]
+                lo = max(0, b2 - window)
+                if j in failed and max(changed[lo:b2 + 1]) <= failed[j]:
+                    continue
+                touched = self._improve(j, lo)
+                if touched is None:
+                    failed[j] = moves
+                    continue
+                moves += 1
+                for b in touched:
+                    changed[b] = moves
+                improved = True
+        return moves
+
+
+def lower_bound(hosts: Sequence[int], handlers: Sequence[int], weights: Sequence[float],
+                batch_size: int, host_cap: int, handler_caps: Sequence[int]) -> float:
+    """Maior entre as relaxações: só tamanho do lote, só host, só handler (cada uma é ótima por ordenação)."""
+    def blocks(ws: List[float], cap: int) -> float:
+        ws.sort(reverse=True)
+        return sum(w * (i // cap + 1) for i, w in enumerate(ws))
+
+    by_host: Dict[int, List[float]] = {}
+    by_hnd: Dict[int, List[float]] = {}
+    for h, t, w in zip(hosts, handlers, weights):
+        by_host.setdefault(h, []).append(w)
+        by_hnd.setdefault(t, []).append(w)
+    return max(
+        blocks(list(weights), batch_size),
+        sum(blocks(ws, host_cap) for ws in by_host.values()),
+        sum(blocks(ws, int(handler_caps[t])) for t, ws in by_hnd.items()),
+    )
+
+
+def solve(hosts: Sequence[int], handlers: Sequence[int], weights: Sequence[float], *,
+          batch_size: int, host_cap: int, handler_caps: Sequence[int],
+          budget_s: float = 1.0, order: str = "weight", ls_window: int = 64) -> Tuple[List[int], Dict]:
+    """
+    Núcleo sobre índices inteiros. order="weight" (guloso por prioridade) ou "fifo"
+    (ordem de chegada, sem busca local: referência do executor antigo).
+    Retorna (lote de cada ação, estatísticas).
+    """
+    t0 = time.perf_counter()
+    n = len(weights)
+    plan = _Plan(hosts, handlers, weights, batch_size, host_cap, handler_caps)
+    if order == "fifo":
+        seq = range(n)
+    else:
+        seq = sorted(range(n), key=lambda j: -weights[j])  # estável: empate mantém a chegada
+    plan.first_fit(seq)
+    t_greedy = time.perf_counter() - t0
+    greedy_obj = plan.objective()
+
+    moves = 0
+    if order != "fifo" and budget_s > 0:
+        moves = plan.local_search(t0 + budget_s, ls_window)
+        plan.compact()
+    stats = {
+        "actions": n,
+        "batches": len(plan.members),
+        "greedy_objective": round(greedy_obj, 3),
+        "objective": round(plan.objective(), 3),
+        "greedy_s": round(t_greedy, 4),
+        "solve_s": round(time.perf_counter() - t0, 4),
+        "ls_moves": moves,
+    }
+    return plan.batch, stats
+
+
+class ActionScheduler:
+    """Monta o plano de execução (lotes de ids de ação) a partir do backlog pendente."""
+
+    def __init__(self, batch_size: int = 50, host_cap: int = 2, handler_caps: Optional[Dict[str, float]] = None,
+                 type_weights: Optional[Dict[str, float]] = None, budget_s: float = 1.0):
+        self.batch_size = batch_size
+        self.host_cap = host_cap
+        self.handler_caps = dict(handler_caps or {})
+        self.type_weights = dict(DEFAULT_TYPE_WEIGHTS if type_weights is None else type_weights)
+        self.budget_s = budget_s
+
+    def encode(self, actions: Sequence[Dict]) -> Tuple[List[int], List[int], List[float], List[int], Dict[str, int]]:
+        """Ações -> (host, handler, peso) por índice + capacidade de cada handler."""
+        host_ids: Dict[str, int] = {}
+        hnd_ids: Dict[str, int] = {}
+        hosts, handlers, weights = [], [], []
+        for a in actions:
+            hosts.append(host_ids.setdefault(action_host(a) or str(a.get("id")), len(host_ids)))
+            handlers.append(hnd_ids.setdefault(str(a.get("type") or "UNKNOWN"), len(hnd_ids)))
+            weights.append(action_weight(a, self.type_weights))
+        caps = [max(1, int(self.handler_caps.get(name, self.batch_size))) for name in hnd_ids]
+        return hosts, handlers, weights, caps, hnd_ids
+
+    def plan(self, actions: Sequence[Dict], budget_s: Optional[float] = None) -> Dict:
+        hosts, handlers, weights, caps, hnd_ids = self.encode(actions)
+        budget = self.budget_s if budget_s is None else budget_s
+        batch, stats = solve(hosts, handlers, weights, batch_size=self.batch_size, host_cap=self.host_cap,
+                             handler_caps=caps, budget_s=budget)
+        lb = lower_bound(hosts, handlers, weights, self.batch_size, self.host_cap, caps) if actions else 0.0
+
+        batches: List[List[str]] = [[] for _ in range(stats.pop("batches"))]
+        for j in sorted(range(len(actions)), key=lambda j: (batch[j], -weights[j])):
+            batches[batch[j]].append(actions[j].get("id"))
+        return {
+            "version": PLAN_VERSION,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "constraints": {"batch_size": self.batch_size, "host_cap": self.host_cap,
+                            "handler_caps": {name: caps[i] for name, i in hnd_ids.items()},
+                            "type_weights": self.type_weights, "budget_s": budget},
+            **stats,
+            "lower_bound": round(lb, 3),
+            "gap": round(stats["objective"] / lb - 1, 4) if lb else 0.0,
+            "batch_count": len(batches),
+            "batches": batches,
+        }
+
+
+# ----- plano em disco (scheduler grava, executor lê) -----
+def write_plan(plan: Dict, path: str):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(plan, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def load_plan(path: str, max_age_s: Optional[float] = None) -> Optional[Dict]:
+    """Plano gravado pelo scheduler; None se ausente, inválido ou mais velho que max_age_s."""
+    try:
+        if max_age_s is not None and time.time() - os.path.getmtime(path) > max_age_s:
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            plan = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return plan if plan.get("version") == PLAN_VERSION else None
+
+
+def order_by_plan(actions: Sequence[Dict], plan: Optional[Dict]) -> List[Tuple[Dict, Optional[int]]]:
+    """
+    (ação, lote) na ordem do plano. Ações que chegaram depois do plano vão ao final,
+    em ordem de chegada (lote None). Sem plano: FIFO.
+    """
+    if not plan:
+        return [(a, None) for a in actions]
+    pos = {aid: (b, i) for b, ids in enumerate(plan.get("batches", [])) for i, aid in enumerate(ids)}
+    planned = sorted((a for a in actions if a.get("id") in pos), key=lambda a: pos[a["id"]])
+    late = [a for a in actions if a.get("id") not in pos]
+    return [(a, pos[a["id"]][0]) for a in planned] + [(a, None) for a in late]
@@ -0,0 +1,247 @@
+# src/infrastructure/seasonal_baseline.py
+# Baselines sazonais por (host, itemkey) e hora da semana (168 buckets, segunda 00h = 0).
+#
+# O analyzer_timeseries só enxerga os últimos TS_WINDOW_MIN minutos: um pico diário/semanal
+# normal (backup às 2h, carga de segunda de manhã) parece anomalia. Aqui o histórico longo
+# (TS_BASELINE_DAYS) vira, para cada série e hora da semana:
+#   count, median, mad (já escalado por 1.4826), q05, q95
+# numa tabela float32 [séries x 168 x 5] (~3 KB por série). Pontuar um ponto novo é um
+# lookup em dict + indexação no array: z robusto = (valor - mediana) / mad.
+#
+# build_baseline() é vetorizado (ordenação por grupo + interpolação por índice, sem loop
+# por série). O arquivo .npz é gravado em temporário + os.replace (troca atômica);
+# BaselineStore detecta a versão nova por stat e troca a referência em memória.
+
+import glob
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+HOURS_OF_WEEK = 168
+STAT_FIELDS = ("count", "median", "mad", "q05", "q95")
+QUANTILES = (0.05, 0.95)
+MAD_SCALE = 1.4826  # MAD -> desvio padrão sob normalidade
+FORMAT_VERSION = 1
+
+_COUNT, _MEDIAN, _MAD, _Q05, _Q95 = range(len(STAT_FIELDS))
+
+
+def hour_of_week(ts) -> np.ndarray:
+    """Bucket 0..167 (UTC, segunda 00h = 0); 01/01/1970 foi uma quinta (dia 3)."""
+    ts = np.asarray(ts, dtype=np.int64)
+    return (((ts // 86400) + 3) % 7) * 24 + (ts // 3600) % 24
+
+
+def _group_quantile(sorted_values: np.ndarray, starts: np.ndarray, counts: np.ndarray, q: float) -> np.ndarray:
+    """Quantil (interpolação linear, como np.quantile) de cada grupo contíguo já ordenado."""
+    pos = starts + q * (counts - 1)
+    lo = np.floor(pos).astype(np.int64)
+    hi = np.minimum(lo + 1, starts + counts - 1)
+    frac = pos - lo
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * frac
+
+
+class SeasonalBaseline:
+    """Tabela imutável de estatísticas por (série, hora da semana)."""
+
+    def __init__(self, keys: List[Tuple[str, str]], stats: np.ndarray, meta: Optional[Dict] = None):
+        self.keys = keys
+        self.stats = stats  # float32 [n_series, 168, len(STAT_FIELDS)]
+        self.meta = meta or {}
+        self.index: Dict[Tuple[str, str], int] = {k: i for i, k in enumerate(keys)}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.stats.nbytes)
+
+    def lookup(self, host: str, itemkey: str, ts: int) -> Optional[np.ndarray]:
+        """Linha (count, median, mad, q05, q95) da hora da semana de ts, ou None."""
+        i = self.index.get((host, itemkey))
+        if i is None:
+            return None
+        return self.stats[i, (((int(ts) // 86400) + 3) % 7) * 24 + (int(ts) // 3600) % 24]
+
+    def score(self, host: str, itemkey: str, ts: int, value: float, *, min_count: int = 30,
+              rel_floor: float = 0.01, abs_floor: float = 1e-6) -> Optional[Dict]:
+        """
+        z robusto do ponto contra a baseline da sua hora da semana (None sem baseline suficiente).
+        A escala tem piso (rel_floor * |mediana|) para séries quase constantes.
+        """
+        row = self.lookup(host, itemkey, ts)
+        if row is None or not row[_COUNT] >= min_count:
+            return None
+        median = float(row[_MEDIAN])
+        scale = max(float(row[_MAD]), rel_floor * abs(median), abs_floor)
+        return {
+            "z": (float(value) - median) / scale,
+            "median": median,
+            "mad": float(row[_MAD]),
+            "q05": float(row[_Q05]),
+            "q95": float(row[_Q95]),
+            "count": int(row[_COUNT]),
+        }
+
+    # ----- persistência (troca atômica) -----
+    def save(self, path: str) -> str:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        meta = dict(self.meta, version=FORMAT_VERSION, stat_fields=list(STAT_FIELDS))
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:  # file object: np.savez não acrescenta ".npz" ao nome
+            np.savez(f, stats=self.stats,
+                     hosts=np.array([k[0] for k in self.keys], dtype=str),
+                     itemkeys=np.array([k[1] for k in self.keys], dtype=str),
+                     meta=np.array(json.dumps(meta)))
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "SeasonalBaseline":
+        with np.load(path, allow_pickle=False) as z:
+            meta = json.loads(str(z["meta"]))
+            if meta.get("version") != FORMAT_VERSION:
+                raise ValueError(f"baseline {path}: versão {meta.get('version')} não suportada")
+            keys = list(zip(z["hosts"].tolist(), z["itemkeys"].tolist()))
+            return cls(keys, z["stats"], meta)
+
+
+def build_baseline(series: Iterable[Tuple[str, str, np.ndarray, np.ndarray]], *,
+                   meta: Optional[Dict] = None) -> SeasonalBaseline:
+    """
+    series: (host, itemkey, ts, value) por série. Todas as estatísticas saem de duas
+    ordenações globais (valor e desvio absoluto dentro de cada grupo série x hora da semana).
+    """
+    keys: List[Tuple[str, str]] = []
+    index: Dict[Tuple[str, str], int] = {}
+    codes, ts_parts, val_parts = [], [], []
+    for host, itemkey, ts, value in series:
+        ts = np.asarray(ts, dtype=np.int64)
+        value = np.asarray(value, dtype=np.float64)
+        ok = np.isfinite(value)
+        if not ok.any():
+            continue
+        key = (str(host), str(itemkey))
+        code = index.get(key)
+        if code is None:
+            code = index[key] = len(keys)
+            keys.append(key)
+        codes.append(np.full(int(ok.sum()), code, dtype=np.int64))
+        ts_parts.append(ts[ok])
+        val_parts.append(value[ok])
+
+    stats = np.full((len(keys), HOURS_OF_WEEK, len(STAT_FIELDS)), np.nan, dtype=np.float32)
+    if keys:
+        group = np.concatenate(codes) * HOURS_OF_WEEK + hour_of_week(np.concatenate(ts_parts))
+        value = np.concatenate(val_parts)
+
+        order = np.lexsort((value, group))
+        g, v = group[order], value[order]
+        starts = np.flatnonzero(np.r_[True, g[1:] != g[:-1]])  # g já ordenado: sem np.unique
+        counts = np.diff(np.r_[starts, len(g)])
+        uniq = g[starts]
+        gi = np.repeat(np.arange(len(uniq)), counts)  # grupo de cada elemento (g já ordenado)
+
+        median = _group_quantile(v, starts, counts, 0.5)
+        dev = np.abs(v - median[gi])
+        dev = dev[np.lexsort((dev, gi))]
+        mad = _group_quantile(dev, starts, counts, 0.5) * MAD_SCALE
+
+        s, h = uniq // HOURS_OF_WEEK, uniq % HOURS_OF_WEEK
+        stats[s, h, _COUNT] = counts
+        stats[s, h, _MEDIAN] = median
+        stats[s, h, _MAD] = mad
+        stats[s, h, _Q05] = _group_quantile(v, starts, counts, QUANTILES[0])
+        stats[s, h, _Q95] = _group_quantile(v, starts, counts, QUANTILES[1])
+
+    meta = dict(meta or {}, built_at=time.time(), series=len(keys),
+                buckets=int(np.isfinite(stats[..., _COUNT]).sum()))
+    return SeasonalBaseline(keys, stats, meta)
+
+
+def read_history(raw_dir: str, since_ts: Optional[int] = None):
+    """Séries brutas (CSV por série em raw_dir, como lidas pelo analyzer_timeseries)."""
+    import pandas as pd
+
+    for path in sorted(glob.glob(os.path.join(raw_dir, "*.csv"))):
+        try:
+            df = pd.read_csv(path, usecols=lambda c: c in {"ts", "value", "host", "itemkey"})
+        except Exception as e:
+            print(f"[baseline] erro em {path}: {e}")
+            continue
+        if not {"ts", "value", "host", "itemkey"}.issubset(df.columns) or df.empty:
+            continue
+        if since_ts is not None:
+            df = df[df["ts"] >= since_ts]
+        # uma série por arquivo, mas agrupa por segurança
+        for (host, itemkey), part in df.groupby(["host", "itemkey"], sort=False):
+            yield host, itemkey, part["ts"].to_numpy(np.int64), pd.to_numeric(part["value"], errors="coerce").to_numpy(np.float64)
+
+
+class BaselineStore:
+    """
+    Baseline atual para leitura: recarrega quando o arquivo muda (custo por consulta: um
+    os.stat, no máximo a cada check_interval_s). A troca é só uma atribuição de referência;
+    quem já tem o objeto antigo continua com uma tabela consistente.
+    """
+
+    def __init__(self, path: str, check_interval_s: float = 5.0):
+        self.path = path
+        self.check_interval_s = check_interval_s
+        self._baseline: Optional[SeasonalBaseline] = None
+        self._stat = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional[SeasonalBaseline]:
+        now = time.monotonic()
+        if now - self._checked >= self.check_interval_s or self._baseline is None:
+            self._checked = now
+            self._maybe_reload()
+        return self._baseline
+
+    def _maybe_reload(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        key = (st.st_mtime_ns, st.st_ino, st.st_size)
+        if key == self._stat:
+            return
+        with self._lock:
+            if key == self._stat:
+                return
+            try:
+                self._baseline = SeasonalBaseline.load(self.path)
+                self._stat = key
+            except (OSError, ValueError) as e:
+                print(f"[baseline] falha ao carregar {self.path}: {e}")
+
+
+class BaselineRebuilder:
+    """
+    Reconstrução em lote a partir do histórico, gravada com troca atômica. Roda fora do
+    caminho de pontuação (agente baseline_builder): o analyzer só lê a versão pronta.
+    """
+
+    def __init__(self, raw_dir: str, out_path: str, *, history_days: float = 28.0):
+        self.raw_dir = raw_dir
+        self.out_path = out_path
+        self.history_days = history_days
+        self.last: Optional[Dict] = None
+
+    def run_once(self) -> Dict:
+        t0 = time.perf_counter()
+        since = int(time.time() - self.history_days * 86400) if self.history_days > 0 else None
+        baseline = build_baseline(read_history(self.raw_dir, since),
+                                  meta={"history_days": self.history_days, "raw_dir": self.raw_dir})
+        build_s = time.perf_counter() - t0
+        baseline.save(self.out_path)
+        self.last = {"series": len(baseline), "buckets": baseline.meta["buckets"], "bytes": baseline.nbytes,
+                     "build_s": round(build_s, 3), "path": self.out_path}
+        return self.last
@@ -0,0 +1,131 @@
+# src/infrastructure/sharding.py
+# Particionamento horizontal por host (collector / analyzer_timeseries em N instâncias).
+#
+#   SHARD_COUNT=4 SHARD_INDEX=2   -> esta instância é dona dos hosts com shard_of(host, 4) == 2
+#
+# Dono do host = jump consistent hash (Lamping & Veach) de um hash estável do nome:
+# ao passar de N para N+1 shards só ~1/(N+1) dos hosts mudam de dono (o mínimo possível),
+# e nenhum host troca entre shards que já existiam.
+#
+# Cada instância grava no seu próprio arquivo (caminho lógico + ".shard-<i>-of-<n>");
+# com SHARD_COUNT=1 (padrão) os caminhos ficam como antes. Os consumidores
+# (orchestrator, dashboard) leem a união dos arquivos do layout mais recente via read_sharded().
+
+import glob
+import hashlib
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from infrastructure.dataset_io import dataset_exists, locate_dataset, read_dataset, resolve_path
+
+_SHARD_RE = re.compile(r"\.shard-(\d+)-of-(\d+)$")
+
+
+def host_key(host: str) -> int:
+    """Hash estável de 64 bits (hash() do Python muda a cada processo)."""
+    return int.from_bytes(hashlib.blake2b(str(host).encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def jump_hash(key: int, num_buckets: int) -> int:
+    """Jump consistent hash: bucket em [0, num_buckets) com movimentação mínima."""
+    b, j = -1, 0
+    while j < num_buckets:
+        b = j
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        j = int((b + 1) * (float(1 << 31) / float((key >> 33) + 1)))
+    return b
+
+
+def shard_of(host: str, count: int) -> int:
+    return 0 if count <= 1 else jump_hash(host_key(host), count)
+
+
+class ShardConfig:
+    """Shard desta instância (SHARD_INDEX de SHARD_COUNT)."""
+
+    def __init__(self, index: int = 0, count: int = 1):
+        if count < 1 or not 0 <= index < count:
+            raise ValueError(f"shard inválido: SHARD_INDEX={index} SHARD_COUNT={count}")
+        self.index = index
+        self.count = count
+        self._owned: Dict[str, bool] = {}
+
+    @classmethod
+    def from_env(cls) -> "ShardConfig":
+        return cls(int(os.getenv("SHARD_INDEX", "0")), int(os.getenv("SHARD_COUNT", "1")))
+
+    @property
+    def enabled(self) -> bool:
+        return self.count > 1
+
+    def owns(self, host: str) -> bool:
+        v = self._owned.get(host)
+        if v is None:
+            v = self._owned[host] = shard_of(host, self.count) == self.index
+        return v
+
+    def path(self, path: str) -> str:
+        """Caminho lógico do arquivo deste shard (inalterado sem sharding)."""
+        if not self.enabled:
+            return path
+        base, ext = os.path.splitext(path)
+        return f"{base}.shard-{self.index}-of-{self.count}{ext}"
+
+    def __repr__(self):
+        return f"shard {self.index}/{self.count}"
+
+
+def shard_files(path: str, fmt: Optional[str] = None) -> List[str]:
+    """
+    Arquivos de shard do layout mais recente (o N cujo arquivo mais novo é o mais recente).
+    O arquivo único (sem sharding) conta como o layout N=1: ao voltar de N shards para 1,
+    os shards antigos deixam de valer. Layouts antigos são ignorados; sem shards ou com
+    o arquivo único mais recente, [] (o chamador lê o arquivo único).
+    """
+    base = os.path.splitext(resolve_path(path, fmt))[0]
+    ext = os.path.splitext(resolve_path(path, fmt))[1]
+    layouts: Dict[int, List[Tuple[float, str]]] = {}
+    for f in glob.glob(glob.escape(base) + ".shard-*-of-*" + ext):
+        m = _SHARD_RE.search(os.path.splitext(f)[0])
+        if m:
+            layouts.setdefault(int(m.group(2)), []).append((os.path.getmtime(f), f))
+    if not layouts:
+        return []
+    if dataset_exists(path, fmt):
+        single = locate_dataset(path, fmt)
+        layouts[1] = [(os.path.getmtime(single), single)]
+    newest = max(layouts, key=lambda n: max(t for t, _ in layouts[n]))
+    return [] if newest == 1 else sorted(f for _, f in layouts[newest])
+
+
+def sharded_sources(path: str) -> List[str]:
+    """Arquivos que compõem o dataset: shards do layout atual ou o arquivo único."""
+    files = shard_files(path)
+    if files:
+        return files
+    return [locate_dataset(path)] if dataset_exists(path) else []
+
+
+def sharded_exists(path: str) -> bool:
+    return bool(sharded_sources(path))
+
+
+def sharded_version(path: str) -> Optional[Tuple]:
+    """Identifica o conteúdo atual (para caches): (arquivo, mtime) de cada parte."""
+    try:
+        return tuple((f, os.stat(f).st_mtime_ns) for f in sharded_sources(path)) or None
+    except FileNotFoundError:
+        return None
+
+
+def read_sharded(path: str, columns: Optional[List[str]] = None, schema: Optional[str] = None) -> pd.DataFrame:
+    """União dos shards (cada host está em exatamente um arquivo do layout), ou o arquivo único."""
+    files = shard_files(path)
+    if not files:
+        return read_dataset(path, columns=columns, schema=schema)
+    frames = [read_dataset(f, columns=columns, schema=schema) for f in files]
+    frames = [f for f in frames if not f.empty]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
@@ -0,0 +1,139 @@
+# src/infrastructure/synthetic_data.py
+# Gerador de dados sintéticos com anomalias injetadas, nos mesmos formatos do pipeline:
+#   - séries em data/raw/timeseries/<host>_<itemkey>.csv (ts, value, host, itemkey)
+#   - tabela de triggers no schema de anomalies_dataset (triggerid, description, priority,
+#     lastchange, hosts)
+# Usado pelos benchmarks (scripts/benchmark_pipeline.py).
+
+import os
+import re
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from infrastructure.dataset_io import write_dataset
+
+DEFAULT_ITEMKEYS = [
+    "system.cpu.util[,user]",
+    "system.cpu.util[,system]",
+    "system.cpu.util[,iowait]",
+    "vm.memory.utilization",
+    "net.if.in[eth0]",
+    "net.if.out[eth0]",
+    "vfs.fs.size[/,pused]",
+    "system.cpu.load[all,avg1]",
+]
+
+_DESCRIPTIONS = [
+    ("{host}: High CPU utilization", 4),
+    ("{host}: Load average is too high", 3),
+    ("{host}: Lack of available memory", 4),
+    ("{host}: Disk space is low", 2),
+    ("{host}: Interface eth0: High bandwidth usage", 3),
+    ("{host}: Zabbix agent is not available", 5),
+    ("{host}: System time is out of sync", 1),
+    ("{host}: Configuration file has been changed", 0),
+]
+
+
+def host_names(n_hosts: int) -> List[str]:
+    return [f"host-{i:05d}" for i in range(n_hosts)]
+
+
+def item_keys(n_items: int) -> List[str]:
+    keys = list(DEFAULT_ITEMKEYS[:n_items])
+    keys += [f"custom.metric[{i}]" for i in range(len(keys), n_items)]
+    return keys
+
+
+def series_filename(host: str, itemkey: str) -> str:
+    # mesmo padrão dos arquivos existentes: "Grafana_system.cpu.util__system_.csv"
+    return f"{host}_{re.sub(r'[^A-Za-z0-9.]', '_', itemkey)}.csv"
+
+
+def generate_timeseries(
+    out_dir: str,
+    n_hosts: int,
+    n_items: int,
+    points: int,
+    *,
+    step_s: int = 60,
+    end_ts: Optional[int] = None,
+    anomaly_rate: float = 0.01,
+    last_point_anomaly_rate: float = 0.2,
+    seed: int = 42,
+) -> Dict:
+    """
+    Um CSV por (host, itemkey) com `points` amostras terminando em end_ts (padrão: agora).
+    Anomalias: picos (anomaly_rate dos pontos) e, numa fração das séries, o último ponto
+    anômalo (é o ponto avaliado pelo analyzer_timeseries).
+    """
+    rng = np.random.default_rng(seed)
+    end_ts = int(end_ts if end_ts is not None else time.time())
+    ts = end_ts - step_s * np.arange(points - 1, -1, -1, dtype=np.int64)
+    phase = 2 * np.pi * (ts % 86400) / 86400.0
+
+    os.makedirs(out_dir, exist_ok=True)
+    n_series = n_anom = n_last = 0
+    for host in host_names(n_hosts):
+        for key in item_keys(n_items):
+            level = rng.uniform(5, 60)
+            amp = rng.uniform(0.05, 0.3) * level
+            noise = rng.uniform(0.01, 0.05) * level
+            value = level + amp * np.sin(phase + rng.uniform(0, 2 * np.pi)) + rng.normal(0, noise, points)
+
+            spikes = rng.random(points) < anomaly_rate
+            value[spikes] += rng.uniform(6, 12, spikes.sum()) * noise + amp
+            if rng.random() < last_point_anomaly_rate:
+                value[-1] += 15 * noise + 2 * amp
+                n_last += 1
+            n_anom += int(spikes.sum())
+
+            pd.DataFrame({
+                "ts": ts,
+                "value": np.round(np.clip(value, 0, None), 6),
+                "host": host,
+                "itemkey": key,
+            }).to_csv(os.path.join(out_dir, series_filename(host, key)), index=False)
+            n_series += 1
+
+    return {"series": n_series, "rows": n_series * points, "anomalies": n_anom,
+            "last_point_anomalies": n_last, "end_ts": end_ts}
+
+
+def generate_triggers(
+    path: str,
+    n_triggers: int,
+    n_hosts: int,
+    *,
+    anomaly_rate: float = 0.1,
+    seed: int = 42,
+    fmt: Optional[str] = None,
+) -> Dict:
+    """
+    Tabela de triggers (schema "triggers"). Uma fração anomaly_rate recebe prioridade
+    alta (4-5) e lastchange recente; as demais, prioridade 0-3.
+    """
+    rng = np.random.default_rng(seed)
+    hosts = host_names(n_hosts)
+    now = int(time.time())
+
+    host_idx = rng.integers(0, n_hosts, n_triggers)
+    desc_idx = rng.integers(0, len(_DESCRIPTIONS), n_triggers)
+    anomalous = rng.random(n_triggers) < anomaly_rate
+    priority = np.where(anomalous, rng.integers(4, 6, n_triggers), rng.integers(0, 4, n_triggers))
+    lastchange = np.where(anomalous, now - rng.integers(0, 3600, n_triggers),
+                          np.where(rng.random(n_triggers) < 0.5, 0, now - rng.integers(0, 30 * 86400, n_triggers)))
+
+    df = pd.DataFrame({
+        "triggerid": 10000 + np.arange(n_triggers, dtype=np.int64),
+        "description": [_DESCRIPTIONS[d][0].format(host=hosts[h]) for d, h in zip(desc_idx, host_idx)],
+        "priority": priority.astype(np.int64),
+        "lastchange": lastchange.astype(np.int64),
+        "hosts": [[{"hostid": str(10000 + h), "name": hosts[h]}] for h in host_idx],
+        "collected_at": float(time.time()),  # como o collector (resposta do trigger.get)
+    })
+    out = write_dataset(df, path, "triggers", fmt=fmt, csv_export=False)
+    return {"rows": n_triggers, "anomalies": int(anomalous.sum()), "path": out}
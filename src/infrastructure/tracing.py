@@ -0,0 +1,150 @@
+# src/infrastructure/tracing.py
+# Contexto de trace ponta a ponta: do `clock` da amostra no Zabbix até a ação executada.
+#
+# Cada estágio carimba um epoch (s, float) e o contexto viaja junto com o dado:
+#   sample_ts     clock da amostra (séries) ou lastchange da trigger (tabular)
+#   collected_at  collector: resposta do history.get / trigger.get
+#   scored_at     analyzer: score calculado (IsolationForest / modelo tabular)
+#   published_at  orchestrator: ação gravada em pending_actions.jsonl
+#   exec_start    executor: início da execução da ação
+#   exec_end      executor: fim da execução
+#
+# Datasets carregam collected_at/scored_at como colunas; a ação carrega action["trace"];
+# o executor grava em executed_actions.jsonl o trace completo e a latência por estágio.
+# Somente stdlib (o executor não depende de numpy/pandas).
+
+import math
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence
+
+TRACE_FIELDS = ("sample_ts", "collected_at", "scored_at", "published_at", "exec_start", "exec_end")
+
+# (estágio, campo inicial, campo final)
+STAGES = (
+    ("collect", "sample_ts", "collected_at"),
+    ("analyze", "collected_at", "scored_at"),
+    ("publish", "scored_at", "published_at"),
+    ("queue", "published_at", "exec_start"),
+    ("execute", "exec_start", "exec_end"),
+    ("end_to_end", "sample_ts", "exec_end"),
+)
+# end_to_end menos a soma dos estágios medidos: tempo sem carimbo (ex.: campo ausente no dataset)
+UNATTRIBUTED = "unattributed"
+STAGE_NAMES = tuple(s for s, _, _ in STAGES[:-1]) + (UNATTRIBUTED, "end_to_end")
+
+QUANTILES = (0.50, 0.95, 0.99)
+
+# epochs anteriores a 2000-01-01 não são timestamps reais (ex.: lastchange já normalizado em [0, 1])
+MIN_EPOCH = 946684800.0
+
+
+def now() -> float:
+    return time.time()
+
+
+def _epoch(v) -> Optional[float]:
+    if v is None:
+        return None
+    try:
+        f = float(v)
+    except (TypeError, ValueError):
+        return None
+    return f if math.isfinite(f) and f >= MIN_EPOCH else None
+
+
+def new_trace(trace_id: str, **fields) -> Dict:
+    """Contexto inicial da ação (campos ausentes/NaN/0 ou que não são epoch são omitidos)."""
+    trace = {"trace_id": trace_id}
+    for k in TRACE_FIELDS:
+        v = _epoch(fields.get(k))
+        if v is not None:
+            trace[k] = round(v, 6)
+    return trace
+
+
+def stamp(trace: Dict, field: str, value: Optional[float] = None) -> Dict:
+    trace[field] = round(now() if value is None else value, 6)
+    return trace
+
+
+def stage_latencies(trace: Dict) -> Dict[str, Optional[float]]:
+    """Duração (s) de cada estágio; None quando falta uma das pontas."""
+    out = {}
+    for name, start, end in STAGES:
+        a, b = _epoch(trace.get(start)), _epoch(trace.get(end))
+        out[name] = round(b - a, 6) if a is not None and b is not None else None
+    out[UNATTRIBUTED] = unattributed(out)
+    return out
+
+
+def unattributed(latencies: Dict[str, Optional[float]]) -> Optional[float]:
+    """Parte do end_to_end não coberta pelos estágios medidos (None sem end_to_end)."""
+    total = latencies.get("end_to_end")
+    if total is None:
+        return None
+    measured = sum(latencies.get(s) or 0.0 for s, _, _ in STAGES[:-1])
+    return round(max(0.0, total - measured), 6)
+
+
+def parse_ts(value) -> Optional[float]:
+    """Epoch (s) para ISO-8601 (com 'Z' ou offset), formato compacto ou epoch numérico."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    s = str(value)
+    try:
+        dt = datetime.fromisoformat(s)
+    except ValueError:
+        try:
+            dt = datetime.strptime(s, "%Y%m%dT%H%M%SZ")
+        except ValueError:
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)  # timestamps do pipeline são UTC
+    return dt.timestamp()
+
+
+def trace_from_record(record: Dict) -> Dict:
+    """
+    Trace de um registro de executed_actions.jsonl. Registros anteriores ao tracing
+    (sem record["trace"]) são reconstruídos do que existir: action.ts (clock da amostra),
+    action.published_at e ts_executed (como exec_start e exec_end: a execução simulada
+    é instantânea, então o estágio "queue" continua mensurável).
+    """
+    if isinstance(record.get("trace"), dict):
+        return record["trace"]
+    act = record.get("action") or {}
+    trace = dict(act.get("trace") or {})
+    if "sample_ts" not in trace and isinstance(act.get("ts"), (int, float)):
+        trace["sample_ts"] = float(act["ts"])
+    if "published_at" not in trace and act.get("published_at"):
+        trace["published_at"] = parse_ts(act["published_at"])
+    if "exec_end" not in trace and record.get("ts_executed"):
+        trace["exec_end"] = parse_ts(record["ts_executed"])
+        trace.setdefault("exec_start", trace["exec_end"])
+    return trace
+
+
+def quantile(sorted_values: Sequence[float], q: float) -> float:
+    """Quantil com interpolação linear (mesmo critério do numpy.percentile padrão)."""
+    n = len(sorted_values)
+    if n == 0:
+        return float("nan")
+    pos = (n - 1) * q
+    lo = int(math.floor(pos))
+    hi = min(lo + 1, n - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def summarize(values: Iterable[float], quantiles: Sequence[float] = QUANTILES) -> Dict:
+    vals: List[float] = sorted(v for v in values if v is not None)
+    out = {"count": len(vals)}
+    if not vals:
+        return out
+    for q in quantiles:
+        out[f"p{int(round(q * 100))}"] = round(quantile(vals, q), 6)
+    out["mean"] = round(sum(vals) / len(vals), 6)
+    out["max"] = round(vals[-1], 6)
+    return out
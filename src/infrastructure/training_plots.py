@@ -0,0 +1,86 @@
+# src/infrastructure/training_plots.py
+# Gráficos do treino (ROC e matriz de confusão) em duas etapas:
+#   1. no treino, save_plot_data() grava só os dados (JSON pequeno, sem matplotlib)
+#   2. render_plots() desenha os PNGs depois que modelo e métricas já foram publicados
+#      (fim do job ml_trainer, ou sob demanda com scripts/render_training_plots.py)
+# matplotlib só é importado na etapa 2.
+
+import json
+import os
+from typing import Dict, List, Optional
+
+PLOT_DATA_FILE = "plot_data.json"
+
+
+def save_plot_data(plots_dir: str, y_test, y_pred, y_proba=None) -> str:
+    """Curva ROC (se houver probabilidades) e matriz de confusão (thr=0.5) -> <plots_dir>/plot_data.json."""
+    from sklearn.metrics import confusion_matrix, roc_curve
+
+    data: Dict = {"confusion_matrix": confusion_matrix(y_test, y_pred).tolist()}
+    if y_proba is not None:
+        try:
+            fpr, tpr, _ = roc_curve(y_test, y_proba)
+            data["roc"] = {"fpr": fpr.tolist(), "tpr": tpr.tolist()}
+        except Exception as e:
+            print(f"[ml_trainer] aviso: falha ao calcular ROC: {e}")
+    os.makedirs(plots_dir, exist_ok=True)
+    path = os.path.join(plots_dir, PLOT_DATA_FILE)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+    return path
+
+
+def render_plots(plot_data_path: str, plots_dir: Optional[str] = None) -> List[str]:
+    """Desenha roc_curve.png e confusion_matrix.png a partir do plot_data.json; retorna os arquivos gerados."""
+    import matplotlib
+    matplotlib.use("Agg")  # backend headless para container/servidor
+    import matplotlib.pyplot as plt
+
+    with open(plot_data_path) as f:
+        data = json.load(f)
+    plots_dir = plots_dir or os.path.dirname(plot_data_path)
+    os.makedirs(plots_dir, exist_ok=True)
+    written = []
+
+    roc = data.get("roc")
+    if roc:
+        try:
+            plt.figure()
+            plt.plot(roc["fpr"], roc["tpr"], linewidth=2)
+            plt.plot([0, 1], [0, 1], "--")
+            plt.xlabel("FPR")
+            plt.ylabel("TPR")
+            plt.title("ROC Curve")
+            out = os.path.join(plots_dir, "roc_curve.png")
+            plt.savefig(out, bbox_inches="tight")
+            written.append(out)
+        except Exception as e:
+            print(f"[ml_trainer] aviso: falha ao salvar ROC: {e}")
+        finally:
+            plt.close()
+
+    cm = data.get("confusion_matrix")
+    if cm:
+        try:
+            fig, ax = plt.subplots()
+            im = ax.imshow(cm, interpolation="nearest", cmap="viridis")
+            fig.colorbar(im, ax=ax)
+            top = max(max(r) for r in cm) or 1
+            for i, row in enumerate(cm):
+                for j, v in enumerate(row):
+                    ax.text(j, i, str(v), ha="center", va="center", color="black" if v > top / 2 else "white")
+            ax.set_xticks(range(len(cm[0])))
+            ax.set_yticks(range(len(cm)))
+            ax.set_xlabel("Predicted label")
+            ax.set_ylabel("True label")
+            ax.set_title("Confusion Matrix (thr=0.5)")
+            out = os.path.join(plots_dir, "confusion_matrix.png")
+            fig.savefig(out, bbox_inches="tight")
+            written.append(out)
+        except Exception as e:
+            print(f"[ml_trainer] aviso: falha ao salvar matriz de confusão: {e}")
+        finally:
+            plt.close("all")
+    return written